@@ -0,0 +1,132 @@
+from itertools import product
+
+import numpy as np
+import pandas as pd
+
+CLASSES = ["Actions canadiennes", "Actions internationales", "Obligations", "Fonds ESG", "Liquidité"]
+OBJECTIFS = ["Épargne retraite", "Achat maison", "Voyage", "Revenus passifs", "Autre"]
+RISQUES = ["Faible", "Modérée", "Élevée"]
+DUREES = ["Courte", "Moyenne", "Longue"]
+
+# Étape 1 : répartition de base selon l'objectif
+BASES = {
+    "Épargne retraite": ([30, 30, 30, 0, 10], "Votre objectif d'épargne retraite favorise une croissance à long terme, d'où une part importante en actions et une diversification équilibrée."),
+    "Achat maison": ([20, 20, 40, 0, 20], "L'achat d'une maison implique un horizon de placement plus court, donc davantage d'obligations et de liquidités pour sécuriser votre capital."),
+    "Voyage": ([25, 25, 30, 0, 20], "Un projet de voyage nécessite des fonds disponibles sous peu, donc plus de liquidités et d'actifs à faible risque."),
+    "Revenus passifs": ([20, 20, 50, 0, 10], "Vous cherchez à générer des revenus réguliers, les obligations occupent donc une place centrale dans votre portefeuille."),
+    "Autre": ([25, 25, 25, 0, 25], "Votre objectif général a mené à une répartition équilibrée entre croissance, revenu et sécurité."),
+}
+
+# Étapes 2 à 5 : (critère, valeur, ajustement par classe, explication)
+# Le transfert ESG vaut min(actions canadiennes, 10) : les actions canadiennes
+# ne descendent jamais sous 10 % avant cette étape, il est donc toujours de 10.
+AJUSTEMENTS = [
+    ("risque", "Faible", [-5, -5, 10, 0, 0], "Votre faible tolérance au risque a réduit l'exposition aux actions et renforcé les actifs stables comme les obligations."),
+    ("risque", "Modérée", [0, 0, 0, 0, 0], "Votre profil modéré combine actions et obligations pour équilibrer rendement et sécurité."),
+    ("risque", "Élevée", [5, 5, -10, 0, 0], "Votre tolérance élevée au risque augmente l'exposition aux actions pour maximiser le potentiel de rendement."),
+    ("duree", "Courte", [-5, -5, 10, 0, 0], "Comme votre horizon de placement est court, la priorité a été mise sur des actifs plus sécuritaires."),
+    ("duree", "Longue", [5, 5, -10, 0, 0], "Avec un horizon à long terme, le portefeuille favorise les actions pour maximiser le rendement dans le temps."),
+    ("preference_esg", True, [-5, -5, 0, 10, 0], "Votre préférence pour les investissements responsables a conduit à une réallocation vers des fonds ESG."),
+    ("horizon_liquidite", "Oui", [-3, -3, -3, 0, 10], "Comme vous avez besoin de liquidités à court terme, une part plus importante a été allouée à des actifs très accessibles."),
+]
+
+CLES = ["objectif", "risque", "duree", "preference_esg", "horizon_liquidite"]
+
+
+def classe_duree(duree):
+    """Courte (5 ans ou moins), Longue (15 ans ou plus) ou Moyenne; accepte un scalaire ou un tableau."""
+    duree = np.asarray(duree)
+    return np.select([duree <= 5, duree >= 15], ["Courte", "Longue"], "Moyenne")
+
+
+def normaliser(tailles):
+    """Ramène chaque ligne à des pourcentages entiers dont la somme vaut exactement 100
+    (méthode du plus fort reste)."""
+    tailles = np.clip(np.atleast_2d(np.asarray(tailles, dtype=float)), 0, None)
+    parts = tailles / tailles.sum(axis=1, keepdims=True) * 100
+    entiers = np.floor(parts).astype(int)
+    restes = parts - entiers
+    manquants = 100 - entiers.sum(axis=1)
+    rangs = np.argsort(np.argsort(-restes, axis=1, kind="stable"), axis=1)
+    return entiers + (rangs < manquants[:, None])
+
+
+def _construire_table():
+    lignes = []
+    for profil in product(OBJECTIFS, RISQUES, DUREES, [False, True], ["Oui", "Non"]):
+        valeurs = dict(zip(CLES, profil))
+        tailles, texte = BASES[valeurs["objectif"]]
+        tailles = list(tailles)
+        explication = [texte]
+        for critere, valeur, ajustement, phrase in AJUSTEMENTS:
+            if valeurs[critere] == valeur:
+                tailles = [t + a for t, a in zip(tailles, ajustement)]
+                explication.append(phrase)
+        lignes.append(list(profil) + tailles + ["\n".join(explication)])
+    table = pd.DataFrame(lignes, columns=CLES + CLASSES + ["explication"]).set_index(CLES)
+    table[CLASSES] = normaliser(table[CLASSES].to_numpy())
+    return table
+
+
+# Allocation précalculée pour tout l'espace des profils (5 x 3 x 3 x 2 x 2 = 180 lignes)
+TABLE_ALLOCATIONS = _construire_table()
+
+
+def allocation_profil(profil):
+    """Répartition (liste de 5 pourcentages) et explication pour un profil."""
+    cle = (profil["objectif"], profil["risque"], str(classe_duree(profil["duree"])),
+           bool(profil["preference_esg"]), profil["horizon_liquidite"])
+    ligne = TABLE_ALLOCATIONS.loc[cle]
+    return [int(ligne[c]) for c in CLASSES], ligne["explication"].split("\n")
+
+
+def _booleen(serie):
+    if serie.dtype == bool:
+        return serie
+    return serie.astype(str).str.strip().str.lower().isin(["true", "1", "oui", "vrai", "yes"])
+
+
+def verifier_profils(profils):
+    """Lève une ValueError si une colonne manque ou si des profils sortent de la table.
+
+    Les lignes fautives (objectif, risque ou horizon inconnu, durée non
+    numérique) sont listées dans le message, avec leurs valeurs.
+    """
+    manquantes = [c for c in CLES if c not in profils.columns]
+    if manquantes:
+        raise ValueError(f"Colonnes manquantes : {', '.join(manquantes)}")
+    fautifs = pd.DataFrame({c: ~profils[c].isin(TABLE_ALLOCATIONS.index.unique(c))
+                            for c in ["objectif", "risque", "horizon_liquidite"]})
+    fautifs["duree"] = pd.to_numeric(profils["duree"], errors="coerce").isna().to_numpy()
+    positions = np.flatnonzero(fautifs.any(axis=1).to_numpy())
+    if len(positions):
+        details = [f"ligne {profils.index[p]} : "
+                   + ", ".join(f"{c}={profils[c].iloc[p]!r}" for c in fautifs.columns[fautifs.iloc[p].to_numpy()])
+                   for p in positions[:10]]
+        suite = "; ..." if len(positions) > 10 else ""
+        raise ValueError(f"{len(positions)} profil(s) avec des valeurs inconnues ({'; '.join(details)}{suite})")
+
+
+def allouer_lot(profils):
+    """Allocations de nombreux profils en une passe.
+
+    ``profils`` est un DataFrame ou le chemin d'un CSV contenant les colonnes
+    objectif, risque, duree, preference_esg et horizon_liquidite. Le résultat
+    reprend les profils et ajoute une colonne par classe d'actifs et
+    l'explication. Les profils sont d'abord validés par ``verifier_profils``.
+    """
+    if not isinstance(profils, pd.DataFrame):
+        profils = pd.read_csv(profils)
+    verifier_profils(profils)
+    duree = pd.to_numeric(profils["duree"])
+    cles = pd.MultiIndex.from_arrays([
+        profils["objectif"].to_numpy(),
+        profils["risque"].to_numpy(),
+        classe_duree(duree.to_numpy()),
+        _booleen(profils["preference_esg"]).to_numpy(),
+        profils["horizon_liquidite"].to_numpy(),
+    ], names=CLES)
+    allocations = TABLE_ALLOCATIONS.reindex(cles)
+    allocations.index = profils.index
+    allocations["explication"] = allocations["explication"].str.replace("\n", " ")
+    return pd.concat([profils, allocations], axis=1)
@@ -0,0 +1,160 @@
+import argparse
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+from allocation import allouer_lot, verifier_profils
+from simulation import PERCENTILES, simuler_monte_carlo, simuler_rendement
+
+# Hypothèses par défaut, celles des curseurs du simulateur et de la simulation Monte Carlo
+TAUX = 5
+RENDEMENT_MOYEN = 8
+VOLATILITE = 20
+SIMULATIONS = 10_000
+TAILLE_BLOC = 256
+COLONNES_MONTANTS = ["montant_initial", "investissement_mensuel", "duree"]
+
+
+def lire_table(chemin):
+    """DataFrame d'un fichier CSV ou Parquet."""
+    return pd.read_parquet(chemin) if str(chemin).endswith(".parquet") else pd.read_csv(chemin)
+
+
+def ecrire_table(df, chemin):
+    """Écrit un rapport en Parquet (selon l'extension, pyarrow requis) ou en CSV."""
+    if str(chemin).endswith(".parquet"):
+        try:
+            df.to_parquet(chemin)
+        except ImportError as e:
+            raise SystemExit(f"Écriture Parquet impossible ({e}) : installer pyarrow ou choisir un fichier .csv.")
+    else:
+        df.to_csv(chemin)
+
+
+def analyser_profils(profils, taux=TAUX, rendement_moyen=RENDEMENT_MOYEN, volatilite=VOLATILITE,
+                     simulations=SIMULATIONS, graine=0):
+    """Allocation suggérée, capital projeté et percentiles Monte Carlo de chaque profil.
+
+    ``profils`` contient les colonnes de ``allouer_lot`` ainsi que
+    montant_initial, investissement_mensuel et duree. Les colonnes taux,
+    rendement_moyen et volatilite, si elles existent, remplacent les
+    hypothèses communes pour leur ligne. La simulation de la i-ème ligne est
+    tirée avec la graine ``graine + i``.
+    """
+    manquantes = [c for c in COLONNES_MONTANTS if c not in profils.columns]
+    if manquantes:
+        raise ValueError(f"Colonnes manquantes : {', '.join(manquantes)}")
+    rapport = allouer_lot(profils)
+    communes = {"taux": taux, "rendement_moyen": rendement_moyen, "volatilite": volatilite}
+    hypotheses = pd.DataFrame({c: profils.get(c, v) for c, v in communes.items()}, index=profils.index).fillna(communes)
+    capital, percentiles = [], []
+    for i, profil, h in zip(range(len(profils)), profils.itertuples(), hypotheses.itertuples()):
+        duree = int(profil.duree)
+        historique = simuler_rendement(profil.montant_initial, profil.investissement_mensuel, h.taux, duree)
+        capital.append(historique[-1] if len(historique) else profil.montant_initial)
+        resultat = simuler_monte_carlo(profil.montant_initial, h.rendement_moyen, h.volatilite, duree, simulations,
+                                       graine=graine + i)
+        percentiles.append([resultat.percentiles[p][-1] for p in PERCENTILES])
+    rapport[list(hypotheses.columns)] = hypotheses
+    rapport["Capital projeté ($)"] = capital
+    rapport[[f"Monte Carlo p{p} ($)" for p in PERCENTILES]] = np.array(percentiles).reshape(len(profils), len(PERCENTILES))
+    return rapport
+
+
+def analyser_lot(profils, executeur=None, taille_bloc=TAILLE_BLOC, graine=0, **options):
+    """``analyser_profils`` par blocs de lignes, répartis sur ``executeur`` s'il est fourni.
+
+    Chaque bloc décale la graine de sa position : le rapport ne dépend ni
+    du découpage ni du nombre de processus. Les profils sont tous validés
+    avant le découpage : une ValueError liste l'ensemble des lignes fautives.
+    """
+    manquantes = [c for c in COLONNES_MONTANTS if c not in profils.columns]
+    if manquantes:
+        raise ValueError(f"Colonnes manquantes : {', '.join(manquantes)}")
+    verifier_profils(profils)
+    debuts = range(0, len(profils), taille_bloc)
+    blocs = [profils.iloc[i:i + taille_bloc] for i in debuts]
+    graines = [graine + i for i in debuts]
+    if executeur is None:
+        resultats = [_analyser_bloc(b, g, options) for b, g in zip(blocs, graines)]
+    else:
+        resultats = list(executeur.map(_analyser_bloc, blocs, graines, [options] * len(blocs)))
+    return pd.concat(resultats) if resultats else analyser_profils(profils, graine=graine, **options)
+
+
+def _analyser_bloc(bloc, graine, options):
+    return analyser_profils(bloc, graine=graine, **options)
+
+
+def lire_tickers(chemin):
+    """Tickers d'un CSV (colonne Ticker ou ticker) ou d'un fichier texte, un par ligne."""
+    if str(chemin).endswith(".txt"):
+        with open(chemin, encoding="utf-8") as f:
+            return [ligne.strip().upper() for ligne in f if ligne.strip()]
+    df = lire_table(chemin)
+    colonne = next(c for c in df.columns if c.lower() in ("ticker", "symbole", "symbol"))
+    return df[colonne].dropna().astype(str).str.strip().str.upper().tolist()
+
+
+def analyser_tickers(tickers, stockage, executeur=None, jours=400):
+    """Rendements, volatilité et indicateurs techniques de fin de période (comme le screener)."""
+    from screener import cribler
+
+    prix = stockage.matrice(tickers, date.today() - timedelta(days=jours))
+    return cribler(prix.dropna(axis=1, how="all"), executeur=executeur)
+
+
+def main(arguments=None):
+    parseur = argparse.ArgumentParser(
+        description="Analyses du conseiller financier sans navigateur, réparties sur plusieurs processus.")
+    parseur.add_argument("--processus", type=int, default=None,
+                         help="nombre de processus (défaut : un par cœur; 1 : aucun pool)")
+    sous = parseur.add_subparsers(dest="commande", required=True)
+
+    p = sous.add_parser("profils", help="allocation, rendement projeté et Monte Carlo de chaque profil client")
+    p.add_argument("entree", help="CSV ou Parquet des profils")
+    p.add_argument("sortie", help="rapport .parquet ou .csv")
+    p.add_argument("--taux", type=float, default=TAUX, help="rendement annuel du simulateur (%%)")
+    p.add_argument("--rendement-moyen", type=float, default=RENDEMENT_MOYEN, help="rendement moyen Monte Carlo (%%)")
+    p.add_argument("--volatilite", type=float, default=VOLATILITE, help="volatilité Monte Carlo (%%)")
+    p.add_argument("--simulations", type=int, default=SIMULATIONS)
+    p.add_argument("--graine", type=int, default=0)
+    p.add_argument("--taille-bloc", type=int, default=TAILLE_BLOC)
+
+    t = sous.add_parser("tickers", help="rendements, volatilité et indicateurs techniques de chaque ticker")
+    t.add_argument("entree", help="CSV ou Parquet (colonne Ticker) ou fichier texte, un ticker par ligne")
+    t.add_argument("sortie", help="rapport .parquet ou .csv")
+    t.add_argument("--jours", type=int, default=400, help="historique chargé (jours calendaires)")
+    t.add_argument("--base", default="donnees/ohlcv.sqlite", help="stockage local des prix, partagé avec l'application")
+    args = parseur.parse_args(arguments)
+
+    debut = time.perf_counter()
+    executeur = None if args.processus == 1 else ProcessPoolExecutor(max_workers=args.processus)
+    try:
+        if args.commande == "profils":
+            profils = lire_table(args.entree)
+            try:
+                rapport = analyser_lot(profils, executeur, args.taille_bloc, taux=args.taux,
+                                       rendement_moyen=args.rendement_moyen, volatilite=args.volatilite,
+                                       simulations=args.simulations, graine=args.graine)
+            except ValueError as e:
+                raise SystemExit(f"{args.entree} : {e}")
+        else:
+            from planificateur import obtenir_planificateur
+            from stockage import StockageOHLCV
+
+            stockage = StockageOHLCV(args.base, fournisseur=obtenir_planificateur())
+            rapport = analyser_tickers(lire_tickers(args.entree), stockage, executeur, args.jours)
+    finally:
+        if executeur is not None:
+            executeur.shutdown()
+    ecrire_table(rapport, args.sortie)
+    print(f"{len(rapport)} lignes -> {args.sortie} en {time.perf_counter() - debut:.1f} s", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+import numpy as np
+import pandas as pd
+
+from risque import JOURS_PAR_AN
+
+# Fréquences de rééquilibrage : période pandas, ou None pour ne jamais rééquilibrer
+FREQUENCES = {"Mensuel": "M", "Trimestriel": "Q", "Annuel": "Y", "Jamais": None}
+
+
+def lire_proxies(chemin="fnb_americains.csv"):
+    """Classe d'actif -> FNB témoin, lu dans la colonne ``classe`` du fichier des FNB."""
+    fnb = pd.read_csv(chemin).dropna(subset=["classe"]).drop_duplicates("classe")
+    return dict(zip(fnb["classe"], fnb["ticker"]))
+
+
+def _debuts_de_periode(index, regle):
+    # Positions (dans la courbe, décalées de 1) du premier jour de chaque nouvelle période
+    periodes = index.to_period(regle).asi8
+    return np.flatnonzero(periodes[1:] != periodes[:-1]) + 2
+
+
+def backtester(rendements, poids, frequence=None, montant_initial=0.0, versement_mensuel=0.0):
+    """Valeur quotidienne de portefeuilles rééquilibrés périodiquement, avec versements mensuels.
+
+    ``rendements`` : DataFrame (jours x classes) de rendements quotidiens
+    sans trou; ``poids`` : DataFrame (variantes x classes) des poids cibles.
+    Le montant initial est investi la veille du premier jour, chaque
+    versement le premier jour de bourse du mois selon les poids cibles, et
+    le portefeuille revient aux poids cibles le premier jour de chaque
+    période ``frequence`` ("M", "Q", "Y"; None : jamais).
+
+    Entre deux rééquilibrages, chaque ligne évolue avec la croissance
+    cumulée de sa classe : la valeur en fin de période est affine en la
+    valeur de départ (``a * X + b``). La récurrence sur les périodes se
+    résout par produits et sommes cumulés, sans boucle sur les jours.
+    Retourne un DataFrame (jours x variantes).
+    """
+    poids = poids[rendements.columns]
+    w = poids.to_numpy(dtype=float)
+    w = w / w.sum(axis=1, keepdims=True)
+    r = rendements.to_numpy(dtype=float)
+    n = len(r)
+    # Croissance cumulée de chaque classe, avec un jour 0 fictif (veille du premier jour)
+    croissance = np.vstack([np.ones(r.shape[1]), np.cumprod(1 + r, axis=0)])
+    versements = np.zeros(n + 1)
+    versements[_debuts_de_periode(rendements.index, "M")] = versement_mensuel
+    # Somme des versements ramenés au jour 0 dans chaque classe
+    cumul_versements = np.cumsum(versements[:, None] / croissance, axis=0)
+
+    debuts = np.zeros(1, dtype=int)
+    if frequence is not None:
+        debuts = np.concatenate([debuts, _debuts_de_periode(rendements.index, frequence)])
+    g_debut, s_debut = croissance[debuts], cumul_versements[debuts]
+    # Valeur au rééquilibrage suivant : a * valeur au rééquilibrage + b
+    a = (croissance[debuts[1:]] / g_debut[:-1]) @ w.T
+    b = (croissance[debuts[1:]] * (cumul_versements[debuts[1:]] - s_debut[:-1])) @ w.T
+    produits = np.vstack([np.ones(len(w)), np.cumprod(a, axis=0)])
+    valeurs_debut = produits * (montant_initial + np.vstack([np.zeros(len(w)), np.cumsum(b / produits[1:], axis=0)]))
+
+    # Période de chaque jour : le jour d'un rééquilibrage clôt la période précédente
+    periode = np.maximum(np.searchsorted(debuts, np.arange(n + 1)) - 1, 0)
+    courbes = valeurs_debut[periode] * ((croissance / g_debut[periode]) @ w.T) \
+        + (croissance * (cumul_versements - s_debut[periode])) @ w.T
+    return pd.DataFrame(courbes[1:], index=rendements.index, columns=poids.index)
+
+
+def comparer(rendements, variantes, frequences=FREQUENCES, montant_initial=0.0, versement_mensuel=0.0):
+    """Courbes de chaque variante d'allocation pour chaque fréquence de rééquilibrage.
+
+    ``variantes`` : DataFrame (variantes x classes) de poids; les colonnes
+    du résultat sont « variante · fréquence ».
+    """
+    courbes = []
+    for nom, regle in frequences.items():
+        valeurs = backtester(rendements, variantes, regle, montant_initial, versement_mensuel)
+        courbes.append(valeurs.rename(columns=lambda v: f"{v} · {nom}"))
+    return pd.concat(courbes, axis=1)
+
+
+def statistiques(courbes, montant_initial=0.0, versement_mensuel=0.0):
+    """Valeur finale, total versé, rendement annualisé, volatilité et drawdown max de chaque courbe.
+
+    Le rendement et le risque sont pondérés par le temps : les versements
+    du jour sont retirés avant de calculer le rendement quotidien.
+    """
+    versements = np.zeros(len(courbes))
+    versements[_debuts_de_periode(courbes.index, "M") - 1] = versement_mensuel
+    valeurs = courbes.to_numpy()
+    precedentes = np.vstack([np.full(valeurs.shape[1], montant_initial), valeurs[:-1]])
+    with np.errstate(divide="ignore", invalid="ignore"):
+        quotidiens = np.where(precedentes > 0, (valeurs - versements[:, None]) / precedentes - 1, 0.0)
+    indice = np.cumprod(1 + quotidiens, axis=0)
+    annees = len(courbes) / JOURS_PAR_AN
+    return pd.DataFrame({
+        "Valeur finale ($)": valeurs[-1],
+        "Total versé ($)": montant_initial + versements.sum(),
+        "Rendement annualisé (%)": (indice[-1] ** (1 / annees) - 1) * 100,
+        "Volatilité (%)": quotidiens.std(axis=0) * np.sqrt(JOURS_PAR_AN) * 100,
+        "Drawdown max (%)": (indice / np.maximum.accumulate(indice, axis=0) - 1).min(axis=0) * 100,
+    }, index=courbes.columns)
@@ -0,0 +1,43 @@
+"""Débit de l'analyse par lot des profils clients selon le nombre de processus.
+
+Les profils sont synthétiques; chacun passe par l'allocation, le
+simulateur de rendement et une simulation Monte Carlo. Le rapport est
+identique quel que soit le nombre de processus (graines par ligne).
+
+Utilisation : python -m benchmarks.bench_analyse_lot [profils] [simulations]
+"""
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from analyse_lot import analyser_lot
+from benchmarks.suite import profils_synthetiques
+
+
+def main():
+    nombre = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    simulations = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+    rng = np.random.default_rng(0)
+    profils = profils_synthetiques(nombre)
+    profils["montant_initial"] = rng.integers(0, 100_000, nombre)
+    profils["investissement_mensuel"] = rng.integers(0, 2_000, nombre)
+    print(f"{nombre} profils, {simulations} simulations chacun, {os.cpu_count()} cœurs")
+
+    reference = None
+    for processus in sorted({1, 2, 4, os.cpu_count() or 1}):
+        executeur = ProcessPoolExecutor(max_workers=processus) if processus > 1 else None
+        debut = time.perf_counter()
+        rapport = analyser_lot(profils, executeur, simulations=simulations)
+        duree = time.perf_counter() - debut
+        if executeur is not None:
+            executeur.shutdown()
+        reference = rapport if reference is None else reference
+        print(f"{processus:3d} processus : {duree:7.2f} s ({nombre / duree:8.0f} profils/s)"
+              f"{'' if rapport.equals(reference) else '  (rapport différent !)'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""Durée d'une comparaison de N fonds : requêtes successives ou concurrentes avec délai.
+
+Chaque requête simulée dort une latence tirée au hasard (réseau du
+fournisseur); une requête peut ne jamais répondre. L'ancienne approche
+interroge les fonds l'un après l'autre; ``collecter`` les interroge sur un
+pool borné et abandonne une requête au-delà du délai.
+
+Utilisation : python -m benchmarks.bench_comparateur [fonds] [--bloque]
+"""
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from comparateur import collecter
+
+DELAI = 1.0
+
+
+def requete(latences, bloque):
+    def charger(ticker):
+        time.sleep(5 if ticker == bloque else latences[ticker])
+        return {"Symbole": ticker}
+    return charger
+
+
+def main():
+    fonds = int(sys.argv[1]) if len(sys.argv) > 1 and sys.argv[1].isdigit() else 10
+    rng = np.random.default_rng(0)
+    tickers = [f"FNB{i}" for i in range(fonds)]
+    latences = dict(zip(tickers, rng.uniform(0.05, 0.4, fonds)))
+    bloque = tickers[-1] if "--bloque" in sys.argv else None
+    charger = requete(latences, bloque)
+    print(f"{fonds} fonds, latence max {max(latences.values()) * 1e3:.0f} ms, "
+          f"somme {sum(latences.values()) * 1e3:.0f} ms" + (f", {bloque} ne répond pas" if bloque else ""))
+
+    if not bloque:
+        debut = time.perf_counter()
+        for ticker in tickers:
+            charger(ticker)
+        print(f"{'successif':12s}: {(time.perf_counter() - debut) * 1e3:8.0f} ms")
+
+    with ThreadPoolExecutor(max_workers=8) as executeur:
+        debut = time.perf_counter()
+        arrivees = []
+        for ticker, _, erreur in collecter(executeur, charger, tickers, DELAI):
+            arrivees.append(f"{ticker}{'!' if erreur else ''}@{(time.perf_counter() - debut) * 1e3:.0f}")
+        print(f"{'concurrent':12s}: {(time.perf_counter() - debut) * 1e3:8.0f} ms  ({' '.join(arrivees)})")
+        executeur.shutdown(wait=False, cancel_futures=True)
+
+
+if __name__ == "__main__":
+    main()
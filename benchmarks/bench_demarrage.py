@@ -0,0 +1,63 @@
+"""Démarrage à froid et coût d'une réexécution de l'application, page par page.
+
+Chaque page est chargée dans un processus neuf avec le banc d'essai de
+Streamlit (``AppTest``) : la première exécution mesure le démarrage à froid
+(imports compris), les suivantes le surcoût de chaque réexécution. Les
+bibliothèques lourdes chargées à l'issue de la première exécution sont
+listées. Les pages qui interrogent le réseau sont à éviter : leur temps
+dépend du fournisseur.
+
+Utilisation : python -m benchmarks.bench_demarrage [pages...] [--reexecutions N]
+"""
+import argparse
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+RACINE = Path(__file__).resolve().parent.parent
+LOURDES = ("matplotlib", "plotly", "yfinance", "scipy")
+
+MESURE = """
+import json, statistics, sys, time
+debut = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+from streamlit.util import calc_hash
+import_streamlit = time.perf_counter() - debut
+at = AppTest.from_file("projet5.py", default_timeout=120)
+# Page choisie par son url_path, comme le fait st.navigation
+at._page_hash = calc_hash(sys.argv[1])
+debut = time.perf_counter()
+at.run()
+froid = time.perf_counter() - debut
+modules = sorted({m.split(".")[0] for m in sys.modules} & set(sys.argv[3].split(",")))
+durees = []
+for _ in range(int(sys.argv[2])):
+    debut = time.perf_counter()
+    at.run()
+    durees.append(time.perf_counter() - debut)
+print(json.dumps({"import_streamlit": import_streamlit, "froid": froid, "reexecution": statistics.median(durees),
+                  "exceptions": len(at.exception), "modules": modules}))
+"""
+
+
+def mesurer(page, reexecutions):
+    sortie = subprocess.run([sys.executable, "-c", MESURE, page, str(reexecutions), ",".join(LOURDES)],
+                            cwd=RACINE, capture_output=True, text=True, check=True)
+    return json.loads(sortie.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parseur = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parseur.add_argument("pages", nargs="*", default=["faq", "quiz", "glossaire"])
+    parseur.add_argument("--reexecutions", type=int, default=20)
+    args = parseur.parse_args()
+    for page in args.pages:
+        r = mesurer(page, args.reexecutions)
+        print(f"{page:20s} froid {r['froid'] * 1e3:7.0f} ms (+ {r['import_streamlit'] * 1e3:4.0f} ms streamlit)  "
+              f"réexécution {r['reexecution'] * 1e3:6.1f} ms  lourdes : {', '.join(r['modules']) or '-'}"
+              + (f"  ({r['exceptions']} exceptions)" if r["exceptions"] else ""))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""Taille des graphiques Plotly envoyés au navigateur, avant et après échantillonnage.
+
+Utilisation : python -m benchmarks.bench_graphiques
+"""
+import time
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+from echantillonnage import agreger_ohlcv, choisir_granularite, reduire_serie
+from indicateurs import calculer_indicateurs
+
+# Étendues typiques : Analyse Technique sur 6 mois, Recherche d'Actions sur 5 ans et « max »
+ETENDUES = {"6_mois": 126, "5_ans": 5 * 252, "max_50_ans": 50 * 252, "max_100_ans": 100 * 252}
+
+
+def historique_synthetique(n, graine=0):
+    rng = np.random.default_rng(graine)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+    index = pd.bdate_range(end=pd.Timestamp.today().normalize(), periods=n)
+    return pd.DataFrame({
+        "Open": close * (1 + rng.normal(0, 0.002, n)),
+        "High": close * 1.01,
+        "Low": close * 0.99,
+        "Close": close,
+        "Volume": rng.integers(10**5, 10**7, n).astype(float),
+    }, index=index)
+
+
+def mesurer_figure(fig):
+    """Taille de la charge utile JSON (octets) et temps de sérialisation (s) d'une figure Plotly."""
+    debut = time.perf_counter()
+    charge = fig.to_json()
+    duree = time.perf_counter() - debut
+    return {"octets": len(charge.encode()), "serialisation_s": duree,
+            "points": sum(len(trace.x) for trace in fig.data if trace.x is not None)}
+
+
+def figure_technique(df, barres, lignes):
+    fig = go.Figure()
+    fig.add_trace(go.Candlestick(x=barres.index, open=barres["Open"], high=barres["High"],
+                                 low=barres["Low"], close=barres["Close"]))
+    fig.add_trace(go.Bar(x=barres.index, y=barres["Volume"], yaxis="y2"))
+    for nom, serie in lignes.items():
+        fig.add_trace(go.Scatter(x=serie.index, y=serie, name=nom))
+    return fig
+
+
+def main():
+    for nom, n in ETENDUES.items():
+        df = historique_synthetique(n)
+        for cle, valeurs in calculer_indicateurs(df["Close"].to_numpy()).items():
+            df[cle] = valeurs
+
+        brute = figure_technique(df, df, {c: df[c] for c in ("SMA20", "RSI", "MACD", "Signal")})
+        regle, granularite = choisir_granularite(df.index)
+        reduite = figure_technique(df, agreger_ohlcv(df, regle),
+                                   {c: reduire_serie(df[c]) for c in ("SMA20", "RSI", "MACD", "Signal")})
+
+        print(f"{nom} ({n} séances, granularité {granularite})")
+        for libelle, fig in (("brute", brute), ("échantillonnée", reduite)):
+            mesure = mesurer_figure(fig)
+            print(f"  {libelle:15s}: {mesure['points']:7d} points  {mesure['octets'] / 1024:9.1f} Kio"
+                  f"  sérialisation {mesure['serialisation_s'] * 1e3:7.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
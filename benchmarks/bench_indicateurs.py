@@ -0,0 +1,79 @@
+"""Validation et mesure du moteur d'indicateurs face aux formules pandas de l'application.
+
+Utilisation : python -m benchmarks.bench_indicateurs
+"""
+import time
+
+import numpy as np
+import pandas as pd
+
+from indicateurs import MoteurIndicateurs, calculer_indicateurs
+
+# Séries synthétiques : ~50 ans de barres journalières et un an de barres d'une minute
+SERIES = {
+    "journalier_50_ans": 50 * 252,
+    "minute_1_an": 252 * 390,
+}
+
+
+def serie_synthetique(n, graine=0):
+    rng = np.random.default_rng(graine)
+    return 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+
+
+def indicateurs_pandas(closes):
+    # Formules actuelles de l'onglet Analyse Technique
+    close = pd.Series(closes)
+    delta = close.diff()
+    gain = delta.copy()
+    gain[delta < 0] = 0
+    loss = -delta.copy()
+    loss[delta > 0] = 0
+    ema12 = close.ewm(span=12, adjust=False).mean()
+    ema26 = close.ewm(span=26, adjust=False).mean()
+    macd = ema12 - ema26
+    return {
+        "SMA20": close.rolling(window=20).mean(),
+        "RSI": 100 - (100 / (1 + gain.rolling(window=14).mean() / loss.rolling(window=14).mean())),
+        "EMA12": ema12,
+        "EMA26": ema26,
+        "MACD": macd,
+        "Signal": macd.ewm(span=9, adjust=False).mean(),
+    }
+
+
+def chronometrer(fonction, repetitions=5):
+    meilleur = float("inf")
+    for _ in range(repetitions):
+        debut = time.perf_counter()
+        fonction()
+        meilleur = min(meilleur, time.perf_counter() - debut)
+    return meilleur
+
+
+def main():
+    for nom, n in SERIES.items():
+        closes = serie_synthetique(n)
+        reference = indicateurs_pandas(closes)
+        resultats = calculer_indicateurs(closes)
+        ecart = max(np.nanmax(np.abs(resultats[k] - reference[k].to_numpy())) for k in reference)
+
+        moteur, _ = MoteurIndicateurs.depuis_historique(closes[:-100])
+        increment = moteur.etendre(closes[-100:])
+        ecart_increment = max(np.nanmax(np.abs(increment[k] - reference[k].to_numpy()[-100:])) for k in reference)
+
+        t_pandas = chronometrer(lambda: indicateurs_pandas(closes))
+        t_lot = chronometrer(lambda: calculer_indicateurs(closes))
+        moteur, _ = MoteurIndicateurs.depuis_historique(closes)
+        t_barre = chronometrer(lambda: moteur.ajouter(closes[-1]), repetitions=1000)
+
+        print(f"{nom} ({n} barres)")
+        print(f"  écart max lot / pandas         : {ecart:.2e}")
+        print(f"  écart max incrémental / pandas : {ecart_increment:.2e}")
+        print(f"  pandas                         : {t_pandas * 1e3:8.2f} ms")
+        print(f"  lot NumPy                      : {t_lot * 1e3:8.2f} ms")
+        print(f"  ajout d'une barre              : {t_barre * 1e6:8.2f} µs")
+
+
+if __name__ == "__main__":
+    main()
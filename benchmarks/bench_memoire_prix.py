@@ -0,0 +1,69 @@
+"""Mémoire retenue par session pour un même graphique : DataFrame par session ou mémoire partagée.
+
+Simule N sessions affichant le même ticker dans l'Analyse Technique.
+L'ancienne approche garde dans chaque session un DataFrame float64 avec
+les colonnes d'indicateurs; ``MemoirePrix`` sert des vues en lecture seule
+sur un bloc float32 projeté en mémoire et partage les indicateurs.
+
+Utilisation : python -m benchmarks.bench_memoire_prix [sessions]
+"""
+import sys
+import tempfile
+import tracemalloc
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+from indicateurs import calculer_indicateurs
+from memoire_prix import MemoirePrix
+
+ANNEES = 10
+
+
+class StockageSynthetique:
+    ttl_jour = 900
+
+    def lire(self, ticker, debut, fin, intervalle="1d"):
+        index = pd.bdate_range(debut, fin - timedelta(days=1), name="Date")
+        rng = np.random.default_rng(0)
+        close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, len(index))))
+        return pd.DataFrame({"Open": close, "High": close * 1.01, "Low": close * 0.99, "Close": close,
+                             "Volume": rng.integers(10**5, 10**7, len(index))}, index=index)
+
+
+def session_dataframe(stockage, debut, fin):
+    df = stockage.lire("AAPL", debut, fin).astype(float)
+    for nom, valeurs in calculer_indicateurs(df["Close"].to_numpy()).items():
+        df[nom] = valeurs
+    return df
+
+
+def session_memoire(memoire, debut, fin):
+    vue = memoire.vue("AAPL", debut, fin)
+    return vue, memoire.indicateurs("AAPL", vue)
+
+
+def mesurer(nom, fabrique, sessions):
+    tracemalloc.start()
+    retenus = [fabrique() for _ in range(sessions)]
+    actuel, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{nom:28s}: {actuel / 2**20:8.2f} Mio pour {len(retenus)} sessions "
+          f"({actuel / sessions / 1024:8.1f} Kio par session)")
+
+
+def main():
+    sessions = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    fin = date.today() + timedelta(days=1)
+    debut = fin - timedelta(days=365 * ANNEES)
+    stockage = StockageSynthetique()
+    mesurer("DataFrame par session", lambda: session_dataframe(stockage, debut, fin), sessions)
+    with tempfile.TemporaryDirectory() as dossier:
+        memoire = MemoirePrix(stockage, dossier=dossier)
+        mesurer("MemoirePrix (vues)", lambda: session_memoire(memoire, debut, fin), sessions)
+        print(f"bloc partagé : {memoire.memoire()}")
+
+
+if __name__ == "__main__":
+    main()
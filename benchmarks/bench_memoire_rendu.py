@@ -0,0 +1,76 @@
+"""Croissance de la mémoire (RSS) sur des milliers de rendus de graphiques matplotlib.
+
+Compare l'ancienne approche (``plt.subplots()`` sans fermeture, comme à
+chaque rerun des pages Suggestions et Monte Carlo) au module ``rendu``.
+
+Utilisation : python -m benchmarks.bench_memoire_rendu [nombre_de_rendus]
+"""
+import gc
+import os
+import sys
+
+import matplotlib
+
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt  # noqa: E402
+import numpy as np  # noqa: E402
+
+from rendu import camembert, eventail, rendre_png  # noqa: E402
+
+CLASSES = ["Actions canadiennes", "Actions internationales", "Obligations", "Fonds ESG", "Liquidité"]
+
+
+def rss_mio():
+    # Mémoire résidente du processus (Linux), en Mio
+    with open(f"/proc/{os.getpid()}/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+
+
+def donnees(i):
+    rng = np.random.default_rng(i)
+    tailles = rng.integers(1, 40, len(CLASSES))
+    annees = np.arange(31)
+    mediane = 10000 * 1.08 ** annees
+    bandes = {5: mediane * 0.6, 25: mediane * 0.85, 50: mediane, 75: mediane * 1.15, 95: mediane * 1.5}
+    return tailles, annees, bandes
+
+
+def rendu_pyplot(i):
+    tailles, annees, bandes = donnees(i)
+    fig, ax = plt.subplots()
+    camembert(ax, tailles, CLASSES)
+    fig.savefig(os.devnull, format="png")
+    fig, ax = plt.subplots()
+    eventail(ax, annees, bandes)
+    fig.savefig(os.devnull, format="png")
+
+
+def rendu_module(i):
+    tailles, annees, bandes = donnees(i)
+    rendre_png(camembert, tailles, CLASSES)
+    rendre_png(eventail, annees, bandes)
+
+
+def mesurer(nom, fonction, n):
+    gc.collect()
+    depart = rss_mio()
+    print(f"{nom}")
+    for i in range(1, n + 1):
+        fonction(i)
+        if i % (n // 5) == 0:
+            gc.collect()
+            print(f"  {i:6d} rendus : RSS {rss_mio():8.1f} Mio (+{rss_mio() - depart:7.1f})")
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    # Le module d'abord : la mémoire retenue par pyplot ne fausse pas sa mesure
+    mesurer("rendu (Figure hors pyplot)", rendu_module, n)
+    # Environ 3,5 Mio retenus par rendu : l'ancienne approche est bornée à 250 rendus
+    plt.rcParams["figure.max_open_warning"] = 0
+    mesurer("pyplot sans plt.close()", rendu_pyplot, min(n, 250))
+    print(f"figures retenues par pyplot : {len(plt.get_fignums())}")
+
+
+if __name__ == "__main__":
+    main()
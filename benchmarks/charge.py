@@ -0,0 +1,219 @@
+"""Test de charge : N sessions simultanées parcourent toutes les pages de l'application.
+
+Chaque session est un ``AppTest`` de Streamlit exécuté dans son propre fil;
+toutes partagent le processus, donc les caches (``st.cache_resource``,
+``st.cache_data``), le planificateur et le stockage, comme sur un serveur.
+Le fournisseur de données est rejoué depuis les cassettes, avec une latence
+artificielle : les mesures ne dépendent ni du réseau ni de Yahoo Finance.
+L'application tourne dans un dossier temporaire (base SQLite et mémoire
+des prix vides au départ).
+
+Rapport : latence des réexécutions (p50, p95, p99, max) par page et au
+total, exceptions, et mémoire résidente maximale du processus.
+
+Utilisation (dépendances : pip install -r benchmarks/requirements.txt) :
+    python -m benchmarks.charge --mode enregistrer --sessions 1       # enregistre les cassettes (réseau)
+    python -m benchmarks.charge --sessions 8 --tours 2 --latence 0.1-0.3
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from pathlib import Path
+
+import numpy as np
+
+RACINE = Path(__file__).resolve().parent.parent
+# Version de Streamlit dont les détails internes d'AppTest sont utilisés ci-dessous (voir benchmarks/requirements.txt)
+VERSION_STREAMLIT = "1.65.0"
+PAGES = ["profil", "suggestions", "simulateur", "comparateur", "optimiseur", "recherche", "faq",
+         "analyse-technique", "screener", "glossaire", "watchlist", "monte-carlo", "quiz", "cryptomonnaie"]
+
+
+class MemoireMax:
+    """Échantillonne la mémoire résidente du processus (Linux : /proc/self/statm)."""
+
+    def __init__(self, periode=0.05):
+        self.periode = periode
+        self.maximum = 0
+        self._arret = threading.Event()
+        self._fil = threading.Thread(target=self._boucle, daemon=True)
+
+    def _boucle(self):
+        page = os.sysconf("SC_PAGE_SIZE")
+        while not self._arret.is_set():
+            with open("/proc/self/statm") as f:
+                self.maximum = max(self.maximum, int(f.read().split()[1]) * page)
+            self._arret.wait(self.periode)
+
+    def __enter__(self):
+        if os.path.exists("/proc/self/statm"):
+            self._fil.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._arret.set()
+        try:
+            import resource
+        except ImportError:
+            return
+        # Repli (et borne sûre) : pic mesuré par le noyau, en Kio sous Linux, en octets sous macOS
+        pic = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        self.maximum = max(self.maximum, pic if sys.platform == "darwin" else pic * 1024)
+
+
+def verifier_streamlit():
+    """Arrête le test si AppTest n'expose plus les détails internes que remplace ``runtime_partage``.
+
+    Sans eux, les sessions se marcheraient dessus ou resteraient sur la
+    page d'accueil, et le rapport ne mesurerait qu'une partie des pages.
+    """
+    import inspect
+
+    import streamlit
+    from streamlit.runtime import Runtime
+    from streamlit.testing.v1 import app_test, local_script_runner
+
+    source = inspect.getsource(app_test)
+    manquants = [nom for nom, present in [
+        ("Runtime._instance", hasattr(Runtime, "_instance") and "Runtime._instance =" in source),
+        ("app_test.Runtime", hasattr(app_test, "Runtime")),
+        ("app_test.ScriptCache", hasattr(app_test, "ScriptCache") and "ScriptCache()" in source),
+        ("local_script_runner.ScriptCache", hasattr(local_script_runner, "ScriptCache")),
+        ("AppTest._page_hash", "self._page_hash" in source),
+    ] if not present]
+    if manquants:
+        raise SystemExit(f"Streamlit {streamlit.__version__} : détails internes d'AppTest introuvables "
+                         f"({', '.join(manquants)}). Le test de charge est prévu pour Streamlit {VERSION_STREAMLIT} : "
+                         f"pip install -r benchmarks/requirements.txt")
+
+
+def runtime_partage():
+    """Un seul runtime Streamlit pour toutes les sessions, comme sur un serveur.
+
+    ``AppTest.run`` installe un runtime simulé neuf à chaque exécution, le
+    retire à la fin et bascule l'option ``global.appTest`` le temps de
+    l'exécution : des sessions simultanées se marcheraient dessus (caches
+    perdus, état des widgets incomplet). On fixe l'option et le runtime une
+    fois pour toutes; AppTest écrit désormais dans une sous-classe. Le
+    script compilé est lui aussi partagé (un cache neuf par exécution le
+    recompilerait à chaque fois, et ``ast.parse`` n'est pas sûr entre fils
+    en Python 3.11).
+    """
+    from unittest.mock import MagicMock
+
+    from streamlit import config
+    from streamlit.runtime import Runtime
+    from streamlit.runtime.caching.storage.dummy_cache_storage import MemoryCacheStorageManager
+    from streamlit.runtime.media_file_manager import MediaFileManager
+    from streamlit.runtime.memory_media_file_storage import MemoryMediaFileStorage
+    from streamlit.testing.v1 import app_test, local_script_runner
+
+    verifier_streamlit()
+    config.set_option("global.appTest", True)
+    runtime = MagicMock(spec=Runtime)
+    runtime.media_file_mgr = MediaFileManager(MemoryMediaFileStorage("/mock/media"))
+    runtime.cache_storage_manager = MemoryCacheStorageManager()
+    if hasattr(app_test, "DataframeSourceManager"):  # Streamlit récent
+        runtime.dataframe_source_mgr = app_test.DataframeSourceManager()
+    Runtime._instance = runtime
+    app_test.Runtime = type("RuntimeSession", (Runtime,), {})
+    script = app_test.ScriptCache()
+    app_test.ScriptCache = local_script_runner.ScriptCache = lambda: script
+
+
+def session(numero, pages, tours, graine, depart, mesures, erreurs):
+    from streamlit.testing.v1 import AppTest
+    from streamlit.util import calc_hash
+
+    at = AppTest.from_file(str(RACINE / "projet5.py"), default_timeout=300)
+    ordre = random.Random(graine + numero)
+    depart.wait()
+    for tour in range(tours):
+        for page in ordre.sample(pages, len(pages)):
+            # Page choisie par son url_path, comme le fait st.navigation
+            at._page_hash = calc_hash(page)
+            debut = time.perf_counter()
+            try:
+                at.run()
+            except Exception as e:
+                erreurs.append((page, repr(e)))
+                continue
+            mesures[page].append(time.perf_counter() - debut)
+            erreurs.extend((page, str(e.value)[:200]) for e in at.exception)
+
+
+def quantiles(durees):
+    p50, p95, p99 = np.percentile(durees, [50, 95, 99]) * 1e3
+    return {"nombre": len(durees), "p50_ms": p50, "p95_ms": p95, "p99_ms": p99, "max_ms": max(durees) * 1e3}
+
+
+def main():
+    parseur = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parseur.add_argument("--sessions", type=int, default=4)
+    parseur.add_argument("--tours", type=int, default=1, help="parcours de toutes les pages par session")
+    parseur.add_argument("--pages", nargs="*", default=PAGES)
+    parseur.add_argument("--mode", choices=["rejouer", "enregistrer", "direct"], default="rejouer")
+    parseur.add_argument("--cassettes", default=str(RACINE / "donnees" / "cassettes"))
+    parseur.add_argument("--latence", default="0.05-0.2", help="latence des appels rejoués (voir cassettes.py)")
+    parseur.add_argument("--graine", type=int, default=0)
+    parseur.add_argument("--json", help="écrit aussi le rapport dans ce fichier")
+    args = parseur.parse_args()
+
+    # Le fournisseur est choisi à la création du planificateur, lors de la première exécution
+    os.environ.update(DONNEES_MODE=args.mode, DONNEES_CASSETTES=os.path.abspath(args.cassettes),
+                      DONNEES_LATENCE=args.latence)
+    sortie_json = os.path.abspath(args.json) if args.json else None
+    sys.path.insert(0, str(RACINE))
+    dossier = tempfile.mkdtemp(prefix="charge_")
+    for fichier in RACINE.glob("*.csv"):
+        shutil.copy(fichier, dossier)
+    os.chdir(dossier)
+    runtime_partage()
+
+    mesures, erreurs = defaultdict(list), []
+    depart = threading.Barrier(args.sessions)
+    fils = [threading.Thread(target=session, args=(i, args.pages, args.tours, args.graine, depart, mesures, erreurs))
+            for i in range(args.sessions)]
+    debut = time.perf_counter()
+    with MemoireMax() as memoire:
+        for fil in fils:
+            fil.start()
+        for fil in fils:
+            fil.join()
+    duree = time.perf_counter() - debut
+    shutil.rmtree(dossier, ignore_errors=True)
+
+    toutes = [d for durees in mesures.values() for d in durees]
+    if not toutes:
+        raise SystemExit(f"Aucune exécution réussie : {erreurs[:3]}")
+    rapport = {
+        "sessions": args.sessions, "tours": args.tours, "mode": args.mode, "latence": args.latence,
+        "duree_s": duree, "memoire_max_mio": memoire.maximum / 2**20, "exceptions": len(erreurs),
+        "total": quantiles(toutes), "pages": {page: quantiles(d) for page, d in sorted(mesures.items())},
+    }
+    from planificateur import obtenir_planificateur
+    rapport["fournisseur"] = dict(getattr(obtenir_planificateur().backend, "statistiques", {}))
+
+    print(f"{args.sessions} sessions x {args.tours} tour(s), {len(toutes)} réexécutions en {duree:.1f} s, "
+          f"mode {args.mode} (latence {args.latence})")
+    print(f"{'page':20s} {'n':>4s} {'p50':>9s} {'p95':>9s} {'p99':>9s} {'max':>9s}  (ms)")
+    for page, q in [*rapport["pages"].items(), ("TOTAL", rapport["total"])]:
+        print(f"{page:20s} {q['nombre']:4d} {q['p50_ms']:9.1f} {q['p95_ms']:9.1f} {q['p99_ms']:9.1f} {q['max_ms']:9.1f}")
+    print(f"mémoire résidente max : {rapport['memoire_max_mio']:.0f} Mio; exceptions : {len(erreurs)}; "
+          f"fournisseur : {rapport['fournisseur']}")
+    for page, message in erreurs[:5]:
+        print(f"  {page} : {message}")
+    if sortie_json:
+        with open(sortie_json, "w", encoding="utf-8") as f:
+            json.dump(rapport, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
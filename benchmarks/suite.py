@@ -0,0 +1,242 @@
+"""Suite de mesures des calculs de l'application, hors ligne, sur données synthétiques.
+
+Chaque cas est mesuré à plusieurs tailles d'entrée. Les résultats sont
+ajoutés à un historique JSON et comparés à une référence enregistrée :
+un cas plus lent que la référence au-delà du seuil est signalé comme une
+régression (code de sortie 1).
+
+Utilisation :
+    python -m benchmarks.suite                        # mesure et compare à la référence
+    python -m benchmarks.suite --enregistrer-reference
+    python -m benchmarks.suite --filtre indicateurs --seuil 1.5
+"""
+import argparse
+import json
+import platform
+import subprocess
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+import backtest
+import univers
+from allocation import CLASSES, CLES, OBJECTIFS, RISQUES, allocation_profil, allouer_lot
+from indicateurs import calculer_indicateurs
+from optimisation import frontiere
+from risque import CovarianceGlissante
+from screener import cribler
+from simulation import grille_scenarios, simuler_monte_carlo, simuler_rendement, taux_requis
+
+DOSSIER_RESULTATS = Path(__file__).parent / "resultats"
+HISTORIQUE = DOSSIER_RESULTATS / "historique.jsonl"
+REFERENCE = DOSSIER_RESULTATS / "reference.json"
+SEUIL_REGRESSION = 1.25
+# Écart absolu en dessous duquel un ralentissement relève du bruit de mesure
+ECART_MIN_S = 0.0005
+
+
+def prix_synthetiques(n, colonnes=1, graine=0):
+    rng = np.random.default_rng(graine)
+    return 100 * np.exp(np.cumsum(rng.normal(0.0003, 0.01, (n, colonnes)), axis=0))
+
+
+def profils_synthetiques(n, graine=0):
+    rng = np.random.default_rng(graine)
+    return pd.DataFrame({
+        "objectif": rng.choice(OBJECTIFS, n),
+        "risque": rng.choice(RISQUES, n),
+        "duree": rng.integers(1, 41, n),
+        "preference_esg": rng.choice([True, False], n),
+        "horizon_liquidite": rng.choice(["Oui", "Non"], n),
+    })[CLES]
+
+
+# Chaque cas : (nom, taille, préparation) -> la préparation retourne la fonction à chronométrer
+def cas_monte_carlo():
+    for simulations, annees in [(1_000, 10), (100_000, 30), (1_000_000, 30)]:
+        yield "monte_carlo", f"{simulations}x{annees}", lambda s=simulations, a=annees: (
+            lambda: simuler_monte_carlo(10_000, 8, 20, a, s, graine=0))
+
+
+def cas_rendement():
+    for annees in [10, 40, 100]:
+        yield "simulateur_rendement", f"{annees}_ans", lambda a=annees: (
+            lambda: simuler_rendement(10_000, 500, 5, a))
+
+
+def cas_scenarios():
+    # Grille du simulateur : 31 taux x 50 durées x n versements, puis taux requis sur durées x versements
+    taux, durees = np.arange(0, 15.5, 0.5), np.arange(1, 51)
+    for niveaux in [11, 101, 1001]:
+        yield "grille_scenarios", f"{len(taux) * len(durees) * niveaux}_scenarios", lambda n=niveaux: (
+            lambda v=np.linspace(0, 5000, n): grille_scenarios(10_000, taux, durees, v))
+    yield "taux_requis", f"{len(durees) * 101}_scenarios", lambda: (
+        lambda v=np.linspace(0, 5000, 101): taux_requis(10_000, v[None, :], durees[:, None], 1e6))
+
+
+def cas_allocation():
+    profil = {"objectif": OBJECTIFS[0], "risque": RISQUES[1], "duree": 20,
+              "preference_esg": True, "horizon_liquidite": "Non"}
+    yield "allocation_profil", "1", lambda: (lambda: allocation_profil(profil))
+    for n in [1_000, 100_000]:
+        yield "allocation_lot", str(n), lambda n=n: (lambda p=profils_synthetiques(n): allouer_lot(p))
+
+
+def cas_backtest():
+    # Répartitions des trois niveaux de risque, rejouées à toutes les fréquences de rééquilibrage
+    variantes = pd.DataFrame([[25, 25, 40, 0, 10], [30, 30, 30, 0, 10], [35, 35, 20, 0, 10]],
+                             index=RISQUES, columns=CLASSES)
+    for annees in [10, 30]:
+        def preparer(a=annees):
+            index = pd.bdate_range("1990-01-01", periods=a * 252)
+            rendements = pd.DataFrame(np.diff(np.log(prix_synthetiques(len(index) + 1, len(CLASSES))), axis=0),
+                                      index=index, columns=CLASSES)
+            return lambda: backtest.comparer(rendements, variantes, backtest.FREQUENCES, 10_000, 500)
+        yield "backtest", f"{annees}_ans", preparer
+
+
+def cas_frontiere():
+    for fonds in [33, 100]:
+        def preparer(n=fonds):
+            # Un facteur de marché commun, d'exposition variable selon le fonds
+            rng = np.random.default_rng(n)
+            rendements = rng.normal(0, 0.01, (756, 1)) * rng.uniform(0, 1.5, n) + rng.normal(0.0003, 0.006, (756, n))
+            covariance = CovarianceGlissante.depuis_rendements(pd.DataFrame(rendements), 756)
+            rendements, matrice = covariance.moyenne() * 252, covariance.covariance_retrecie()[0] * 252
+            obligations = np.arange(n) < n // 5
+            return lambda: frontiere(rendements, matrice, haut=0.3, obligations=obligations, plancher=0.2)
+        yield "frontiere", f"{fonds}_fnb", preparer
+
+
+def cas_indicateurs():
+    for barres in [252, 50 * 252, 252 * 390]:
+        yield "indicateurs", f"{barres}_barres", lambda b=barres: (
+            lambda c=prix_synthetiques(b)[:, 0]: calculer_indicateurs(c))
+    for univers in [50, 500]:
+        def preparer(u=univers):
+            prix = pd.DataFrame(prix_synthetiques(300, u), columns=[f"T{i}" for i in range(u)])
+            return lambda: cribler(prix)
+        yield "screener", f"{univers}_tickers", preparer
+
+
+def cas_csv(dossier):
+    for lignes in [500, 10_000, 100_000]:
+        def preparer(n=lignes):
+            chemin = Path(dossier) / f"tickers_{n}.csv"
+            pd.DataFrame({"Ticker": [f"T{i:06d}" for i in range(n)]}).to_csv(chemin, index=False)
+            return lambda: pd.read_csv(chemin)["Ticker"].tolist()
+        yield "chargement_csv", f"{lignes}_lignes", preparer
+    # Fichiers réels de l'application s'ils sont présents
+    for fichier in ["tickers_sp500.csv", "fnb_americains.csv"]:
+        if Path(fichier).exists():
+            yield "chargement_csv", fichier, lambda f=fichier: (lambda: pd.read_csv(f))
+
+
+def cas_univers(dossier):
+    # Index construit une fois, puis rechargé au démarrage et interrogé à chaque réexécution
+    mots = ["Apple", "Global", "Energy", "Holdings", "Bank", "Systems", "Pharma", "Capital", "Realty", "Trust"]
+    requetes = ["A", "MS", "glob", "global energy", "holdigns bnak", "pharma capital trust"]
+    for titres in [500, 10_000]:
+        rng = np.random.default_rng(titres)
+        chemin_liste = Path(dossier) / f"univers_{titres}.csv"
+        pd.DataFrame({"Ticker": [f"T{i:05d}" for i in range(titres)],
+                      "Nom": [" ".join(rng.choice(mots, 3)) + " Inc." for _ in range(titres)]}).to_csv(chemin_liste, index=False)
+        chemin = str(Path(dossier) / f"univers_{titres}.npz")
+        univers.construire({"us": str(chemin_liste)}, chemin)
+        yield "chargement_univers", f"{titres}_titres", lambda c=chemin: (lambda: univers.IndexUnivers(c))
+        yield "recherche_univers", f"{titres}_titres", lambda c=chemin: (
+            lambda index=univers.IndexUnivers(c): [index.rechercher(r) for r in requetes])
+
+
+def chronometrer(fonction, duree_min=0.2, repetitions_max=50):
+    """Temps minimal et médian (s) sur des répétitions jusqu'à ``duree_min`` secondes."""
+    fonction()  # échauffement
+    temps = []
+    debut = time.perf_counter()
+    while len(temps) < repetitions_max and (len(temps) < 3 or time.perf_counter() - debut < duree_min):
+        t = time.perf_counter()
+        fonction()
+        temps.append(time.perf_counter() - t)
+    return {"min_s": min(temps), "mediane_s": float(np.median(temps)), "repetitions": len(temps)}
+
+
+def revision_git():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def executer(filtre=None):
+    resultats = {}
+    with tempfile.TemporaryDirectory() as dossier:
+        cas = [*cas_monte_carlo(), *cas_rendement(), *cas_scenarios(), *cas_allocation(), *cas_backtest(), *cas_frontiere(),
+               *cas_indicateurs(), *cas_csv(dossier), *cas_univers(dossier)]
+        for nom, taille, preparer in cas:
+            cle = f"{nom}[{taille}]"
+            if filtre and filtre not in cle:
+                continue
+            resultats[cle] = chronometrer(preparer())
+            print(f"  {cle:45s} {resultats[cle]['min_s'] * 1e3:10.3f} ms")
+    return resultats
+
+
+def comparer(resultats, reference, seuil):
+    """Cas dont le temps minimal dépasse ``seuil`` fois celui de la référence."""
+    regressions = []
+    for cle, mesure in resultats.items():
+        if cle in reference:
+            rapport = mesure["min_s"] / reference[cle]["min_s"]
+            if rapport > seuil and mesure["min_s"] - reference[cle]["min_s"] > ECART_MIN_S:
+                regressions.append((cle, rapport))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--filtre", help="ne mesurer que les cas dont le nom contient ce texte")
+    parser.add_argument("--seuil", type=float, default=SEUIL_REGRESSION,
+                        help="rapport temps / référence au-delà duquel un cas est une régression")
+    parser.add_argument("--enregistrer-reference", action="store_true",
+                        help="enregistrer cette exécution comme nouvelle référence")
+    args = parser.parse_args()
+
+    print("Mesures (temps minimal) :")
+    resultats = executer(args.filtre)
+    execution = {
+        "date": datetime.now().isoformat(timespec="seconds"),
+        "revision": revision_git(),
+        "python": platform.python_version(),
+        "machine": platform.node(),
+        "resultats": resultats,
+    }
+    DOSSIER_RESULTATS.mkdir(exist_ok=True)
+    with open(HISTORIQUE, "a", encoding="utf-8") as f:
+        f.write(json.dumps(execution) + "\n")
+
+    if args.enregistrer_reference:
+        reference = json.loads(REFERENCE.read_text(encoding="utf-8"))["resultats"] if REFERENCE.exists() else {}
+        execution["resultats"] = {**reference, **resultats}
+        REFERENCE.write_text(json.dumps(execution, indent=2), encoding="utf-8")
+        print(f"Référence enregistrée : {REFERENCE}")
+        return 0
+    if not REFERENCE.exists():
+        print("Aucune référence : relancer avec --enregistrer-reference pour en créer une.")
+        return 0
+
+    reference = json.loads(REFERENCE.read_text(encoding="utf-8"))["resultats"]
+    regressions = comparer(resultats, reference, args.seuil)
+    for cle, rapport in regressions:
+        print(f"RÉGRESSION {cle} : {rapport:.2f} x la référence")
+    if not regressions:
+        print(f"Aucune régression (seuil {args.seuil:.2f} x).")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
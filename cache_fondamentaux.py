@@ -0,0 +1,129 @@
+import sys
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+# Durée de validité (secondes) des champs de Ticker.info selon leur fréquence de changement
+TTL_CHAMPS = {
+    "currentPrice": 60,
+    "regularMarketPrice": 60,
+    "marketCap": 900,
+    "dividendYield": 86400,
+    "totalAssets": 86400,
+    "expenseRatio": 86400,
+    "threeYearAverageReturn": 86400,
+    "longName": 7 * 86400,
+    "symbol": 7 * 86400,
+    "sector": 7 * 86400,
+    "category": 7 * 86400,
+    "longBusinessSummary": 7 * 86400,
+}
+
+
+def _taille(valeur, vus=None):
+    # Mémoire occupée par les infos, contenu imbriqué compris (listes de dirigeants, dictionnaires...)
+    vus = set() if vus is None else vus
+    if id(valeur) in vus:
+        return 0
+    vus.add(id(valeur))
+    taille = sys.getsizeof(valeur)
+    if isinstance(valeur, dict):
+        taille += sum(_taille(k, vus) + _taille(v, vus) for k, v in valeur.items())
+    elif isinstance(valeur, (list, tuple, set, frozenset)):
+        taille += sum(_taille(v, vus) for v in valeur)
+    return taille
+
+
+class _Entree:
+    __slots__ = ("valeurs", "charge_le", "taille")
+
+    def __init__(self, valeurs):
+        self.valeurs = valeurs
+        self.charge_le = time.time()
+        self.taille = _taille(valeurs)
+
+
+class CacheFondamentaux:
+    """Cache borné des données fondamentales (``Ticker.info``).
+
+    Chaque champ a sa propre durée de validité. Une entrée périmée est
+    servie immédiatement et rafraîchie en arrière-plan. Les entrées les
+    moins récemment utilisées sont évincées au-delà de ``max_entrees``
+    ou de ``memoire_max`` octets.
+    """
+
+    def __init__(self, charger, ttl_champs=None, ttl_defaut=3600, max_entrees=500,
+                 memoire_max=32 * 2**20, travailleurs=2):
+        self.charger = charger
+        self.ttl_champs = TTL_CHAMPS if ttl_champs is None else ttl_champs
+        self.ttl_defaut = ttl_defaut
+        self.max_entrees = max_entrees
+        self.memoire_max = memoire_max
+        self._entrees = OrderedDict()
+        self._memoire = 0
+        self._en_cours = set()
+        self._verrou = threading.Lock()
+        self._executeur = ThreadPoolExecutor(max_workers=travailleurs, thread_name_prefix="fondamentaux")
+        self._compteurs = {"succes": 0, "echecs": 0, "perimes": 0, "rafraichissements": 0,
+                           "erreurs_rafraichissement": 0, "evictions": 0}
+
+    def _perimee(self, entree, champs):
+        age = time.time() - entree.charge_le
+        if champs is None:
+            champs = entree.valeurs.keys()
+        return any(age > self.ttl_champs.get(c, self.ttl_defaut) for c in champs)
+
+    def _stocker(self, ticker, valeurs):
+        entree = _Entree(valeurs)
+        with self._verrou:
+            ancienne = self._entrees.pop(ticker, None)
+            if ancienne is not None:
+                self._memoire -= ancienne.taille
+            self._entrees[ticker] = entree
+            self._memoire += entree.taille
+            while len(self._entrees) > 1 and (len(self._entrees) > self.max_entrees
+                                              or self._memoire > self.memoire_max):
+                _, evincee = self._entrees.popitem(last=False)
+                self._memoire -= evincee.taille
+                self._compteurs["evictions"] += 1
+
+    def _rafraichir(self, ticker):
+        try:
+            self._stocker(ticker, self.charger(ticker))
+            with self._verrou:
+                self._compteurs["rafraichissements"] += 1
+        except Exception:
+            with self._verrou:
+                self._compteurs["erreurs_rafraichissement"] += 1
+        finally:
+            with self._verrou:
+                self._en_cours.discard(ticker)
+
+    def obtenir(self, ticker, champs=None):
+        """Infos de ``ticker``. Seuls les ``champs`` demandés sont pris en compte pour la péremption."""
+        with self._verrou:
+            entree = self._entrees.get(ticker)
+            if entree is not None:
+                self._entrees.move_to_end(ticker)
+                self._compteurs["succes"] += 1
+                if self._perimee(entree, champs):
+                    # Servie périmée; un seul rafraîchissement à la fois par ticker
+                    self._compteurs["perimes"] += 1
+                    if ticker not in self._en_cours:
+                        self._en_cours.add(ticker)
+                        self._executeur.submit(self._rafraichir, ticker)
+                return entree.valeurs
+            self._compteurs["echecs"] += 1
+        valeurs = self.charger(ticker)
+        self._stocker(ticker, valeurs)
+        return valeurs
+
+    def statistiques(self):
+        with self._verrou:
+            stats = dict(self._compteurs)
+            stats["entrees"] = len(self._entrees)
+            stats["memoire"] = self._memoire
+        total = stats["succes"] + stats["echecs"]
+        stats["taux_succes"] = stats["succes"] / total if total else 0.0
+        return stats
@@ -0,0 +1,227 @@
+import hashlib
+import json
+import os
+import pickle
+import re
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from planificateur import _extraire
+
+# Mode du fournisseur de données, choisi par variable d'environnement :
+#   DONNEES_MODE      direct (défaut), enregistrer ou rejouer
+#   DONNEES_CASSETTES dossier des cassettes (défaut : donnees/cassettes)
+#   DONNEES_LATENCE   latence ajoutée à chaque appel rejoué : secondes (0.2), intervalle (0.1-0.5)
+#                     ou « enregistree » (durée moyenne mesurée à l'enregistrement)
+DOSSIER = "donnees/cassettes"
+MODES = ("direct", "enregistrer", "rejouer")
+
+# Paramètres sans effet sur les données, et bornes appliquées au moment de la relecture
+IGNORES = {"progress", "threads"}
+BORNES = {"start", "end", "period"}
+
+
+def _chemin(methode, ticker, params):
+    stables = {k: v for k, v in params.items() if k not in IGNORES | BORNES}
+    empreinte = hashlib.sha1(json.dumps(stables, sort_keys=True, default=str).encode()).hexdigest()[:12]
+    return os.path.join(methode, f"{re.sub(r'[^A-Za-z0-9]', '_', ticker)}_{empreinte}.pkl")
+
+
+def _horodatage(valeur, index):
+    # Borne comparable à l'index (avec ou sans fuseau horaire)
+    borne = pd.Timestamp(valeur)
+    if index.tz is not None and borne.tz is None:
+        return borne.tz_localize(index.tz)
+    if index.tz is None and borne.tz is not None:
+        return borne.tz_convert(None)
+    return borne
+
+
+def _duree_periode(periode):
+    nombre, unite = re.fullmatch(r"(\d+)(d|wk|mo|y)", periode).groups()
+    return pd.Timedelta(days=int(nombre) * {"d": 1, "wk": 7, "mo": 30, "y": 365}[unite])
+
+
+def borner(barres, params):
+    """Barres enregistrées restreintes à [start, end) ou à la dernière ``period``, comme la requête."""
+    if barres.empty:
+        return barres
+    if params.get("start") is not None:
+        barres = barres[barres.index >= _horodatage(params["start"], barres.index)]
+    if params.get("end") is not None:
+        barres = barres[barres.index < _horodatage(params["end"], barres.index)]
+    periode = params.get("period")
+    if periode and periode not in ("max", "ytd") and not barres.empty:
+        barres = barres[barres.index > barres.index[-1] - _duree_periode(periode)]
+    elif periode == "ytd" and not barres.empty:
+        barres = barres[barres.index.year == barres.index[-1].year]
+    return barres
+
+
+class Cassettes:
+    """Réponses enregistrées du fournisseur : un fichier par méthode, ticker et jeu de paramètres.
+
+    Les barres d'un même ticker et des mêmes paramètres (intervalle, ajustement)
+    sont fusionnées d'un enregistrement à l'autre, quelles que soient les
+    dates demandées : la relecture découpe ensuite la plage voulue. Le
+    regroupement des tickers en un téléchargement n'a donc pas à être
+    identique entre l'enregistrement et la relecture.
+    """
+
+    def __init__(self, dossier=DOSSIER):
+        self.dossier = dossier
+        self._verrou = threading.RLock()
+        self._memoire = {}
+
+    def lire(self, chemin):
+        with self._verrou:
+            if chemin not in self._memoire:
+                complet = os.path.join(self.dossier, chemin)
+                contenu = None
+                if os.path.exists(complet):
+                    with open(complet, "rb") as f:
+                        contenu = pickle.load(f)
+                self._memoire[chemin] = contenu
+            return self._memoire[chemin]
+
+    def ecrire(self, chemin, modifier):
+        """Applique ``modifier(contenu ou None) -> contenu`` et enregistre le résultat (écriture atomique)."""
+        complet = os.path.join(self.dossier, chemin)
+        with self._verrou:
+            contenu = modifier(self.lire(chemin))
+            os.makedirs(os.path.dirname(complet), exist_ok=True)
+            temporaire = f"{complet}.{threading.get_ident()}.tmp"
+            with open(temporaire, "wb") as f:
+                pickle.dump(contenu, f)
+            os.replace(temporaire, complet)
+            self._memoire[chemin] = contenu
+
+
+class BackendEnregistreur:
+    """Enveloppe un backend (ou un fournisseur) et enregistre chacune de ses réponses."""
+
+    def __init__(self, backend, dossier=DOSSIER):
+        self.backend = backend
+        self.cassettes = Cassettes(dossier)
+        self.statistiques = {"enregistrements": 0}
+
+    def _barres(self, methode, ticker, params, barres, duree):
+        def fusionner(contenu):
+            contenu = contenu or {"params": params, "barres": pd.DataFrame(), "durees": []}
+            if not barres.empty:
+                anciennes = contenu["barres"]
+                toutes = pd.concat([anciennes, barres]) if not anciennes.empty else barres
+                contenu["barres"] = toutes[~toutes.index.duplicated(keep="last")].sort_index()
+            contenu["durees"] = (contenu["durees"] + [duree])[-100:]
+            return contenu
+        self.cassettes.ecrire(_chemin(methode, ticker, params), fusionner)
+        self.statistiques["enregistrements"] += 1
+
+    def telecharger(self, tickers, **params):
+        debut = time.perf_counter()
+        df = self.backend.telecharger(tickers, **params)
+        duree = time.perf_counter() - debut
+        for ticker in tickers:
+            self._barres("telecharger", ticker, params, _extraire(df, ticker), duree)
+        return df
+
+    def historique(self, ticker, debut, fin, intervalle="1d"):
+        depart = time.perf_counter()
+        df = self.backend.historique(ticker, debut, fin, intervalle)
+        self._barres("historique", ticker, {"interval": intervalle}, df if df is not None else pd.DataFrame(),
+                     time.perf_counter() - depart)
+        return df
+
+    def infos(self, ticker):
+        debut = time.perf_counter()
+        infos = self.backend.infos(ticker)
+        duree = time.perf_counter() - debut
+        self.cassettes.ecrire(_chemin("infos", ticker, {}), lambda _: {"infos": infos, "durees": [duree]})
+        self.statistiques["enregistrements"] += 1
+        return infos
+
+
+class BackendRejoueur:
+    """Sert les réponses enregistrées, avec une latence artificielle, sans accès réseau.
+
+    ``latence`` : secondes, intervalle ``(min, max)`` tiré uniformément, ou
+    ``"enregistree"`` pour la durée moyenne mesurée à l'enregistrement. Un
+    ticker sans cassette est traité comme un ticker inconnu du fournisseur
+    (barres vides, infos vides) et compté dans ``statistiques``.
+    """
+
+    def __init__(self, dossier=DOSSIER, latence=0.0, graine=0):
+        self.cassettes = Cassettes(dossier)
+        self.latence = latence
+        self._rng = np.random.default_rng(graine)
+        self._verrou = threading.Lock()
+        self.statistiques = {"appels": 0, "manquantes": 0}
+
+    def _attendre(self, contenus):
+        if self.latence == "enregistree":
+            durees = [d for c in contenus for d in c["durees"]]
+            delai = float(np.mean(durees)) if durees else 0.0
+        elif isinstance(self.latence, tuple):
+            with self._verrou:
+                delai = self._rng.uniform(*self.latence)
+        else:
+            delai = self.latence
+        if delai > 0:
+            time.sleep(delai)
+
+    def _lire(self, methode, ticker, params):
+        contenu = self.cassettes.lire(_chemin(methode, ticker, params))
+        with self._verrou:
+            self.statistiques["appels"] += 1
+            if contenu is None:
+                self.statistiques["manquantes"] += 1
+        return contenu
+
+    def telecharger(self, tickers, **params):
+        contenus = {t: self._lire("telecharger", t, params) for t in tickers}
+        contenus = {t: c for t, c in contenus.items() if c is not None}
+        self._attendre(contenus.values())
+        barres = {t: borner(c["barres"], params) for t, c in contenus.items()}
+        barres = {t: b for t, b in barres.items() if not b.empty}
+        if not barres:
+            return pd.DataFrame()
+        # Même forme que yf.download : colonnes (Price, Ticker)
+        return pd.concat(barres, axis=1, names=["Ticker", "Price"]).swaplevel(axis=1)
+
+    def historique(self, ticker, debut, fin, intervalle="1d"):
+        contenu = self._lire("historique", ticker, {"interval": intervalle})
+        self._attendre([contenu] if contenu else [])
+        return pd.DataFrame() if contenu is None else borner(contenu["barres"], {"start": debut, "end": fin})
+
+    def infos(self, ticker):
+        contenu = self._lire("infos", ticker, {})
+        self._attendre([contenu] if contenu else [])
+        return {} if contenu is None else dict(contenu["infos"])
+
+
+def lire_latence(texte):
+    """« 0.2 » -> 0.2, « 0.1-0.5 » -> (0.1, 0.5), « enregistree » inchangé."""
+    texte = texte.strip()
+    if texte == "enregistree":
+        return texte
+    if "-" in texte:
+        bas, haut = texte.split("-", 1)
+        return float(bas), float(haut)
+    return float(texte)
+
+
+def selon_environnement(backend, environ=None):
+    """``backend`` tel quel, enregistré ou remplacé par ses cassettes, selon ``DONNEES_MODE``."""
+    environ = os.environ if environ is None else environ
+    mode = environ.get("DONNEES_MODE", "direct")
+    dossier = environ.get("DONNEES_CASSETTES", DOSSIER)
+    if mode not in MODES:
+        raise ValueError(f"DONNEES_MODE inconnu : {mode} (attendu : {', '.join(MODES)})")
+    if mode == "enregistrer":
+        return BackendEnregistreur(backend, dossier)
+    if mode == "rejouer":
+        return BackendRejoueur(dossier, lire_latence(environ.get("DONNEES_LATENCE", "0")))
+    return backend
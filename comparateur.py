@@ -0,0 +1,100 @@
+import contextvars
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, wait
+
+
+class AppelsEnVol:
+    """Appels en cours d'une même fonction, par élément, partagés entre les appels à ``collecter``.
+
+    Un appel abandonné après le délai continue de s'exécuter sur son fil :
+    une nouvelle demande du même élément attend cet appel au lieu d'en
+    soumettre un second. Un élément qui ne répond pas n'occupe donc jamais
+    plus d'un fil du pool, quel que soit le nombre de comparaisons qui le
+    demandent. Un appel encore en file n'est annulé que lorsque tous ses
+    demandeurs l'ont abandonné.
+    """
+
+    def __init__(self):
+        self._verrou = threading.RLock()
+        self._appels = {}
+
+    def __len__(self):
+        with self._verrou:
+            return len(self._appels)
+
+    def soumettre(self, element, creer):
+        """Futur de l'appel en cours pour ``element``, ou du nouvel appel retourné par ``creer()``."""
+        with self._verrou:
+            appel = self._appels.get(element)
+            if appel is None:
+                futur = creer()
+                appel = self._appels[element] = [futur, 0]
+                # Sous le verrou (réentrant) : un appel déjà terminé est retiré aussitôt
+                futur.add_done_callback(lambda f: self._retirer(element, f))
+            appel[1] += 1
+            return appel[0]
+
+    def abandonner(self, element, futur):
+        with self._verrou:
+            appel = self._appels.get(element)
+            if appel is None or appel[0] is not futur:
+                return
+            appel[1] -= 1
+            if appel[1] <= 0:
+                futur.cancel()
+
+    def _retirer(self, element, futur):
+        with self._verrou:
+            if element in self._appels and self._appels[element][0] is futur:
+                del self._appels[element]
+
+
+def collecter(executeur, fonction, elements, delai, en_vol=None):
+    """Applique ``fonction`` à chaque élément sur ``executeur`` et produit les résultats dans l'ordre d'arrivée.
+
+    Produit des triplets ``(element, resultat, erreur)``, ``erreur`` valant
+    None en cas de succès. Chaque appel dispose de ``delai`` secondes à
+    partir de son démarrage (ou de sa soumission s'il attend encore un fil
+    libre, ou s'il était déjà en cours); au-delà, il est abandonné avec une
+    ``TimeoutError`` : un appel en file est annulé, un appel en cours se
+    termine en arrière-plan sans bloquer l'appelant. Avec ``en_vol``
+    (``AppelsEnVol`` propre à ``fonction``), un élément dont l'appel tourne
+    encore n'est pas soumis à nouveau. Les éléments doivent être distincts
+    et hachables. Chaque appel s'exécute dans une copie du contexte de
+    l'appelant (page et session de l'instrumentation).
+    """
+    debuts = {}
+
+    def executer(element):
+        debuts[element] = time.monotonic()
+        return fonction(element)
+
+    def soumettre(element):
+        def creer():
+            return executeur.submit(contextvars.copy_context().run, executer, element)
+        return creer() if en_vol is None else en_vol.soumettre(element, creer)
+
+    soumis = time.monotonic()
+    futurs = {soumettre(e): e for e in elements}
+    en_attente = set(futurs)
+    while en_attente:
+        echeance = min(debuts.get(futurs[f], soumis) for f in en_attente) + delai
+        faits, en_attente = wait(en_attente, timeout=max(echeance - time.monotonic(), 0),
+                                 return_when=FIRST_COMPLETED)
+        for futur in faits:
+            if futur.cancelled():
+                yield futurs[futur], None, TimeoutError(f"aucune réponse après {delai:g} s")
+                continue
+            erreur = futur.exception()
+            yield futurs[futur], None if erreur else futur.result(), erreur
+        maintenant = time.monotonic()
+        # Un appel terminé juste après l'attente sera produit au tour suivant
+        en_retard = [f for f in en_attente if not f.done() and maintenant - debuts.get(futurs[f], soumis) >= delai]
+        for futur in en_retard:
+            en_attente.discard(futur)
+            if en_vol is None:
+                futur.cancel()
+            else:
+                en_vol.abandonner(futurs[futur], futur)
+            yield futurs[futur], None, TimeoutError(f"aucune réponse après {delai:g} s")
\ No newline at end of file
@@ -0,0 +1,103 @@
+import numpy as np
+import pandas as pd
+
+# Plafonds de points envoyés au navigateur par graphique
+MAX_CHANDELIERS = 500
+MAX_POINTS_LIGNE = 1500
+
+# Granularités possibles, de la plus fine à la plus grossière (règle de resample, libellé)
+GRANULARITES = [(None, "journalière"), ("W-FRI", "hebdomadaire"), ("ME", "mensuelle"), ("QE", "trimestrielle"),
+                ("YE", "annuelle")]
+
+AGREGATION_OHLCV = {"Open": "first", "High": "max", "Low": "min", "Close": "last", "Volume": "sum"}
+
+
+def _nombre_barres(index, regle):
+    # Périodes non vides d'un index trié, comme les garde agreger_ohlcv (sans passer par resample)
+    if regle == "W-FRI":
+        # Semaines du samedi au vendredi; le 3 janvier 1970 (jour 2) est un samedi
+        cles = (index.as_unit("ns").asi8 // 86_400_000_000_000 - 2) // 7
+    elif regle == "ME":
+        cles = index.year * 12 + index.month
+    elif regle == "QE":
+        cles = index.year * 4 + (index.month - 1) // 3
+    elif regle == "YE":
+        cles = index.year
+    else:
+        return int((pd.Series(1, index=index).resample(regle).count() > 0).sum())
+    return int(np.count_nonzero(np.diff(np.asarray(cles)))) + 1
+
+
+def choisir_granularite(index, max_barres=MAX_CHANDELIERS):
+    """Règle de resample et libellé selon l'étendue visible, de la séance à l'année.
+
+    La granularité la plus fine qui tient dans ``max_barres`` est retenue;
+    au-delà d'une barre par an, les barres regroupent plusieurs années :
+    le plafond est toujours respecté.
+    """
+    if len(index) <= max_barres:
+        return GRANULARITES[0]
+    for regle, libelle in GRANULARITES[1:]:
+        if _nombre_barres(index, regle) <= max_barres:
+            return regle, libelle
+    annees = -(-(index[-1].year - index[0].year + 1) // max_barres)
+    while _nombre_barres(index, f"{annees}YE") > max_barres:
+        annees += 1
+    return f"{annees}YE", "pluriannuelle"
+
+
+def agreger_ohlcv(df, regle):
+    """Barres OHLCV agrégées selon ``regle``; les autres colonnes (indicateurs calculés
+    en pleine résolution) gardent leur valeur de fin de période.
+
+    Chaque barre est datée de la dernière séance de sa période.
+    """
+    if regle is None or df.empty:
+        return df
+    agregation = {c: AGREGATION_OHLCV.get(c, "last") for c in df.columns}
+    groupes = df.resample(regle)
+    resultat = groupes.agg(agregation)
+    resultat.index = df.index.to_series().resample(regle).last()
+    return resultat[resultat.index.notna()]
+
+
+def lttb(x, y, seuil):
+    """Indices retenus par l'algorithme Largest-Triangle-Three-Buckets.
+
+    ``x`` et ``y`` sont des tableaux numériques sans valeurs manquantes. Le
+    premier et le dernier point sont toujours conservés; dans chaque seau,
+    on garde le point formant le plus grand triangle avec le point retenu
+    précédemment et la moyenne du seau suivant.
+    """
+    n = len(x)
+    if seuil >= n or seuil < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    bornes = np.linspace(1, n - 1, seuil - 1).astype(int)
+    # Moyennes de tous les seaux calculées d'un coup; seul le choix du point est séquentiel
+    tailles = np.diff(bornes)
+    moyennes_x = np.add.reduceat(x[1:n - 1], bornes[:-1] - 1) / tailles
+    moyennes_y = np.add.reduceat(y[1:n - 1], bornes[:-1] - 1) / tailles
+    moyennes_x = np.append(moyennes_x[1:], x[-1])
+    moyennes_y = np.append(moyennes_y[1:], y[-1])
+    indices = np.empty(seuil, dtype=np.int64)
+    indices[0], indices[-1] = 0, n - 1
+    precedent = 0
+    for i in range(seuil - 2):
+        debut, fin = bornes[i], bornes[i + 1]
+        ax, ay = x[precedent], y[precedent]
+        aires = np.abs((ax - moyennes_x[i]) * (y[debut:fin] - ay) - (ax - x[debut:fin]) * (moyennes_y[i] - ay))
+        precedent = debut + int(np.argmax(aires))
+        indices[i + 1] = precedent
+    return indices
+
+
+def reduire_serie(serie, max_points=MAX_POINTS_LIGNE):
+    """Série (index de dates) ramenée à au plus ``max_points`` points par LTTB."""
+    serie = serie.dropna()
+    if len(serie) <= max_points:
+        return serie
+    x = serie.index.as_unit("ns").asi8 if isinstance(serie.index, pd.DatetimeIndex) else np.arange(len(serie))
+    return serie.iloc[lttb(x, serie.to_numpy(dtype=float), max_points)]
+
@@ -0,0 +1,243 @@
+from collections import deque
+
+import numpy as np
+
+# Les fonctions « par lot » acceptent un tableau 1-D ou 2-D (dates x tickers)
+# et calculent le long de l'axe 0, avec les mêmes conventions que pandas :
+# rolling(n).mean() et ewm(span=n, adjust=False).mean().
+
+
+def sma(x, n):
+    x = np.asarray(x, dtype=float)
+    manquants = np.isnan(x)
+    if x.shape[0] < n:
+        return np.full(x.shape, np.nan)
+    # Centrer avant la somme cumulée limite l'erreur d'arrondi sur les longues séries
+    with np.errstate(invalid="ignore"):
+        centre = np.nan_to_num(np.nanmean(x, axis=0)) if manquants.any() else x.mean(axis=0)
+    sommes = np.cumsum(np.where(manquants, 0.0, x - centre), axis=0)
+    nb_manquants = np.cumsum(manquants, axis=0)
+    resultat = np.full(x.shape, np.nan)
+    fenetre = sommes[n - 1:].copy()
+    fenetre[1:] -= sommes[:-n]
+    manquants_fenetre = nb_manquants[n - 1:].copy()
+    manquants_fenetre[1:] -= nb_manquants[:-n]
+    resultat[n - 1:] = np.where(manquants_fenetre == 0, fenetre / n + centre, np.nan)
+    return resultat
+
+
+def _recurrence(u, facteur, initial):
+    # y[t] = facteur * y[t-1] + u[t]. Chaque bloc est résolu en forme fermée (tous les
+    # blocs à la fois); la taille des blocs borne facteur^-k pour garder la précision.
+    # Les valeurs de fin de bloc suivent la même récurrence, résolue récursivement.
+    n = u.shape[0]
+    taille = int(np.log(1e3) / -np.log(facteur)) if 0 < facteur < 1 else 1
+    if taille < 2 or n < 2:
+        y = np.empty_like(u)
+        precedent = initial
+        for t in range(n):
+            precedent = facteur * precedent + u[t]
+            y[t] = precedent
+        return y
+    nb_blocs = -(-n // taille)
+    blocs = np.zeros((nb_blocs * taille,) + u.shape[1:])
+    blocs[:n] = u
+    blocs = blocs.reshape((nb_blocs, taille) + u.shape[1:])
+    puissances = (facteur ** np.arange(taille)).reshape((1, taille) + (1,) * (u.ndim - 1))
+    local = puissances * np.cumsum(blocs / puissances, axis=1)
+    fins = _recurrence(local[:, -1], facteur ** taille, initial)
+    precedents = np.concatenate([np.broadcast_to(initial, (1,) + u.shape[1:]), fins[:-1]])
+    y = local + facteur * puissances * precedents[:, None]
+    return y.reshape((nb_blocs * taille,) + u.shape[1:])[:n]
+
+
+def _lissage_exponentiel(x, alpha, initial):
+    # y[t] = (1 - alpha) * y[t-1] + alpha * x[t]
+    return _recurrence(alpha * x, 1 - alpha, initial)
+
+
+def _premiere_valeur(x):
+    # Index de la première valeur non manquante (par colonne)
+    valides = ~np.isnan(x)
+    return np.where(valides.any(axis=0), valides.argmax(axis=0), x.shape[0])
+
+
+def ema(x, span=None, alpha=None):
+    x = np.asarray(x, dtype=float)
+    alpha = 2 / (span + 1) if alpha is None else alpha
+    if x.shape[0] == 0:
+        return x.copy()
+    # Les valeurs manquantes initiales prennent la première valeur connue, puis sont remasquées
+    premiere = _premiere_valeur(x)
+    rempli = x.copy()
+    lignes = np.arange(x.shape[0]).reshape((-1,) + (1,) * (x.ndim - 1))
+    avant = lignes < premiere
+    if avant.any():
+        indices = np.expand_dims(np.minimum(premiere, x.shape[0] - 1), 0)
+        rempli = np.where(avant, np.take_along_axis(x, indices, axis=0)[0], x)
+    resultat = _lissage_exponentiel(rempli, alpha, rempli[0])
+    resultat[avant] = np.nan
+    return resultat
+
+
+def rsi(x, n=14, lissage="simple"):
+    """RSI sur ``n`` périodes. ``lissage="simple"`` reproduit la moyenne mobile
+    de l'application, ``"wilder"`` utilise le lissage de Wilder."""
+    x = np.asarray(x, dtype=float)
+    delta = np.full(x.shape, np.nan)
+    delta[1:] = x[1:] - x[:-1]
+    gain = np.where(delta > 0, delta, np.where(np.isnan(delta), np.nan, 0.0))
+    perte = np.where(delta < 0, -delta, np.where(np.isnan(delta), np.nan, 0.0))
+    moyenne_gain = sma(gain, n)
+    moyenne_perte = sma(perte, n)
+    if lissage == "wilder" and x.shape[0] > n + 1:
+        # Amorçage par la moyenne simple des n premières variations, puis alpha = 1/n
+        moyenne_gain[n + 1:] = _lissage_exponentiel(np.nan_to_num(gain[n + 1:]), 1 / n, moyenne_gain[n])
+        moyenne_perte[n + 1:] = _lissage_exponentiel(np.nan_to_num(perte[n + 1:]), 1 / n, moyenne_perte[n])
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rs = moyenne_gain / moyenne_perte
+        return 100 - 100 / (1 + rs)
+
+
+def macd(x, rapide=12, lent=26, signal=9):
+    ema_rapide = ema(x, rapide)
+    ema_lente = ema(x, lent)
+    ligne = ema_rapide - ema_lente
+    return ema_rapide, ema_lente, ligne, ema(ligne, signal)
+
+
+def calculer_indicateurs(closes, fenetre_sma=20, fenetre_rsi=14, lissage_rsi="simple"):
+    """Tous les indicateurs de l'onglet Analyse Technique, en mode lot."""
+    ema12, ema26, ligne_macd, ligne_signal = macd(closes)
+    return {
+        "SMA20": sma(closes, fenetre_sma),
+        "RSI": rsi(closes, fenetre_rsi, lissage_rsi),
+        "EMA12": ema12,
+        "EMA26": ema26,
+        "MACD": ligne_macd,
+        "Signal": ligne_signal,
+    }
+
+
+class MoteurIndicateurs:
+    """Calcul incrémental des indicateurs : chaque nouvelle barre coûte O(1).
+
+    L'état (sommes glissantes, dernières EMA, lissage de Wilder) permet
+    d'ajouter des barres sans recalculer l'historique.
+    """
+
+    def __init__(self, fenetre_sma=20, fenetre_rsi=14, lissage_rsi="simple"):
+        self.fenetre_sma = fenetre_sma
+        self.fenetre_rsi = fenetre_rsi
+        self.lissage_rsi = lissage_rsi
+        self._closes = deque(maxlen=fenetre_sma)
+        self._somme_closes = 0.0
+        self._gains = deque(maxlen=fenetre_rsi)
+        self._pertes = deque(maxlen=fenetre_rsi)
+        self._somme_gains = 0.0
+        self._somme_pertes = 0.0
+        self._moyenne_gain = None
+        self._moyenne_perte = None
+        self._dernier_close = None
+        self._ema12 = None
+        self._ema26 = None
+        self._signal = None
+        self.nb_barres = 0
+
+    def _glisser(self, fenetre, somme, valeur):
+        if len(fenetre) == fenetre.maxlen:
+            somme -= fenetre[0]
+        fenetre.append(valeur)
+        somme += valeur
+        # Recalcul exact périodique pour éviter la dérive des arrondis
+        if self.nb_barres % 4096 == 0:
+            somme = sum(fenetre)
+        return somme
+
+    def ajouter(self, close):
+        close = float(close)
+        self.nb_barres += 1
+        self._somme_closes = self._glisser(self._closes, self._somme_closes, close)
+        sma20 = self._somme_closes / self.fenetre_sma if len(self._closes) == self.fenetre_sma else np.nan
+
+        rsi_valeur = np.nan
+        if self._dernier_close is not None:
+            delta = close - self._dernier_close
+            gain, perte = max(delta, 0.0), max(-delta, 0.0)
+            n = self.fenetre_rsi
+            if self.lissage_rsi == "wilder" and self._moyenne_gain is not None:
+                self._moyenne_gain = (self._moyenne_gain * (n - 1) + gain) / n
+                self._moyenne_perte = (self._moyenne_perte * (n - 1) + perte) / n
+            else:
+                self._somme_gains = self._glisser(self._gains, self._somme_gains, gain)
+                self._somme_pertes = self._glisser(self._pertes, self._somme_pertes, perte)
+                if len(self._gains) == n:
+                    self._moyenne_gain = self._somme_gains / n
+                    self._moyenne_perte = self._somme_pertes / n
+            if self._moyenne_gain is not None:
+                with np.errstate(divide="ignore", invalid="ignore"):
+                    rs = np.float64(self._moyenne_gain) / self._moyenne_perte
+                    rsi_valeur = float(100 - 100 / (1 + rs))
+        self._dernier_close = close
+
+        if self._ema12 is None:
+            self._ema12 = self._ema26 = close
+            self._signal = 0.0
+        else:
+            self._ema12 += 2 / 13 * (close - self._ema12)
+            self._ema26 += 2 / 27 * (close - self._ema26)
+            self._signal += 2 / 10 * ((self._ema12 - self._ema26) - self._signal)
+        return {
+            "SMA20": sma20,
+            "RSI": rsi_valeur,
+            "EMA12": self._ema12,
+            "EMA26": self._ema26,
+            "MACD": self._ema12 - self._ema26,
+            "Signal": self._signal,
+        }
+
+    def etendre(self, closes):
+        """Ajoute une série de barres et retourne les indicateurs correspondants (tableaux)."""
+        lignes = [self.ajouter(c) for c in closes]
+        return {cle: np.array([ligne[cle] for ligne in lignes]) for cle in
+                ("SMA20", "RSI", "EMA12", "EMA26", "MACD", "Signal")}
+
+    @classmethod
+    def depuis_historique(cls, closes, **options):
+        """Construit l'état à partir d'un historique complet calculé en mode lot."""
+        moteur = cls(**options)
+        closes = np.asarray(closes, dtype=float)
+        resultats = calculer_indicateurs(closes, moteur.fenetre_sma, moteur.fenetre_rsi, moteur.lissage_rsi)
+        if len(closes) == 0:
+            return moteur, resultats
+        moteur.nb_barres = len(closes)
+        moteur._closes.extend(closes[-moteur.fenetre_sma:])
+        moteur._somme_closes = float(np.sum(closes[-moteur.fenetre_sma:]))
+        deltas = np.diff(closes)[-moteur.fenetre_rsi:]
+        moteur._gains.extend(np.maximum(deltas, 0.0))
+        moteur._pertes.extend(np.maximum(-deltas, 0.0))
+        moteur._somme_gains = float(sum(moteur._gains))
+        moteur._somme_pertes = float(sum(moteur._pertes))
+        if len(closes) > moteur.fenetre_rsi:
+            if moteur.lissage_rsi == "wilder":
+                # Les moyennes de Wilder ne se déduisent pas de la fenêtre : on les recalcule
+                moyenne_gain, moyenne_perte = _moyennes_wilder(closes, moteur.fenetre_rsi)
+                moteur._moyenne_gain, moteur._moyenne_perte = moyenne_gain, moyenne_perte
+            else:
+                moteur._moyenne_gain = moteur._somme_gains / moteur.fenetre_rsi
+                moteur._moyenne_perte = moteur._somme_pertes / moteur.fenetre_rsi
+        moteur._dernier_close = float(closes[-1])
+        moteur._ema12 = float(resultats["EMA12"][-1])
+        moteur._ema26 = float(resultats["EMA26"][-1])
+        moteur._signal = float(resultats["Signal"][-1])
+        return moteur, resultats
+
+
+def _moyennes_wilder(closes, n):
+    delta = np.diff(closes)
+    gain, perte = np.maximum(delta, 0.0), np.maximum(-delta, 0.0)
+    moyenne_gain = _lissage_exponentiel(gain[n:], 1 / n, gain[:n].mean())
+    moyenne_perte = _lissage_exponentiel(perte[n:], 1 / n, perte[:n].mean())
+    if len(moyenne_gain) == 0:
+        return float(gain[:n].mean()), float(perte[:n].mean())
+    return float(moyenne_gain[-1]), float(moyenne_perte[-1])
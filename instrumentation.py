@@ -0,0 +1,236 @@
+import contextvars
+import os
+import threading
+import time
+from bisect import bisect_left
+from collections import OrderedDict, defaultdict
+from contextlib import contextmanager
+
+# Bornes supérieures (s) des classes des histogrammes de latence, comme les « le » de Prometheus
+BORNES = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Page et session courantes : posées par le script principal, lues par chaque mesure
+_page = contextvars.ContextVar("page", default="arriere-plan")
+_session = contextvars.ContextVar("session", default=None)
+_manque_cache = contextvars.ContextVar("manque_cache", default=False)
+
+
+class Histogramme:
+    __slots__ = ("comptes", "somme", "nombre", "maximum")
+
+    def __init__(self):
+        self.comptes = [0] * (len(BORNES) + 1)
+        self.somme = 0.0
+        self.nombre = 0
+        self.maximum = 0.0
+
+    def observer(self, duree):
+        self.comptes[bisect_left(BORNES, duree)] += 1
+        self.somme += duree
+        self.nombre += 1
+        self.maximum = max(self.maximum, duree)
+
+    def quantile(self, q):
+        """Borne supérieure de la classe contenant le quantile ``q`` (estimation par excès)."""
+        if not self.nombre:
+            return float("nan")
+        cible = q * self.nombre
+        cumul = 0
+        for borne, compte in zip(BORNES + (self.maximum,), self.comptes):
+            cumul += compte
+            if cumul >= cible:
+                return min(borne, self.maximum)
+        return self.maximum
+
+
+class Instrumentation:
+    """Chronomètres et compteurs des chemins critiques, agrégés par page et par session.
+
+    Chaque mesure coûte quelques microsecondes (deux lectures d'horloge et
+    une mise à jour d'histogramme sous verrou) : l'instrumentation peut
+    rester active en production. Seules les ``max_sessions`` sessions les
+    plus récentes sont conservées.
+    """
+
+    def __init__(self, max_sessions=200):
+        self.max_sessions = max_sessions
+        self._verrou = threading.Lock()
+        self._histogrammes = defaultdict(Histogramme)
+        self._compteurs = defaultdict(int)
+        self._sessions = OrderedDict()
+        self._jauges = {}
+        self._derniere_ecriture = 0.0
+        self.debut = time.time()
+
+    @contextmanager
+    def contexte(self, page, session=None):
+        """Attribue les mesures du bloc à ``page`` et ``session``."""
+        jetons = _page.set(page), _session.set(session)
+        try:
+            yield
+        finally:
+            _page.reset(jetons[0])
+            _session.reset(jetons[1])
+
+    def observer(self, categorie, nom, duree):
+        page, session = _page.get(), _session.get()
+        with self._verrou:
+            self._histogrammes[(page, categorie, nom)].observer(duree)
+            if session is not None:
+                if session not in self._sessions and len(self._sessions) >= self.max_sessions:
+                    self._sessions.popitem(last=False)
+                histogrammes = self._sessions.setdefault(session, defaultdict(Histogramme))
+                self._sessions.move_to_end(session)
+                histogrammes[(page, categorie)].observer(duree)
+
+    @contextmanager
+    def mesurer(self, categorie, nom):
+        """Chronomètre le bloc (catégories : donnees, cache, calcul, graphique, page)."""
+        debut = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observer(categorie, nom, time.perf_counter() - debut)
+
+    @contextmanager
+    def mesurer_cache(self, nom):
+        """Chronomètre un appel à une fonction en cache et compte succès et échecs.
+
+        La fonction mise en cache appelle ``signaler_manque()`` : son corps ne
+        s'exécute qu'en cas d'échec du cache.
+        """
+        jeton = _manque_cache.set(False)
+        debut = time.perf_counter()
+        try:
+            yield
+        finally:
+            duree = time.perf_counter() - debut
+            manque = _manque_cache.get()
+            _manque_cache.reset(jeton)
+            self.observer("cache", nom, duree)
+            self.compter(f"cache_{nom}_{'echecs' if manque else 'succes'}")
+
+    def signaler_manque(self):
+        _manque_cache.set(True)
+
+    def compter(self, nom, valeur=1):
+        cle = (_page.get(), nom)
+        with self._verrou:
+            self._compteurs[cle] += valeur
+
+    def enregistrer_jauges(self, source, fonction):
+        """``fonction()`` retourne un dict de valeurs numériques, lu à chaque export."""
+        self._jauges[source] = fonction
+
+    def jauges(self):
+        valeurs = {}
+        for source, fonction in self._jauges.items():
+            try:
+                for cle, valeur in fonction().items():
+                    if isinstance(valeur, (int, float)) and not isinstance(valeur, bool):
+                        valeurs[f"{source}_{cle}"] = valeur
+            except Exception:
+                continue
+        return valeurs
+
+    def resume_pages(self):
+        """Une ligne par (page, catégorie, nom) : nombre, total, moyenne, p50, p95, p99, max (ms)."""
+        with self._verrou:
+            elements = [(cle, h.nombre, h.somme, h.maximum, h.quantile(0.5), h.quantile(0.95), h.quantile(0.99))
+                        for cle, h in self._histogrammes.items()]
+        return [{
+            "page": page, "categorie": categorie, "nom": nom, "nombre": nombre,
+            "total_ms": somme * 1e3, "moyenne_ms": somme / nombre * 1e3,
+            "p50_ms": p50 * 1e3, "p95_ms": p95 * 1e3, "p99_ms": p99 * 1e3, "max_ms": maximum * 1e3,
+        } for (page, categorie, nom), nombre, somme, maximum, p50, p95, p99 in elements]
+
+    def resume_sessions(self):
+        """Une ligne par (session, page, catégorie)."""
+        with self._verrou:
+            elements = [(session, cle, h.nombre, h.somme, h.quantile(0.95))
+                        for session, histogrammes in self._sessions.items() for cle, h in histogrammes.items()]
+        return [{
+            "session": session, "page": page, "categorie": categorie, "nombre": nombre,
+            "total_ms": somme * 1e3, "p95_ms": p95 * 1e3,
+        } for session, (page, categorie), nombre, somme, p95 in elements]
+
+    def taux_cache(self):
+        """Taux de succès par cache, à partir des compteurs ``cache_<nom>_succes`` / ``_echecs``."""
+        with self._verrou:
+            compteurs = dict(self._compteurs)
+        totaux = defaultdict(lambda: [0, 0])
+        for (_, nom), valeur in compteurs.items():
+            if nom.startswith("cache_"):
+                cache, _, issue = nom[len("cache_"):].rpartition("_")
+                totaux[cache][issue == "echecs"] += valeur
+        return {cache: {"succes": s, "echecs": e, "taux_succes": s / (s + e) if s + e else 0.0}
+                for cache, (s, e) in totaux.items()}
+
+    def texte_prometheus(self, prefixe="conseiller"):
+        """Export au format texte de Prometheus (histogrammes, compteurs et jauges)."""
+        with self._verrou:
+            histogrammes = [(cle, list(h.comptes), h.somme, h.nombre) for cle, h in self._histogrammes.items()]
+            compteurs = dict(self._compteurs)
+            nb_sessions = len(self._sessions)
+        lignes = [
+            f"# HELP {prefixe}_duree_secondes Durée des chemins critiques par page.",
+            f"# TYPE {prefixe}_duree_secondes histogram",
+        ]
+        for (page, categorie, nom), comptes, somme, nombre in sorted(histogrammes):
+            etiquettes = f'page="{_echapper(page)}",categorie="{_echapper(categorie)}",nom="{_echapper(nom)}"'
+            cumul = 0
+            for borne, compte in zip(BORNES + (float("inf"),), comptes):
+                cumul += compte
+                le = "+Inf" if borne == float("inf") else repr(borne)
+                lignes.append(f'{prefixe}_duree_secondes_bucket{{{etiquettes},le="{le}"}} {cumul}')
+            lignes.append(f"{prefixe}_duree_secondes_sum{{{etiquettes}}} {somme!r}")
+            lignes.append(f"{prefixe}_duree_secondes_count{{{etiquettes}}} {nombre}")
+        lignes += [
+            f"# HELP {prefixe}_evenements_total Compteurs d'événements (succès et échecs de cache, ...).",
+            f"# TYPE {prefixe}_evenements_total counter",
+        ]
+        for (page, nom), valeur in sorted(compteurs.items()):
+            lignes.append(f'{prefixe}_evenements_total{{page="{_echapper(page)}",nom="{_echapper(nom)}"}} {valeur}')
+        lignes += [
+            f"# HELP {prefixe}_jauge Statistiques des composants partagés (planificateur, caches, ...).",
+            f"# TYPE {prefixe}_jauge gauge",
+            f'{prefixe}_jauge{{nom="sessions_suivies"}} {nb_sessions}',
+            f'{prefixe}_jauge{{nom="uptime_secondes"}} {time.time() - self.debut:.0f}',
+        ]
+        for nom, valeur in sorted(self.jauges().items()):
+            lignes.append(f'{prefixe}_jauge{{nom="{_echapper(nom)}"}} {valeur!r}')
+        return "\n".join(lignes) + "\n"
+
+    def ecrire_prometheus(self, chemin):
+        """Écrit l'export dans ``chemin`` de façon atomique (pour le collecteur « textfile » de node_exporter)."""
+        dossier = os.path.dirname(chemin)
+        if dossier:
+            os.makedirs(dossier, exist_ok=True)
+        temporaire = f"{chemin}.{os.getpid()}.tmp"
+        with open(temporaire, "w", encoding="utf-8") as f:
+            f.write(self.texte_prometheus())
+        os.replace(temporaire, chemin)
+        self._derniere_ecriture = time.time()
+
+    def ecrire_si_necessaire(self, chemin, intervalle=15):
+        """Écrit l'export au plus une fois par ``intervalle`` secondes."""
+        if time.time() - self._derniere_ecriture >= intervalle:
+            self._derniere_ecriture = time.time()
+            self.ecrire_prometheus(chemin)
+
+
+def _echapper(valeur):
+    return str(valeur).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+_instrumentation = None
+_verrou_global = threading.Lock()
+
+
+def obtenir_instrumentation():
+    """Instrumentation unique du processus (créée au premier appel)."""
+    global _instrumentation
+    with _verrou_global:
+        if _instrumentation is None:
+            _instrumentation = Instrumentation()
+        return _instrumentation
@@ -0,0 +1,238 @@
+import itertools
+import os
+import re
+import shutil
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+from indicateurs import MoteurIndicateurs
+
+# Dossiers des instances en vie dans ce processus (dossier/<pid>/<numéro>)
+_DOSSIERS_ACTIFS = set()
+_numeros = itertools.count()
+
+
+class VuePrix:
+    """Tranche en lecture seule d'un bloc de prix : aucune copie, les tableaux sont partagés."""
+
+    __slots__ = ("dates", "open", "high", "low", "close", "volume")
+
+    def __init__(self, dates, ohlc, volume):
+        self.dates = dates
+        self.open, self.high, self.low, self.close = ohlc
+        self.volume = volume
+
+    def __len__(self):
+        return len(self.dates)
+
+    def index(self):
+        return pd.DatetimeIndex(self.dates.view("datetime64[ns]"), name="Date")
+
+    def dataframe(self):
+        """DataFrame OHLCV temporaire, le temps d'un rendu (copie des colonnes)."""
+        return pd.DataFrame({"Open": self.open, "High": self.high, "Low": self.low,
+                             "Close": self.close, "Volume": self.volume}, index=self.index())
+
+
+class _Bloc:
+    # Colonnes d'un ticker sur [debut, fin) : dates int64 (ns), OHLC float32, volume int64
+    __slots__ = ("dates", "ohlc", "volume", "debut", "fin", "charge", "fichiers")
+
+
+def _lecture_seule(tableau):
+    vue = tableau.view()
+    vue.flags.writeable = False
+    return vue
+
+
+class MemoirePrix:
+    """Stockage en colonnes des prix, partagé par toutes les sessions du processus.
+
+    Chaque ticker occupe un bloc : un index de dates int64, les prix OHLC en
+    float32 et le volume en int64, écrits en fichiers ``.npy`` et projetés en
+    mémoire (``mmap``). Les sessions reçoivent des vues en lecture seule
+    (``VuePrix``) : la mémoire ne croît pas avec le nombre d'utilisateurs.
+    Les indicateurs sont calculés à la demande et partagés entre sessions
+    pour une même plage; ils ne sont pas conservés dans chaque session.
+    Chaque instance écrit dans son propre sous-dossier ``<pid>/<numéro>``,
+    supprimé quand elle est libérée.
+    """
+
+    def __init__(self, stockage, dossier="donnees/memoire", max_tickers=256, max_indicateurs=64):
+        self.stockage = stockage
+        self.dossier = os.path.abspath(os.path.join(dossier, str(os.getpid()), str(next(_numeros))))
+        self.max_tickers = max_tickers
+        self.max_indicateurs = max_indicateurs
+        self._verrou = threading.Lock()
+        self._blocs = OrderedDict()
+        self._indicateurs = OrderedDict()
+        self._version = 0
+        self.statistiques = {"vues": 0, "chargements": 0, "evictions": 0,
+                             "indicateurs_succes": 0, "indicateurs_prolonges": 0, "indicateurs_calcules": 0}
+        _nettoyer(dossier)
+        os.makedirs(self.dossier, exist_ok=True)
+        _DOSSIERS_ACTIFS.add(self.dossier)
+        weakref.finalize(self, _liberer, self.dossier)
+
+    def _charger(self, ticker, intervalle, debut, fin):
+        df = self.stockage.lire(ticker, debut, fin, intervalle)
+        with self._verrou:
+            self._version += 1
+            version = self._version
+        base = os.path.join(self.dossier, f"{re.sub(r'[^A-Za-z0-9]', '_', ticker)}_{intervalle}_{version}")
+        colonnes = {
+            "dates": df.index.as_unit("ns").asi8,
+            "ohlc": df[["Open", "High", "Low", "Close"]].to_numpy(dtype=np.float32).T.copy(),
+            "volume": df["Volume"].to_numpy(dtype=np.int64),
+        }
+        bloc = _Bloc()
+        bloc.fichiers = []
+        for nom, valeurs in colonnes.items():
+            chemin = f"{base}_{nom}.npy"
+            np.save(chemin, valeurs)
+            bloc.fichiers.append(chemin)
+            # Un tableau vide ne peut pas être projeté en mémoire
+            setattr(bloc, nom, np.load(chemin, mmap_mode="r") if len(valeurs) else _lecture_seule(valeurs))
+        bloc.debut, bloc.fin, bloc.charge = debut, fin, time.time()
+        return bloc
+
+    def _bloc(self, ticker, intervalle, debut, fin):
+        cle = (ticker, intervalle)
+        with self._verrou:
+            bloc = self._blocs.get(cle)
+            if bloc is not None:
+                self._blocs.move_to_end(cle)
+        # La journée en cours expire comme dans le stockage SQLite
+        expire = bloc is not None and bloc.fin > date.today() and time.time() - bloc.charge > self.stockage.ttl_jour
+        if bloc is not None and bloc.debut <= debut and fin <= bloc.fin and not expire:
+            return bloc
+        if bloc is not None and not expire:
+            debut, fin = min(debut, bloc.debut), max(fin, bloc.fin)
+        elif bloc is not None:
+            debut = min(debut, bloc.debut)
+        nouveau = self._charger(ticker, intervalle, debut, fin)
+        with self._verrou:
+            self.statistiques["chargements"] += 1
+            ancien = self._blocs.pop(cle, None)
+            self._blocs[cle] = nouveau
+            evinces = [ancien] if ancien is not None else []
+            while len(self._blocs) > self.max_tickers:
+                evinces.append(self._blocs.popitem(last=False)[1])
+                self.statistiques["evictions"] += 1
+        for bloc in evinces:
+            _supprimer(bloc.fichiers)
+        return nouveau
+
+    def vue(self, ticker, debut, fin=None, intervalle="1d"):
+        """Barres de ``ticker`` sur [debut, fin), en vues en lecture seule sur le bloc partagé."""
+        fin = fin or date.today() + timedelta(days=1)
+        bloc = self._bloc(ticker, intervalle, debut, fin)
+        i, j = np.searchsorted(bloc.dates, [pd.Timestamp(debut).value, pd.Timestamp(fin).value])
+        with self._verrou:
+            self.statistiques["vues"] += 1
+        return VuePrix(bloc.dates[i:j], bloc.ohlc[:, i:j], bloc.volume[i:j])
+
+    def indicateurs(self, ticker, vue, intervalle="1d"):
+        """Indicateurs de l'onglet Analyse Technique pour ``vue``, partagés entre sessions.
+
+        Le résultat est mis en cache par ticker et date de début : si la vue
+        prolonge une plage déjà calculée, seules les nouvelles barres passent
+        dans le moteur incrémental.
+        """
+        if not len(vue):
+            return {}
+        cle = (ticker, intervalle, int(vue.dates[0]))
+        closes = vue.close
+        with self._verrou:
+            entree = self._indicateurs.get(cle)
+            if entree is not None:
+                self._indicateurs.move_to_end(cle)
+        if entree is not None:
+            n = len(entree["closes"])
+            if len(closes) <= n and np.array_equal(closes, entree["closes"][:len(closes)]) \
+                    and np.array_equal(vue.dates, entree["dates"][:len(closes)]):
+                with self._verrou:
+                    self.statistiques["indicateurs_succes"] += 1
+                return {k: v[:len(closes)] for k, v in entree["resultats"].items()}
+            if len(closes) > n and np.array_equal(closes[:n], entree["closes"]):
+                moteur = entree["moteur"]
+                with entree["verrou"]:
+                    # Le moteur est partagé : il ne doit pas avoir été prolongé par un autre fil
+                    if moteur.nb_barres == n:
+                        ajout = moteur.etendre(closes[n:])
+                        resultats = {k: _lecture_seule(np.concatenate([v, ajout[k]]))
+                                     for k, v in entree["resultats"].items()}
+                        self._memoriser(cle, closes, vue.dates, resultats, moteur, "indicateurs_prolonges",
+                                        entree["verrou"])
+                        return resultats
+        moteur, resultats = MoteurIndicateurs.depuis_historique(closes)
+        resultats = {k: _lecture_seule(v) for k, v in resultats.items()}
+        self._memoriser(cle, closes, vue.dates, resultats, moteur, "indicateurs_calcules")
+        return resultats
+
+    def _memoriser(self, cle, closes, dates, resultats, moteur, statistique, verrou=None):
+        # Une entrée prolongée remplace la précédente et garde son verrou
+        with self._verrou:
+            self.statistiques[statistique] += 1
+            self._indicateurs[cle] = {"closes": closes, "dates": dates, "resultats": resultats,
+                                      "moteur": moteur, "verrou": verrou or threading.Lock()}
+            self._indicateurs.move_to_end(cle)
+            while len(self._indicateurs) > self.max_indicateurs:
+                self._indicateurs.popitem(last=False)
+
+    def memoire(self):
+        """Octets des blocs (fichiers projetés) et des indicateurs partagés."""
+        with self._verrou:
+            blocs = list(self._blocs.values())
+            indicateurs = list(self._indicateurs.values())
+        octets_blocs = sum(b.dates.nbytes + b.ohlc.nbytes + b.volume.nbytes for b in blocs)
+        octets_indicateurs = sum(v.nbytes for e in indicateurs for v in e["resultats"].values())
+        return {"blocs": len(blocs), "octets_blocs": octets_blocs, "octets_indicateurs": octets_indicateurs}
+
+
+def _supprimer(fichiers):
+    # Les vues déjà distribuées restent valides : le fichier n'est libéré qu'à la dernière fermeture
+    for chemin in fichiers:
+        try:
+            os.remove(chemin)
+        except OSError:
+            pass
+
+
+def _liberer(dossier):
+    _DOSSIERS_ACTIFS.discard(dossier)
+    shutil.rmtree(dossier, ignore_errors=True)
+
+
+def _vivant(pid):
+    try:
+        os.kill(pid, 0)
+    except (ProcessLookupError, OverflowError):
+        return False
+    except OSError:
+        # PermissionError : processus en vie appartenant à un autre utilisateur
+        return True
+    return True
+
+
+def _nettoyer(dossier):
+    # Fichiers laissés par des processus terminés, et par les instances libérées de ce processus
+    # (ou d'un processus terminé qui avait le même pid)
+    if not os.path.isdir(dossier):
+        return
+    for nom in os.listdir(dossier):
+        chemin = os.path.abspath(os.path.join(dossier, nom))
+        if not nom.isdigit() or not os.path.isdir(chemin):
+            continue
+        if int(nom) == os.getpid():
+            for instance in os.listdir(chemin):
+                if os.path.join(chemin, instance) not in _DOSSIERS_ACTIFS:
+                    shutil.rmtree(os.path.join(chemin, instance), ignore_errors=True)
+        elif os.name == "posix" and not _vivant(int(nom)):
+            shutil.rmtree(chemin, ignore_errors=True)
@@ -0,0 +1,208 @@
+from dataclasses import dataclass
+
+import numpy as np
+
+# Part minimale d'obligations selon la tolérance au risque du profil
+PLANCHERS_OBLIGATIONS = {"Faible": 0.4, "Modérée": 0.2, "Élevée": 0.0}
+
+
+@dataclass
+class Frontiere:
+    poids: np.ndarray
+    rendements: np.ndarray
+    volatilites: np.ndarray
+    iterations: int
+
+
+def projeter_boite(v, bas, haut, somme):
+    """Projection euclidienne de chaque ligne de ``v`` sur {bas <= w <= haut, Σ w = somme}.
+
+    ``bas`` et ``haut`` sont communs (n) ou propres à chaque ligne; ``somme``
+    est un scalaire ou une valeur par ligne. La solution est
+    ``clip(v - τ, bas, haut)`` : la somme est linéaire par morceaux et
+    décroissante en τ, les points de rupture sont triés une fois et τ est
+    obtenu par interpolation, sans bisection.
+    """
+    lignes, n = v.shape
+    somme = np.broadcast_to(somme, lignes)
+    ruptures = np.concatenate([v - haut, v - bas], axis=1)
+    ordre = np.argsort(ruptures, axis=1)
+    ruptures = np.take_along_axis(ruptures, ordre, axis=1)
+    # Une composante devient libre à sa rupture haute et se bloque à sa rupture basse
+    libres = np.cumsum(np.where(ordre < n, 1, -1), axis=1)
+    sommes = np.empty_like(ruptures)
+    sommes[:, 0] = 0
+    np.cumsum(libres[:, :-1] * np.diff(ruptures, axis=1), axis=1, out=sommes[:, 1:])
+    sommes = np.broadcast_to(haut, v.shape).sum(axis=1)[:, None] - sommes
+    k = np.clip((sommes >= somme[:, None]).sum(axis=1) - 1, 0, 2 * n - 2)
+    i = np.arange(lignes)
+    pente = libres[i, k]
+    tau = ruptures[i, k] + np.divide(sommes[i, k] - somme, pente, out=np.zeros(lignes), where=pente > 0)
+    return np.clip(v - tau[:, None], bas, haut)
+
+
+def projeter(v, bas, haut, obligations=None, plancher=0.0):
+    """Projection sur {bas <= w <= haut, Σ w = 1, Σ w[obligations] >= plancher}.
+
+    Si le plancher n'est pas respecté par la projection sans lui, il est
+    atteint exactement : le problème se sépare alors en deux projections
+    indépendantes, obligations (somme ``plancher``) et autres fonds. Les
+    deux parties passent dans un seul appel, les composantes exclues d'une
+    partie étant bornées à zéro.
+    """
+    w = projeter_boite(v, bas, haut, 1.0)
+    if obligations is None or plancher <= 0:
+        return w
+    sous = np.flatnonzero(w[:, obligations].sum(axis=1) < plancher - 1e-12)
+    if len(sous):
+        parties = np.repeat(np.stack([obligations, ~obligations]), len(sous), axis=0)
+        separe = projeter_boite(np.tile(v[sous], (2, 1)), parties * bas, parties * haut,
+                                np.repeat([plancher, 1 - plancher], len(sous)))
+        w[sous] = separe[:len(sous)] + separe[len(sous):]
+    return w
+
+
+def _ensemble_actif(t, mu, sigma, bas, haut, obligations, plancher, w, en_bas, en_haut, plancher_actif,
+                    max_iterations=200, seuil=1e-12):
+    """Solution exacte d'un point par la méthode primale des ensembles actifs.
+
+    ``w`` est un point admissible (la solution du point voisin : les
+    contraintes ne dépendent pas de ``t``) et ``en_bas``, ``en_haut``,
+    ``plancher_actif`` les contraintes tenues pour actives. À chaque
+    itération, le minimum sur ces contraintes vient d'un système linéaire
+    (conditions de Karush-Kuhn-Tucker) sur les poids libres; le pas
+    s'arrête à la première borne rencontrée, qui devient active. Au minimum,
+    la contrainte dont le multiplicateur a le mauvais signe est relâchée.
+    Une contrainte change à la fois et l'ensemble actif reste de rang plein.
+    Retourne None sans convergence.
+    """
+    if obligations is None:
+        obligations = np.zeros(len(mu), dtype=bool)
+    w, en_bas, en_haut = w.copy(), en_bas.copy(), en_haut.copy()
+    for iteration in range(1, max_iterations + 1):
+        libres = ~(en_bas | en_haut)
+        f = np.flatnonzero(libres)
+        contraintes = [np.ones(len(f))] + ([obligations[f].astype(float)] if plancher_actif else [])
+        k, m = len(f), len(contraintes)
+        gradient = sigma @ w - t * mu
+        systeme = np.zeros((k + m, k + m))
+        systeme[:k, :k] = sigma[np.ix_(f, f)]
+        systeme[:k, k:] = np.transpose(contraintes)
+        systeme[k:, :k] = contraintes
+        try:
+            solution = np.linalg.solve(systeme, np.concatenate([-gradient[f], np.zeros(m)]))
+        except np.linalg.LinAlgError:
+            return None
+        direction = np.zeros_like(w)
+        direction[f] = solution[:k]
+        if np.abs(direction).max(initial=0.0) <= seuil:
+            # Minimum sur l'ensemble actif : multiplicateurs des bornes (positifs au plancher de poids,
+            # négatifs au plafond) et du plancher d'obligations (négatif)
+            multiplicateurs = gradient + solution[k] + (solution[k + 1] * obligations if plancher_actif else 0)
+            violations = np.where(en_bas, -multiplicateurs, np.where(en_haut, multiplicateurs, 0.0))
+            i = int(np.argmax(violations))
+            violation_plancher = solution[k + 1] if plancher_actif else 0.0
+            marge = seuil * (1 + np.abs(t * mu).max())
+            if max(violations[i], violation_plancher) <= marge:
+                return w, en_bas, en_haut, plancher_actif, iteration
+            if violation_plancher > violations[i]:
+                plancher_actif = False
+            else:
+                en_bas[i] = en_haut[i] = False
+            continue
+        # Pas maximal avant la première borne (ou le plancher) rencontrée
+        with np.errstate(divide="ignore", invalid="ignore"):
+            limites = np.where(direction < -seuil, (w - bas) / -direction,
+                               np.where(direction > seuil, (haut - w) / direction, np.inf))
+        limites[~libres] = np.inf
+        i = int(np.argmin(limites))
+        pas, bloquant = limites[i], "borne"
+        descente_obligations = direction[obligations].sum()
+        if not plancher_actif and descente_obligations < -seuil:
+            limite_plancher = (w[obligations].sum() - plancher) / -descente_obligations
+            if limite_plancher < pas:
+                pas, bloquant = limite_plancher, "plancher"
+        if pas >= 1:
+            w += direction
+            continue
+        w += max(pas, 0.0) * direction
+        if bloquant == "plancher":
+            plancher_actif = True
+        elif direction[i] < 0:
+            w[i], en_bas[i] = bas[i], True
+        else:
+            w[i], en_haut[i] = haut[i], True
+    return None
+
+
+def _gradient_projete(t, mu, sigma, bas, haut, obligations, plancher, lipschitz, tolerance=1e-10,
+                      max_iterations=20000):
+    """Gradient accéléré (FISTA, redémarrage adaptatif) pour plusieurs aversions ``t`` à la fois."""
+    w = projeter(np.full((len(t), len(mu)), 1.0 / len(mu)), bas, haut, obligations, plancher)
+    y, elan = w.copy(), np.ones(len(t))
+    for iteration in range(1, max_iterations + 1):
+        nouveau = projeter(y - (y @ sigma - t[:, None] * mu) / lipschitz, bas, haut, obligations, plancher)
+        pas = nouveau - w
+        # Redémarrage de l'élan des points dont le pas remonte le gradient
+        elan[((y - nouveau) * pas).sum(axis=1) > 0] = 1.0
+        suivant = (1 + np.sqrt(1 + 4 * elan ** 2)) / 2
+        y = nouveau + ((elan - 1) / suivant)[:, None] * pas
+        w, elan = nouveau, suivant
+        if np.abs(pas).max() < tolerance:
+            break
+    return w, iteration
+
+
+def frontiere(rendements, covariance, bas=0.0, haut=1.0, obligations=None, plancher=0.0, points=100):
+    """Frontière efficiente sous contraintes.
+
+    Chaque point minimise ``½ wᵀ Σ w - t μᵀ w`` pour une aversion ``t``
+    différente. La solution est linéaire par morceaux en ``t`` : les points
+    sont résolus du rendement maximal vers la variance minimale, chacun
+    partant de l'ensemble actif du précédent. Les rares points sur
+    lesquels la méthode des ensembles actifs ne converge pas sont résolus
+    par gradient projeté, qui fournit l'ensemble actif du point suivant.
+    """
+    mu = np.asarray(rendements, dtype=float)
+    sigma = np.asarray(covariance, dtype=float)
+    n = len(mu)
+    bas, haut = np.broadcast_to(np.asarray(bas, dtype=float), n), np.broadcast_to(np.asarray(haut, dtype=float), n)
+    if obligations is not None:
+        obligations = np.asarray(obligations, dtype=bool)
+        if not obligations.any() or plancher <= 0:
+            obligations = None
+    if bas.sum() > 1 + 1e-12 or haut.sum() < 1 - 1e-12 or (
+            obligations is not None and (haut[obligations].sum() < plancher or bas[~obligations].sum() > 1 - plancher)):
+        raise ValueError("Contraintes infaisables : bornes de poids ou plancher d'obligations incompatibles.")
+    if obligations is None:
+        plancher = 0.0
+
+    lipschitz = np.linalg.eigvalsh(sigma)[-1]
+    # Aversions du point de variance minimale (t = 0) jusqu'au rendement maximal
+    echelle = lipschitz / max(np.ptp(mu), 1e-12)
+    t = np.concatenate([[0.0], np.geomspace(1e-3, 1e2, points - 1) * echelle])
+    contraintes = (bas, haut, obligations, plancher)
+
+    # Départ : le portefeuille de rendement maximal (projection de t μ), admissible; un poids au moins
+    # reste libre pour que la contrainte de somme ne soit pas redondante
+    w = projeter((t[-1] * mu / lipschitz)[None], *contraintes)[0]
+    en_bas, en_haut = w <= bas, w >= haut
+    if (en_bas | en_haut).all():
+        en_bas[np.argmax(w)] = en_haut[np.argmax(w)] = False
+    plancher_actif = False
+    poids, iterations = np.empty((points, n)), 0
+    for k in range(points - 1, -1, -1):
+        resultat = _ensemble_actif(t[k], mu, sigma, *contraintes, w, en_bas, en_haut, plancher_actif)
+        if resultat is None:
+            w, nombre = _gradient_projete(t[k:k + 1], mu, sigma, *contraintes, lipschitz)
+            w = w[0]
+            en_bas, en_haut = w <= bas + 1e-12, w >= haut - 1e-12
+            if (en_bas | en_haut).all():
+                en_bas[np.argmax(w)] = en_haut[np.argmax(w)] = False
+            plancher_actif = False
+        else:
+            w, en_bas, en_haut, plancher_actif, nombre = resultat
+        poids[k] = w
+        iterations += nombre
+    variances = np.einsum("ij,jk,ik->i", poids, sigma, poids)
+    return Frontiere(poids, poids @ mu, np.sqrt(np.maximum(variances, 0)), iterations)
@@ -0,0 +1,169 @@
+import threading
+import time
+from concurrent.futures import Future
+
+import pandas as pd
+
+
+class BackendYFinance:
+    """Backend par défaut. Un backend local peut le remplacer s'il offre les mêmes méthodes."""
+
+    def telecharger(self, tickers, **params):
+        import yfinance as yf
+        params.setdefault("progress", False)
+        params.setdefault("threads", False)
+        return yf.download(list(tickers), **params)
+
+    def infos(self, ticker):
+        import yfinance as yf
+        return yf.Ticker(ticker).info
+
+
+class SeauJetons:
+    """Limiteur de débit : ``debit`` appels par seconde, rafales de ``capacite`` appels."""
+
+    def __init__(self, debit, capacite):
+        self.debit = debit
+        self.capacite = capacite
+        self._jetons = capacite
+        self._dernier = time.monotonic()
+        self._verrou = threading.Lock()
+
+    def prendre(self):
+        while True:
+            with self._verrou:
+                maintenant = time.monotonic()
+                self._jetons = min(self.capacite, self._jetons + (maintenant - self._dernier) * self.debit)
+                self._dernier = maintenant
+                if self._jetons >= 1:
+                    self._jetons -= 1
+                    return
+                attente = (1 - self._jetons) / self.debit
+            time.sleep(attente)
+
+
+def _extraire(df, ticker):
+    # Colonnes d'un ticker dans le résultat multi-tickers de yf.download
+    if df is None or df.empty:
+        return pd.DataFrame()
+    if isinstance(df.columns, pd.MultiIndex):
+        if ticker not in df.columns.get_level_values(1):
+            return pd.DataFrame()
+        df = df.xs(ticker, axis=1, level=1)
+    return df.dropna(how="all")
+
+
+class PlanificateurDonnees:
+    """Point de passage unique vers le fournisseur de données, partagé par toutes les sessions.
+
+    Les requêtes identiques en cours sont dédoublonnées, les demandes
+    d'historique d'un seul ticker arrivant dans la même fenêtre de
+    ``delai_regroupement`` secondes sont fusionnées en un seul
+    téléchargement multi-tickers, et chaque appel au backend passe par un
+    seau à jetons avec un nombre borné de tentatives.
+    """
+
+    def __init__(self, backend=None, debit=2.0, capacite=5, tentatives=3, delai_regroupement=0.05):
+        if backend is None:
+            from cassettes import selon_environnement
+            backend = selon_environnement(BackendYFinance())
+        self.backend = backend
+        self.seau = SeauJetons(debit, capacite)
+        self.tentatives = tentatives
+        self.delai_regroupement = delai_regroupement
+        self._verrou = threading.Lock()
+        self._en_vol = {}
+        self._lots = {}
+        self.statistiques = {"appels_backend": 0, "dedoublonnees": 0, "regroupees": 0, "reessais": 0}
+
+    def _appeler(self, fonction, *args, **kwargs):
+        for tentative in range(self.tentatives):
+            self.seau.prendre()
+            with self._verrou:
+                self.statistiques["appels_backend"] += 1
+            try:
+                return fonction(*args, **kwargs)
+            except Exception:
+                if tentative == self.tentatives - 1:
+                    raise
+                with self._verrou:
+                    self.statistiques["reessais"] += 1
+                time.sleep(0.5 * 2 ** tentative)
+
+    def _dedoublonner(self, cle, fonction, *args, **kwargs):
+        with self._verrou:
+            futur = self._en_vol.get(cle)
+            meneur = futur is None
+            if meneur:
+                futur = self._en_vol[cle] = Future()
+            else:
+                self.statistiques["dedoublonnees"] += 1
+        if meneur:
+            try:
+                futur.set_result(self._appeler(fonction, *args, **kwargs))
+            except Exception as e:
+                futur.set_exception(e)
+            finally:
+                with self._verrou:
+                    del self._en_vol[cle]
+        return futur.result()
+
+    def telecharger(self, tickers, **params):
+        cle = ("telecharger", tuple(sorted(tickers)), tuple(sorted(params.items())))
+        return self._dedoublonner(cle, self.backend.telecharger, list(tickers), **params)
+
+    def infos(self, ticker):
+        return self._dedoublonner(("infos", ticker), self.backend.infos, ticker)
+
+    def historiques(self, tickers, debut, fin, intervalle="1d", taille_lot=100):
+        """Historiques de plusieurs tickers sur la même plage, par téléchargements groupés."""
+        resultats = {}
+        tickers = sorted(set(tickers))
+        for i in range(0, len(tickers), taille_lot):
+            lot = tickers[i:i + taille_lot]
+            cle = ("historiques", tuple(lot), debut, fin, intervalle)
+            df = self._dedoublonner(cle, self.backend.telecharger, lot, start=debut, end=fin,
+                                    interval=intervalle, auto_adjust=True)
+            for t in lot:
+                resultats[t] = _extraire(df, t)
+        return resultats
+
+    def historique(self, ticker, debut, fin, intervalle="1d"):
+        cle_lot = (debut, fin, intervalle)
+        with self._verrou:
+            lot = self._lots.get(cle_lot)
+            meneur = lot is None
+            if meneur:
+                lot = self._lots[cle_lot] = {}
+            if ticker in lot:
+                self.statistiques["dedoublonnees"] += 1
+            elif not meneur:
+                self.statistiques["regroupees"] += 1
+            futur = lot.setdefault(ticker, Future())
+        if meneur:
+            # Le premier demandeur attend les autres puis télécharge pour tout le lot
+            time.sleep(self.delai_regroupement)
+            with self._verrou:
+                del self._lots[cle_lot]
+            try:
+                df = self._appeler(self.backend.telecharger, sorted(lot), start=debut, end=fin,
+                                   interval=intervalle, auto_adjust=True)
+                for t, f in lot.items():
+                    f.set_result(_extraire(df, t))
+            except Exception as e:
+                for f in lot.values():
+                    f.set_exception(e)
+        return futur.result()
+
+
+_planificateur = None
+_verrou_global = threading.Lock()
+
+
+def obtenir_planificateur(backend=None):
+    """Planificateur unique du processus (créé au premier appel)."""
+    global _planificateur
+    with _verrou_global:
+        if _planificateur is None:
+            _planificateur = PlanificateurDonnees(backend)
+        return _planificateur
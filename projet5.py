@@ -1,15 +1,110 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from uuid import uuid4
+
 import streamlit as st
 import pandas as pd
-import matplotlib.pyplot as plt
-import yfinance as yf
 import numpy as np
 from datetime import date, timedelta
-import plotly.graph_objects as go
+
+from allocation import CLASSES, RISQUES, allocation_profil, allouer_lot
+from backtest import FREQUENCES, comparer, lire_proxies, statistiques
+from cache_fondamentaux import CacheFondamentaux
+from comparateur import AppelsEnVol, collecter
+from echantillonnage import agreger_ohlcv, choisir_granularite, reduire_serie
+from instrumentation import obtenir_instrumentation
+from memoire_prix import MemoirePrix
+from optimisation import PLANCHERS_OBLIGATIONS, frontiere
+from planificateur import obtenir_planificateur
+from rafraichisseur import RafraichisseurMarches
+from rendu import camembert, eventail, rendre_png
+from risque import (JOURS_PAR_AN, drawdowns, prolonger_covariance, rendements_journaliers, rendements_mensuels,
+                    tableau_risque)
+from screener import cribler
+from simulation import (grille_scenarios, simuler_bootstrap, simuler_monte_carlo, simuler_rendement, taux_requis,
+                        versement_requis)
+from stockage import StockageOHLCV, debut_periode
+from univers import charger_univers
 
 # Configuration de la page Streamlit
 st.set_page_config(page_title="Conseiller Financier Virtuel", layout="wide")
 st.title("💼 Conseiller Financier Virtuel")
 
+# Mesures des données, caches, calculs et graphiques, agrégées par page et par session
+instrumentation = obtenir_instrumentation()
+mesure = instrumentation.mesurer
+FICHIER_METRIQUES = os.environ.get("METRIQUES_PROMETHEUS", "donnees/metriques.prom")
+
+# Accès aux données de marché partagé par toutes les sessions du processus
+planificateur = obtenir_planificateur()
+instrumentation.enregistrer_jauges("planificateur", lambda: planificateur.statistiques)
+
+# Stockage local des historiques de prix, alimenté par le planificateur
+@st.cache_resource
+def obtenir_stockage():
+    stockage = StockageOHLCV("donnees/ohlcv.sqlite", fournisseur=planificateur)
+    instrumentation.enregistrer_jauges("stockage", lambda: stockage.statistiques)
+    return stockage
+
+stockage = obtenir_stockage()
+
+# Prix en colonnes compactes, servis en vues en lecture seule à toutes les sessions
+@st.cache_resource
+def obtenir_memoire_prix():
+    memoire_prix = MemoirePrix(stockage)
+    instrumentation.enregistrer_jauges("memoire_prix", lambda: {**memoire_prix.statistiques, **memoire_prix.memoire()})
+    return memoire_prix
+
+memoire_prix = obtenir_memoire_prix()
+
+# Cache des données fondamentales (Ticker.info), rafraîchi en arrière-plan
+@st.cache_resource
+def obtenir_cache_fondamentaux():
+    fondamentaux = CacheFondamentaux(planificateur.infos)
+    instrumentation.enregistrer_jauges("fondamentaux", fondamentaux.statistiques)
+    return fondamentaux
+
+fondamentaux = obtenir_cache_fondamentaux()
+
+# Index des titres (symboles et noms), chargé une fois par processus par les pages qui cherchent un titre
+@st.cache_resource
+def obtenir_univers():
+    with mesure("donnees", "univers"):
+        return charger_univers()
+
+
+# Liste des FNB (classe, type, ESG) et FNB témoins des classes d'actif, lus une fois par processus
+@st.cache_data
+def lire_fnb():
+    instrumentation.signaler_manque()
+    with mesure("donnees", "csv_fnb"):
+        return pd.read_csv("fnb_americains.csv")
+
+
+@st.cache_data
+def proxies_fnb():
+    instrumentation.signaler_manque()
+    with mesure("donnees", "csv_fnb"):
+        return lire_proxies()
+
+
+def choisir_ticker(libelle, cle, source="sp500"):
+    # Sans recherche, la liste de la source; sinon les titres de tout l'univers par symbole, nom ou nom approché.
+    # Les listes livrées n'ont que des symboles : la recherche par nom n'est proposée qu'avec une liste nommée
+    univers = obtenir_univers()
+    if univers.avec_noms:
+        libelle_recherche, exemple = "Rechercher un titre (symbole ou société)", "ex. AAPL, Apple, Microsfot"
+    else:
+        libelle_recherche, exemple = "Rechercher un titre (symbole)", "ex. AAPL, MSFT, SPY"
+    recherche = st.text_input(libelle_recherche, key=f"{cle}_recherche", placeholder=exemple)
+    with mesure("calcul", "recherche_univers"):
+        options = univers.rechercher(recherche, limite=50) if recherche.strip() else univers.symboles(source)
+    if not options:
+        st.warning("Aucun titre ne correspond à la recherche.")
+        return None
+    return st.selectbox(libelle, options, key=cle, format_func=univers.libelle)
+
 # Récupération des tickers clés
 tickers = {
     "S&P 500": "^GSPC",
@@ -20,81 +115,98 @@ tickers = {
     "US 10Y": "^TNX"
 }
 
-# Données en temps réel - version plus robuste
-try:
-    data = yf.download(list(tickers.values()), period="1d", interval="5m", progress=False, threads=False)
-    latest_data = data["Close"].iloc[-1]
-    previous_data = data["Close"].iloc[-2]
+# Rafraîchissement des cours en arrière-plan, un seul pour tout le processus
+CADENCE_MARCHES = 60
+
+@st.cache_resource
+def obtenir_rafraichisseur():
+    rafraichisseur = RafraichisseurMarches(planificateur, tickers.values(), cadence=CADENCE_MARCHES)
+    instrumentation.enregistrer_jauges("marches", rafraichisseur.statistiques)
+    return rafraichisseur.demarrer()
 
+rafraichisseur = obtenir_rafraichisseur()
+
+# Données en temps réel : lecture de l'instantané, sans attendre le réseau
+@st.fragment(run_every=CADENCE_MARCHES)
+def afficher_marches():
+    instantane = rafraichisseur.instantane()
     st.subheader("📊 Marchés en temps réel")
     cols = st.columns(len(tickers))
 
     for i, (name, symbol) in enumerate(tickers.items()):
-        try:
-            latest = latest_data[symbol]
-            previous = previous_data[symbol]
-            if pd.notna(latest) and pd.notna(previous):
-                delta = round(((latest - previous) / previous) * 100, 2)
-                cols[i].metric(label=name, value=f"${latest:,.2f}", delta=f"{delta}%")
-            else:
-                cols[i].metric(label=name, value="N/A", delta="N/A")
-        except Exception:
-            cols[i].metric(label=name, value="Erreur", delta="")
-
-except Exception as e:
-    st.error(f"Erreur lors de la récupération des données financières : {e}")
-
-# Variables par défaut pour éviter les erreurs si le formulaire n'est pas soumis
-age = 30
-objectif = "Épargne retraite"
-montant_initial = 1000
-investissement_mensuel = 100
-duree = 10
-connaissance = "Débutant"
-risque = "Modérée"
-situation_familiale = "Célibataire"
-epargne_urgence = "Oui"
-preference_esg = False
-horizon_liquidite = "Non"
-
-# Onglets
-tabs = st.tabs([
-    "Profil Financier",
-    "Suggestions de Portefeuille",
-    "Simulateur de Rendement",
-    "Comparateur de Fonds",
-    "Recherche d'Actions",
-    "FAQ",
-    "Analyse Technique",
-    "Glossaire",
-    "Watchlist",
-    "Simulation Monte Carlo",
-    "Quiz Financier",
-    "Cryptomonnaie"
-])
+        cours = instantane.get(symbol)
+        if cours is None:
+            cols[i].metric(label=name, value="N/A", delta="N/A")
+            continue
+        latest, previous = cours["dernier"], cours["precedent"]
+        delta = round(((latest - previous) / previous) * 100, 2)
+        cols[i].metric(label=name, value=f"${latest:,.2f}", delta=f"{delta}%")
+
+    if not instantane and rafraichisseur.derniere_erreur is not None:
+        st.error(f"Erreur lors de la récupération des données financières : {rafraichisseur.derniere_erreur}")
+
+afficher_marches()
+
+# Profil par défaut, conservé dans la session une fois le formulaire soumis
+PROFIL_DEFAUT = {
+    "age": 30,
+    "objectif": "Épargne retraite",
+    "montant_initial": 1000,
+    "investissement_mensuel": 100,
+    "duree": 10,
+    "connaissance": "Débutant",
+    "risque": "Modérée",
+    "situation_familiale": "Célibataire",
+    "epargne_urgence": "Oui",
+    "preference_esg": False,
+    "horizon_liquidite": "Non",
+}
+
+
+def lire_profil():
+    if "profil" not in st.session_state:
+        st.session_state["profil"] = dict(PROFIL_DEFAUT)
+    return st.session_state["profil"]
+
 
 # 1. Profil Financier
-with tabs[0]:
+def page_profil():
     st.header("📋 Profil Financier")
+    profil = lire_profil()
+    objectifs = ["Épargne retraite", "Achat maison", "Voyage", "Revenus passifs", "Autre"]
+    situations = ["Célibataire", "Marié(e)", "Avec enfants", "Sans enfants"]
     with st.form("profil_form"):
         col1, col2 = st.columns(2)
         with col1:
-            age = st.number_input("Âge", min_value=18, max_value=100, value=30)
-            objectif = st.selectbox("Objectif d'investissement", ["Épargne retraite", "Achat maison", "Voyage", "Revenus passifs", "Autre"])
-            montant_initial = st.number_input("Montant disponible à investir maintenant ($)", min_value=0)
-            investissement_mensuel = st.number_input("Montant investi chaque mois ($)", min_value=0)
-            duree = st.slider("Durée de l'investissement (en années)", 1, 50, 10)
-            connaissance = st.select_slider("Connaissances en finance", options=["Débutant", "Intermédiaire", "Avancé"])
+            age = st.number_input("Âge", min_value=18, max_value=100, value=profil["age"])
+            objectif = st.selectbox("Objectif d'investissement", objectifs, index=objectifs.index(profil["objectif"]))
+            montant_initial = st.number_input("Montant disponible à investir maintenant ($)", min_value=0, value=profil["montant_initial"])
+            investissement_mensuel = st.number_input("Montant investi chaque mois ($)", min_value=0, value=profil["investissement_mensuel"])
+            duree = st.slider("Durée de l'investissement (en années)", 1, 50, profil["duree"])
+            connaissance = st.select_slider("Connaissances en finance", options=["Débutant", "Intermédiaire", "Avancé"], value=profil["connaissance"])
         with col2:
-            risque = st.select_slider("Tolérance au risque", options=["Faible", "Modérée", "Élevée"])
-            situation_familiale = st.selectbox("Situation familiale", ["Célibataire", "Marié(e)", "Avec enfants", "Sans enfants"])
-            epargne_urgence = st.radio("Avez-vous une épargne d'urgence?", ["Oui", "Non"])
-            preference_esg = st.checkbox("Je préfère des investissements responsables (ESG)")
-            horizon_liquidite = st.radio("Avez-vous besoin de liquidité à court terme?", ["Oui", "Non"])
+            risque = st.select_slider("Tolérance au risque", options=["Faible", "Modérée", "Élevée"], value=profil["risque"])
+            situation_familiale = st.selectbox("Situation familiale", situations, index=situations.index(profil["situation_familiale"]))
+            epargne_urgence = st.radio("Avez-vous une épargne d'urgence?", ["Oui", "Non"], index=["Oui", "Non"].index(profil["epargne_urgence"]))
+            preference_esg = st.checkbox("Je préfère des investissements responsables (ESG)", value=profil["preference_esg"])
+            horizon_liquidite = st.radio("Avez-vous besoin de liquidité à court terme?", ["Oui", "Non"], index=["Oui", "Non"].index(profil["horizon_liquidite"]))
 
         submitted = st.form_submit_button("Analyser mon profil")
 
     if submitted:
+        profil.update({
+            "age": age,
+            "objectif": objectif,
+            "montant_initial": montant_initial,
+            "investissement_mensuel": investissement_mensuel,
+            "duree": duree,
+            "connaissance": connaissance,
+            "risque": risque,
+            "situation_familiale": situation_familiale,
+            "epargne_urgence": epargne_urgence,
+            "preference_esg": preference_esg,
+            "horizon_liquidite": horizon_liquidite,
+        })
         st.success("✅ Profil analysé avec succès!")
         st.write("### Résumé de votre profil :")
         st.json({
@@ -112,190 +224,339 @@ with tabs[0]:
         })
 
 # 2. Suggestions de Portefeuille
-with tabs[1]:
+# Image du camembert, mise en cache selon la répartition
+@st.cache_data(max_entries=256, show_spinner=False)
+def image_allocation(tailles):
+    instrumentation.signaler_manque()
+    with mesure("graphique", "matplotlib_camembert"):
+        return rendre_png(camembert, tailles, CLASSES)
+
+
+# Rendements quotidiens des FNB témoins depuis que tous cotent, mis en cache pour la journée
+@st.cache_data(ttl=86400, show_spinner="Chargement de l'historique des FNB témoins...")
+def rendements_proxies(tickers):
+    instrumentation.signaler_manque()
+    with mesure("donnees", "stockage_matrice"):
+        prix = stockage.matrice(list(tickers), debut_periode("max"))
+    return rendements_journaliers(prix.ffill().dropna())
+
+
+def page_suggestions():
+    profil = lire_profil()
+
     st.header("📊 Suggestions de Portefeuille")
     st.markdown("Voici un exemple de répartition suggérée basée sur votre profil :")
 
-    labels = ["Actions canadiennes", "Actions internationales", "Obligations", "Fonds ESG", "Liquidité"]
-
-    # Étape 1: Base selon l’objectif
-    if objectif == "Épargne retraite":
-        sizes = [30, 30, 30, 0, 10]
-    elif objectif == "Achat maison":
-        sizes = [20, 20, 40, 0, 20]
-    elif objectif == "Voyage":
-        sizes = [25, 25, 30, 0, 20]
-    elif objectif == "Revenus passifs":
-        sizes = [20, 20, 50, 0, 10]
-    else:  # Autre
-        sizes = [25, 25, 25, 0, 25]
-
-    # Étape 2: Ajustement par la tolérance au risque
-    if risque == "Faible":
-        sizes[0] -= 5  # Moins d'actions canadiennes
-        sizes[1] -= 5
-        sizes[2] += 10  # Plus d'obligations
-    elif risque == "Élevée":
-        sizes[0] += 5
-        sizes[1] += 5
-        sizes[2] -= 10
-
-    # Étape 3: Ajustement par la durée
-    if duree <= 5:
-        sizes[2] += 10  # Plus d'obligations à court terme
-        sizes[0] -= 5
-        sizes[1] -= 5
-    elif duree >= 15:
-        sizes[0] += 5
-        sizes[1] += 5
-        sizes[2] -= 10
-
-    # Étape 4: Préférence ESG
-    if preference_esg:
-        esg_transfer = min(sizes[0], 10)  # max 10% transféré
-        sizes[0] -= esg_transfer // 2
-        sizes[1] -= esg_transfer // 2
-        sizes[3] += esg_transfer  # Fonds ESG
-
-    # Étape 5: Liquidité à court terme
-    if horizon_liquidite == "Oui":
-        liquidite_boost = 10
-        # Réduction équilibrée ailleurs
-        reduction = liquidite_boost // 3
-        sizes[0] -= reduction
-        sizes[1] -= reduction
-        sizes[2] -= reduction
-        sizes[4] += liquidite_boost
-
-    # Normalisation (juste au cas où les tailles dépassent 100 ou sont < 0)
-    total = sum(sizes)
-    sizes = [round(s / total * 100) for s in sizes]
+    # Répartition et explication lues dans la table précalculée des profils
+    with mesure("calcul", "allocation_profil"):
+        sizes, explication = allocation_profil(profil)
 
     # Affichage du graphique
-    fig, ax = plt.subplots()
-    ax.pie(sizes, labels=labels, autopct='%1.1f%%', startangle=90)
-    ax.axis('equal')
-    st.pyplot(fig)
+    with instrumentation.mesurer_cache("image_allocation"):
+        image = image_allocation(tuple(sizes))
+    st.image(image, width="stretch")
 
     # Résumé explicatif
     st.markdown("### 📝 Explication personnalisée de la répartition")
-
-    explication = []
-
-    # Objectif
-    if objectif == "Épargne retraite":
-        explication.append("Votre objectif d'épargne retraite favorise une croissance à long terme, d'où une part importante en actions et une diversification équilibrée.")
-    elif objectif == "Achat maison":
-        explication.append("L'achat d'une maison implique un horizon de placement plus court, donc davantage d'obligations et de liquidités pour sécuriser votre capital.")
-    elif objectif == "Voyage":
-        explication.append("Un projet de voyage nécessite des fonds disponibles sous peu, donc plus de liquidités et d'actifs à faible risque.")
-    elif objectif == "Revenus passifs":
-        explication.append("Vous cherchez à générer des revenus réguliers, les obligations occupent donc une place centrale dans votre portefeuille.")
-    else:
-        explication.append("Votre objectif général a mené à une répartition équilibrée entre croissance, revenu et sécurité.")
-
-    # Tolérance au risque
-    if risque == "Faible":
-        explication.append("Votre faible tolérance au risque a réduit l'exposition aux actions et renforcé les actifs stables comme les obligations.")
-    elif risque == "Modérée":
-        explication.append("Votre profil modéré combine actions et obligations pour équilibrer rendement et sécurité.")
-    elif risque == "Élevée":
-        explication.append("Votre tolérance élevée au risque augmente l'exposition aux actions pour maximiser le potentiel de rendement.")
-
-    # Durée
-    if duree <= 5:
-        explication.append("Comme votre horizon de placement est court, la priorité a été mise sur des actifs plus sécuritaires.")
-    elif duree >= 15:
-        explication.append("Avec un horizon à long terme, le portefeuille favorise les actions pour maximiser le rendement dans le temps.")
-
-    # ESG
-    if preference_esg:
-        explication.append("Votre préférence pour les investissements responsables a conduit à une réallocation vers des fonds ESG.")
-
-    # Liquidité
-    if horizon_liquidite == "Oui":
-        explication.append("Comme vous avez besoin de liquidités à court terme, une part plus importante a été allouée à des actifs très accessibles.")
-
     st.markdown("<br>".join(explication), unsafe_allow_html=True)
 
+    # Répartition rejouée sur l'historique des FNB témoins de chaque classe
+    with st.expander("📈 Tester la répartition sur l'historique"):
+        with instrumentation.mesurer_cache("proxies_fnb"):
+            proxies = proxies_fnb()
+        st.caption("FNB témoins : " + ", ".join(f"{c} → {t}" for c, t in proxies.items()))
+        frequences = st.multiselect("Fréquences de rééquilibrage", list(FREQUENCES), default=list(FREQUENCES))
+        variantes = {"Suggérée": sizes}
+        if st.checkbox("Comparer aux autres niveaux de risque"):
+            for risque in RISQUES:
+                if risque != profil["risque"]:
+                    variantes[f"Tolérance {risque.lower()}"] = allocation_profil({**profil, "risque": risque})[0]
+        if frequences:
+            variantes = pd.DataFrame.from_dict(variantes, orient="index", columns=CLASSES)
+            # Seules les classes détenues limitent le début de l'historique
+            classes = [c for c in CLASSES if variantes[c].any()]
+            try:
+                with instrumentation.mesurer_cache("rendements_proxies"):
+                    rendements = rendements_proxies(tuple(proxies[c] for c in classes)).set_axis(classes, axis=1)
+                with mesure("calcul", "backtest"):
+                    courbes = comparer(rendements, variantes[classes], {f: FREQUENCES[f] for f in frequences},
+                                       profil["montant_initial"], profil["investissement_mensuel"])
+                    tableau = statistiques(courbes, profil["montant_initial"], profil["investissement_mensuel"])
+            except Exception as e:
+                st.error(f"Erreur lors du backtest : {e}")
+            else:
+                st.markdown(f"Du {rendements.index[0]:%d/%m/%Y} au {rendements.index[-1]:%d/%m/%Y}, "
+                            f"avec {profil['montant_initial']:,.0f} $ au départ et "
+                            f"{profil['investissement_mensuel']:,.0f} $ versés chaque mois.")
+                st.line_chart(courbes.resample("W").last())
+                st.dataframe(tableau.round(2), width="stretch")
+
+    # Allocation de nombreux profils clients à partir d'un CSV
+    with st.expander("📂 Allocation en lot"):
+        st.write("Colonnes attendues : objectif, risque, duree, preference_esg, horizon_liquidite.")
+        fichier = st.file_uploader("Fichier CSV de profils clients", type="csv")
+        if fichier is not None:
+            try:
+                with mesure("calcul", "allocation_lot"):
+                    resultats = allouer_lot(fichier)
+                st.dataframe(resultats.head(100), width="stretch")
+                st.download_button(
+                    label="📥 Télécharger les allocations",
+                    data=resultats.to_csv(index=False).encode('utf-8'),
+                    file_name='allocations.csv',
+                    mime='text/csv'
+                )
+            except Exception as e:
+                st.error(f"Erreur lors du traitement du fichier : {e}")
+
 # 3. Simulateur de Rendement
-with tabs[2]:
+# Niveaux de versement mensuel de la grille de scénarios
+NIVEAUX_VERSEMENT = 101
+
+
+def carte_scenarios(z, x, y, titre_x, titre_y, titre, format_valeur):
+    import plotly.graph_objects as go
+    fig = go.Figure(go.Heatmap(z=z, x=x, y=y, colorscale="Viridis",
+                               hovertemplate=f"{titre_x} : %{{x}}<br>{titre_y} : %{{y}}<br>{titre} : %{{z:{format_valeur}}}<extra></extra>"))
+    fig.update_layout(title=titre, xaxis_title=titre_x, yaxis_title=titre_y)
+    with mesure("graphique", "plotly_scenarios"):
+        st.plotly_chart(fig, width="stretch")
+
+
+def page_simulateur():
+    profil = lire_profil()
+    montant_initial, investissement_mensuel, duree = profil["montant_initial"], profil["investissement_mensuel"], profil["duree"]
+
     st.header("📈 Simulateur de Rendement")
     taux = st.slider("Taux de rendement annuel (%)", 1, 15, 5)
-    capital = montant_initial
-    historique = []
-    for annee in range(duree):
-        capital = capital * (1 + taux / 100) + 12 * investissement_mensuel
-        historique.append(capital)
+    with mesure("calcul", "simuler_rendement"):
+        historique = simuler_rendement(montant_initial, investissement_mensuel, taux, duree)
+    capital = historique[-1] if len(historique) else montant_initial
 
     st.line_chart(historique)
     st.metric("Montant estimé à terme", f"{capital:,.2f} $")
+    st.caption("Intérêts composés chaque mois au taux mensuel équivalent; versements en fin de mois.")
+
+    # Tous les scénarios taux x durée x versement en un seul calcul
+    st.subheader("🗺️ Grille de scénarios")
+    col1, col2, col3 = st.columns(3)
+    taux_min, taux_max = col1.slider("Taux annuels (%)", 0.0, 15.0, (1.0, 12.0), 0.5)
+    duree_min, duree_max = col2.slider("Durées (années)", 1, 50, (1, max(duree, 30)))
+    versement_max = col3.number_input("Versement mensuel maximal ($)", min_value=100,
+                                      value=max(1000, 2 * investissement_mensuel), step=100)
+    taux_grille = np.arange(taux_min, taux_max + 0.25, 0.5)
+    durees = np.arange(duree_min, duree_max + 1)
+    versements = np.linspace(0, versement_max, NIVEAUX_VERSEMENT)
+    with mesure("calcul", "grille_scenarios"):
+        grille = grille_scenarios(montant_initial, taux_grille, durees, versements)
+    st.caption(f"{grille.size:,} scénarios calculés, capital initial de {montant_initial:,.0f} $.")
+    versement = st.select_slider("Versement mensuel affiché ($)", options=versements,
+                                 value=versements[np.abs(versements - investissement_mensuel).argmin()],
+                                 format_func=lambda v: f"{v:,.0f}")
+    carte_scenarios(grille[:, :, np.searchsorted(versements, versement)], durees, taux_grille,
+                    "Durée (années)", "Taux annuel (%)", "Capital final ($)", ",.0f")
+
+    # Recherche d'objectif : l'inconnue est le versement mensuel ou le taux
+    st.subheader("🎯 Objectif de capital")
+    cible = st.number_input("Capital visé ($)", min_value=0, value=int(max(round(capital * 1.5, -4), 10_000)),
+                            step=10_000)
+    inconnue = st.radio("Valeur à déterminer", ["Versement mensuel", "Taux de rendement"], horizontal=True)
+    if inconnue == "Versement mensuel":
+        with mesure("calcul", "versement_requis"):
+            requis = float(versement_requis(montant_initial, taux, duree, cible))
+            carte = versement_requis(montant_initial, taux_grille[:, None], durees[None, :], cible)
+        st.metric(f"Versement mensuel requis ({taux} %, {duree} ans)", f"{requis:,.2f} $")
+        carte_scenarios(carte, durees, taux_grille, "Durée (années)", "Taux annuel (%)",
+                        "Versement mensuel requis ($)", ",.0f")
+    else:
+        with mesure("calcul", "taux_requis"):
+            requis = float(taux_requis(montant_initial, investissement_mensuel, duree, cible))
+            carte = taux_requis(montant_initial, versements[None, :], durees[:, None], cible)
+        st.metric(f"Taux annuel requis ({investissement_mensuel:,.0f} $ par mois, {duree} ans)",
+                  "Hors d'atteinte" if np.isnan(requis) else f"{requis:.2f} %")
+        carte_scenarios(carte, versements, durees, "Versement mensuel ($)", "Durée (années)",
+                        "Taux annuel requis (%)", ".2f")
 
 # 4. Comparateur de Fonds
-with tabs[3]:
-    # Charger les tickers depuis le fichier CSV
-    fnb_df = pd.read_csv("fnb_americains.csv")
+def extraire_infos(ticker):
+    # Données de base et performance sur un an d'un FNB (exécuté sur un fil du pool du comparateur)
+    with mesure("cache", "fondamentaux"):
+        info = fondamentaux.obtenir(ticker, champs=["longName", "symbol", "category", "expenseRatio",
+                                                     "totalAssets", "threeYearAverageReturn"])
+    with mesure("donnees", "memoire_prix"):
+        closes = memoire_prix.vue(ticker, date.today() - timedelta(days=365)).close
+    rendements = np.diff(closes) / closes[:-1]
+
+    return {
+        "Nom complet": info.get("longName", "N/A"),
+        "Symbole": info.get("symbol", "N/A"),
+        "Catégorie": info.get("category", "N/A"),
+        "Frais de gestion (%)": f"{info.get('expenseRatio', 0) * 100:.2f}%" if info.get('expenseRatio') else "N/A",
+        "Actif net (G$)": f"{info.get('totalAssets', 0) / 1e9:.2f}" if info.get('totalAssets') else "N/A",
+        "Rendement 1 an (%)": f"{info.get('threeYearAverageReturn', 0) * 100:.2f}%" if info.get('threeYearAverageReturn') else "N/A",
+        "Performance 1 an (%)": f"{(closes[-1] / closes[0] - 1) * 100:.2f}%" if len(closes) > 1 else "N/A",
+        "Volatilité 1 an (%)": f"{rendements.std() * np.sqrt(JOURS_PAR_AN) * 100:.2f}%" if len(rendements) > 1 else "N/A",
+    }
+
+
+# Fils partagés par toutes les sessions pour les requêtes du comparateur
+TRAVAILLEURS_COMPARATEUR = 8
+DELAI_COMPARATEUR = 15
+
+@st.cache_resource
+def obtenir_pool_comparateur():
+    return ThreadPoolExecutor(max_workers=TRAVAILLEURS_COMPARATEUR, thread_name_prefix="comparateur")
+
+
+@st.cache_resource
+def obtenir_appels_comparateur():
+    # Un fonds qui ne répond pas n'occupe qu'un fil, quel que soit le nombre de comparaisons qui l'attendent
+    appels = AppelsEnVol()
+    instrumentation.enregistrer_jauges("comparateur", lambda: {"appels_en_vol": len(appels)})
+    return appels
+
+
+def page_comparateur():
+    with instrumentation.mesurer_cache("fnb"):
+        fnb_df = lire_fnb()
     tickers = fnb_df["ticker"].tolist()
 
     # Section Streamlit
     st.header("🔍 Comparateur de FNB Américains")
 
-    col1, col2 = st.columns(2)
-    with col1:
-        fond1 = st.selectbox("Choisir le premier FNB", tickers, key="fond1")
-    with col2:
-        fond2 = st.selectbox("Choisir le deuxième FNB", tickers, key="fond2", index=1)
-
-    # Fonction pour extraire les données financières de base
-    def extraire_infos(ticker):
-        try:
-            fnb = yf.Ticker(ticker)
-            info = fnb.info
-
-            return {
-                "Nom complet": info.get("longName", "N/A"),
-                "Symbole": info.get("symbol", "N/A"),
-                "Catégorie": info.get("category", "N/A"),
-                "Frais de gestion (%)": f"{info.get('expenseRatio', 0) * 100:.2f}%" if info.get('expenseRatio') else "N/A",
-                "Actif net (G$)": f"{info.get('totalAssets', 0) / 1e9:.2f}" if info.get('totalAssets') else "N/A",
-                "Rendement 1 an (%)": f"{info.get('threeYearAverageReturn', 0) * 100:.2f}%" if info.get('threeYearAverageReturn') else "N/A",
-            }
-        except Exception as e:
-            return {"Nom complet": "Erreur", "Symbole": ticker}
+    fonds = st.multiselect("Choisir les FNB à comparer", tickers, default=tickers[:2], key="fonds_compares")
+    if not fonds:
+        st.info("Sélectionnez au moins un FNB.")
+        return
 
-    # Extraire les infos pour chaque fonds sélectionné
-    data_fond1 = extraire_infos(fond1)
-    data_fond2 = extraire_infos(fond2)
+    # Les fonds sont interrogés en parallèle; le tableau se remplit à mesure des réponses
+    st.subheader("📊 Tableau comparatif")
+    tableau = st.empty()
+    colonnes = {ticker: {"Nom complet": "⏳ Chargement...", "Symbole": ticker} for ticker in fonds}
+    tableau.dataframe(pd.DataFrame(colonnes).rename_axis("Paramètre"), width="stretch")
+    echecs = []
+    with mesure("donnees", "comparateur"):
+        for ticker, infos, erreur in collecter(obtenir_pool_comparateur(), extraire_infos, fonds, DELAI_COMPARATEUR,
+                                               obtenir_appels_comparateur()):
+            if erreur is None:
+                colonnes[ticker] = infos
+            else:
+                delai = isinstance(erreur, TimeoutError)
+                colonnes[ticker] = {"Nom complet": "⏱ Délai dépassé" if delai else "❌ Erreur", "Symbole": ticker}
+                echecs.append(f"{ticker} : {erreur}")
+                instrumentation.compter("comparateur_delais" if delai else "comparateur_erreurs")
+            parametres = list(dict.fromkeys(p for infos in colonnes.values() for p in infos))
+            comparaison = pd.DataFrame(colonnes).reindex(parametres).fillna("").rename_axis("Paramètre")
+            tableau.dataframe(comparaison, width="stretch")
+    if echecs:
+        st.caption("Fonds non disponibles : " + " · ".join(echecs))
+
+# Covariance des FNB par fenêtre, partagée par toutes les sessions et prolongée à l'arrivée des barres
+@st.cache_resource
+def obtenir_covariances_fnb():
+    return {"verrou": threading.Lock(), "etats": {}}
+
+
+def covariance_fnb(prix, fenetre):
+    partage = obtenir_covariances_fnb()
+    with partage["verrou"]:
+        etat, reutilisable = prolonger_covariance(partage["etats"].get(fenetre), rendements_journaliers(prix), fenetre)
+        partage["etats"][fenetre] = etat
+        covariance, intensite = etat["covariance"].covariance_retrecie()
+        moyenne = etat["covariance"].moyenne()
+    instrumentation.compter(f"cache_covariance_fnb_{'succes' if reutilisable else 'echecs'}")
+    return moyenne, covariance, intensite
+
+
+# 4 bis. Optimiseur de Portefeuille
+def page_optimiseur():
+    import plotly.graph_objects as go
+    profil = lire_profil()
+
+    st.header("📐 Optimiseur de Portefeuille")
+    st.markdown("Frontière efficiente des FNB américains, à partir des rendements historiques "
+                "et d'une covariance rétrécie (Ledoit-Wolf).")
+    with instrumentation.mesurer_cache("fnb"):
+        fnb_df = lire_fnb()
+
+    col1, col2, col3 = st.columns(3)
+    fenetre = col1.select_slider("Historique", options=[252, 504, 756, 1260], value=756,
+                                 format_func=lambda jours: f"{jours // 252} an{'s' if jours > 252 else ''}")
+    poids_max = col2.slider("Poids maximal par FNB (%)", min_value=5, max_value=100, value=30)
+    plancher = col3.slider("Part minimale d'obligations (%)", min_value=0, max_value=80,
+                           value=int(PLANCHERS_OBLIGATIONS[profil["risque"]] * 100))
+    esg = st.checkbox("FNB ESG seulement", value=profil["preference_esg"])
 
-    # Créer un tableau comparatif
-    comparaison = pd.DataFrame({
-        "Paramètre": list(data_fond1.keys()),
-        fond1: list(data_fond1.values()),
-        fond2: list(data_fond2.values())
-    })
+    try:
+        with mesure("donnees", "stockage_matrice"):
+            prix = stockage.matrice(fnb_df["ticker"].tolist(), date.today() - timedelta(days=fenetre * 365 // 252 + 30))
+    except Exception as e:
+        st.error(f"Erreur lors de la récupération des prix : {e}")
+        return
+    prix = prix.dropna(axis=1, how="all")
+    if len(prix) < 3:
+        st.warning("Pas assez de données pour estimer la covariance.")
+        return
+    with mesure("calcul", "covariance_fnb"):
+        moyenne, covariance, intensite = covariance_fnb(prix, fenetre)
+
+    univers = fnb_df[fnb_df["ticker"].isin(prix.columns) & (fnb_df["esg"] | (not esg))]
+    tickers = univers["ticker"].tolist()
+    rendements = moyenne[tickers].to_numpy() * JOURS_PAR_AN
+    matrice = covariance.loc[tickers, tickers].to_numpy() * JOURS_PAR_AN
+    try:
+        with mesure("calcul", "frontiere"):
+            resultat = frontiere(rendements, matrice, haut=poids_max / 100,
+                                 obligations=(univers["type"] == "Obligations").to_numpy(), plancher=plancher / 100)
+    except ValueError as e:
+        st.warning(str(e))
+        return
+
+    volatilites, esperances = resultat.volatilites * 100, resultat.rendements * 100
+    cible = st.slider("Volatilité visée (%)", min_value=float(round(volatilites.min(), 1)),
+                      max_value=float(round(volatilites.max(), 1)), value=float(round(np.median(volatilites), 1)),
+                      step=0.1)
+    point = int(np.argmin(np.abs(volatilites - cible)))
+
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(x=volatilites, y=esperances, mode="lines", name="Frontière efficiente"))
+    fig.add_trace(go.Scatter(x=np.sqrt(np.diag(matrice)) * 100, y=rendements * 100, mode="markers+text",
+                             text=tickers, textposition="top center", name="FNB"))
+    fig.add_trace(go.Scatter(x=[volatilites[point]], y=[esperances[point]], mode="markers",
+                             marker=dict(size=14, symbol="star"), name="Portefeuille choisi"))
+    fig.update_layout(xaxis_title="Volatilité annuelle (%)", yaxis_title="Rendement annuel attendu (%)", height=500)
+    with mesure("graphique", "plotly_frontiere"):
+        st.plotly_chart(fig, width="stretch")
 
-    st.subheader("📊 Tableau comparatif")
-    st.dataframe(comparaison, use_container_width=True)
+    col1, col2 = st.columns(2)
+    col1.metric("Rendement attendu", f"{esperances[point]:.2f} %")
+    col2.metric("Volatilité", f"{volatilites[point]:.2f} %")
+    repartition = univers.assign(**{"Poids (%)": resultat.poids[point] * 100})
+    repartition = repartition[repartition["Poids (%)"] >= 0.05].sort_values("Poids (%)", ascending=False)
+    st.dataframe(repartition[["ticker", "type", "Poids (%)"]].round(2), width="stretch", hide_index=True)
+    st.caption(f"{len(tickers)} FNB, {len(resultat.rendements)} points résolus en {resultat.iterations} itérations. "
+               f"Intensité du rétrécissement de la covariance : {intensite:.2f}. "
+               "Les rendements passés ne garantissent pas les rendements futurs.")
 
 # 5. Recherche d'Actions
-with tabs[4]:
+def page_recherche():
+    import plotly.graph_objects as go
     st.header("📊 Recherche d'Actions")
 
-    # Liste des 500 actions du S&P500
-    sp500_df = pd.read_csv("tickers_sp500.csv")
-       
     col1, col2 = st.columns(2)
     with col1:
-        ticker = st.selectbox("Choisissez un ticker du S&P 500", sp500_df)
+        ticker = choisir_ticker("Choisissez un titre (S&P 500 par défaut)", "ticker_recherche")
 
     with col2:
         periode = st.selectbox("Période à afficher", ["1mo", "6mo", "1y", "5y", "max"], index=2)
 
     if ticker:
         try:
-            data = yf.Ticker(ticker)
-            info = data.info
-            hist = data.history(period=periode)
+            with mesure("cache", "fondamentaux"):
+                info = fondamentaux.obtenir(ticker, champs=["longName", "currentPrice", "sector", "marketCap",
+                                                             "dividendYield", "longBusinessSummary"])
+            with mesure("donnees", "memoire_prix"):
+                vue = memoire_prix.vue(ticker, debut_periode(periode))
 
             st.subheader(info.get("longName", ticker))
             st.write(f"📈 Prix actuel : ${info.get('currentPrice', 'N/A')}")
@@ -305,16 +566,20 @@ with tabs[4]:
             st.write(f"🔍 Description : {info.get('longBusinessSummary', 'N/A')}")
 
             # Affichage du graphique de l’évolution des prix
+            # Série réduite à un nombre borné de points (LTTB) pour les longues périodes
+            with mesure("calcul", "echantillonnage"):
+                clotures = reduire_serie(pd.Series(vue.close, index=vue.index()))
             fig = go.Figure()
-            fig.add_trace(go.Scatter(x=hist.index, y=hist["Close"], mode="lines", name="Prix de clôture"))
+            fig.add_trace(go.Scatter(x=clotures.index, y=clotures, mode="lines", name="Prix de clôture"))
             fig.update_layout(title=f"Évolution du prix - {ticker}", xaxis_title="Date", yaxis_title="Prix ($)", height=400)
-            st.plotly_chart(fig, use_container_width=True)
+            with mesure("graphique", "plotly_prix"):
+                st.plotly_chart(fig, width="stretch")
 
         except Exception as e:
             st.error(f"Erreur lors de la récupération des données : {e}")
 
 # 6. FAQ
-with tabs[5]:
+def page_faq():
     st.header("❓ Questions fréquentes")
     with st.expander("C'est quoi un ETF?"):
         st.write("Un ETF (Exchange Traded Fund) est un fonds qui regroupe plusieurs actifs, comme des actions ou des obligations, et qui se transige en bourse comme une action.")
@@ -326,17 +591,19 @@ with tabs[5]:
         st.write("Oui, avant d’investir à long terme, il est important d’avoir un coussin de sécurité.")
 
 # 7. Analyse Technique
-with tabs[6]:
+def page_analyse_technique():
+    import plotly.graph_objects as go
     st.header("📉 Analyse Technique")
 
     st.info("Sélectionnez un actif et une plage de dates pour afficher son graphique technique.")
 
     try:
-        sp500_df = pd.read_csv("tickers_sp500.csv")
-        ticker = st.selectbox("Choisissez un ticker", sp500_df.squeeze().tolist())
+        ticker = choisir_ticker("Choisissez un ticker", "ticker_analyse")
     except Exception as e:
         st.error(f"Erreur lors du chargement des tickers : {e}")
         st.stop()
+    if ticker is None:
+        return
 
     col1, col2 = st.columns(2)
     with col1:
@@ -349,52 +616,46 @@ with tabs[6]:
     show_macd = st.checkbox("Afficher le MACD")
 
     if start_date < end_date:
-        df = yf.download(ticker, start=start_date, end=end_date)
-
-        if not df.empty:
-            # Calcul des indicateurs techniques
-            df['SMA20'] = df['Close'].rolling(window=20).mean()
-
-            try:
-                delta = df['Close'].diff()
-                gain = delta.copy()
-                gain[delta < 0] = 0
-                loss = -delta.copy()
-                loss[delta > 0] = 0
-                avg_gain = gain.rolling(window=14).mean()
-                avg_loss = loss.rolling(window=14).mean()
-                rs = avg_gain / avg_loss
-                df['RSI'] = 100 - (100 / (1 + rs))
-            except Exception as e:
-                st.warning(f"RSI non calculé : {e}")
-
-            df['EMA12'] = df['Close'].ewm(span=12, adjust=False).mean()
-            df['EMA26'] = df['Close'].ewm(span=26, adjust=False).mean()
-            df['MACD'] = df['EMA12'] - df['EMA26']
-            df['Signal'] = df['MACD'].ewm(span=9, adjust=False).mean()
+        with mesure("donnees", "memoire_prix"):
+            vue = memoire_prix.vue(ticker, start_date, end_date)
+
+        if len(vue):
+            # Indicateurs calculés à la demande et partagés entre sessions (prolongés incrémentalement)
+            with mesure("calcul", "indicateurs"):
+                indicateurs = memoire_prix.indicateurs(ticker, vue)
+            df = vue.dataframe()
+            courbes = {nom: pd.Series(valeurs, index=df.index) for nom, valeurs in indicateurs.items()}
+
+            # Chandeliers agrégés selon l'étendue affichée, courbes réduites par LTTB
+            with mesure("calcul", "echantillonnage"):
+                regle, granularite = choisir_granularite(df.index)
+                barres = agreger_ohlcv(df, regle)
+            if regle is not None:
+                st.caption(f"Affichage en barres {granularite}s : {len(barres)} barres pour {len(df)} séances.")
 
             # --------- GRAPHIQUE PRINCIPAL -----------
             fig = go.Figure()
 
             # Ajout des chandeliers toujours
             fig.add_trace(go.Candlestick(
-                x=df.index,
-                open=df['Open'], high=df['High'],
-                low=df['Low'], close=df['Close'],
+                x=barres.index,
+                open=barres['Open'], high=barres['High'],
+                low=barres['Low'], close=barres['Close'],
                 name='Chandeliers'
             ))
 
             # Ajout conditionnel de la SMA
             if show_sma:
+                sma20 = reduire_serie(courbes['SMA20'])
                 fig.add_trace(go.Scatter(
-                    x=df.index, y=df['SMA20'],
+                    x=sma20.index, y=sma20,
                     line=dict(color='blue', width=1),
                     name='SMA 20'
                 ))
 
             # Ajout du volume (toujours pour embellir)
             fig.add_trace(go.Bar(
-                x=df.index, y=df['Volume'],
+                x=barres.index, y=barres['Volume'],
                 name='Volume',
                 marker_opacity=0.3,
                 yaxis='y2'
@@ -409,25 +670,31 @@ with tabs[6]:
                 height=600
             )
 
-            st.plotly_chart(fig, use_container_width=True)
+            with mesure("graphique", "plotly_chandeliers"):
+                st.plotly_chart(fig, width="stretch")
 
             # --------- GRAPHIQUE RSI -----------
-            if show_rsi and 'RSI' in df:
+            if show_rsi:
+                rsi = reduire_serie(courbes['RSI'])
                 rsi_fig = go.Figure()
                 rsi_fig.add_trace(go.Scatter(
-                    x=df.index, y=df['RSI'],
+                    x=rsi.index, y=rsi,
                     line=dict(color='orange'), name='RSI'
                 ))
                 rsi_fig.update_layout(title="RSI (14)", yaxis_range=[0, 100], height=200)
-                st.plotly_chart(rsi_fig, use_container_width=True)
+                with mesure("graphique", "plotly_rsi"):
+                    st.plotly_chart(rsi_fig, width="stretch")
 
             # --------- GRAPHIQUE MACD -----------
             if show_macd:
+                ligne_macd = reduire_serie(courbes['MACD'])
+                ligne_signal = reduire_serie(courbes['Signal'])
                 macd_fig = go.Figure()
-                macd_fig.add_trace(go.Scatter(x=df.index, y=df['MACD'], name="MACD", line=dict(color="green")))
-                macd_fig.add_trace(go.Scatter(x=df.index, y=df['Signal'], name="Signal", line=dict(color="red")))
+                macd_fig.add_trace(go.Scatter(x=ligne_macd.index, y=ligne_macd, name="MACD", line=dict(color="green")))
+                macd_fig.add_trace(go.Scatter(x=ligne_signal.index, y=ligne_signal, name="Signal", line=dict(color="red")))
                 macd_fig.update_layout(title="MACD", height=200)
-                st.plotly_chart(macd_fig, use_container_width=True)
+                with mesure("graphique", "plotly_macd"):
+                    st.plotly_chart(macd_fig, width="stretch")
 
         else:
             st.warning("Aucune donnée disponible pour cette période.")
@@ -435,8 +702,67 @@ with tabs[6]:
         st.error("La date de début doit être antérieure à la date de fin.")
 
 
+# Screener S&P 500
+# Calcul vectorisé dans le processus du serveur : pas de fork depuis un serveur multifil
+@st.cache_data(ttl=900, show_spinner="Calcul des indicateurs pour tout l'univers...")
+def resultats_screener(jour):
+    instrumentation.signaler_manque()
+    sp500 = obtenir_univers().symboles("sp500")
+    with mesure("donnees", "stockage_matrice"):
+        prix = stockage.matrice(sp500, jour - timedelta(days=400))
+    with mesure("calcul", "cribler"):
+        return cribler(prix)
+
+
+def page_screener():
+    st.header("🔎 Screener S&P 500")
+    st.info("Rendements, volatilité, croisements SMA 50/200, RSI et MACD pour tous les titres du S&P 500.")
+
+    try:
+        with instrumentation.mesurer_cache("screener"):
+            resultats = resultats_screener(date.today())
+    except Exception as e:
+        st.error(f"Erreur lors du calcul du screener : {e}")
+        return
+
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        signaux_macd = st.multiselect("Signal MACD", ["Achat", "Vente", "Haussier", "Baissier"])
+    with col2:
+        tendances_sma = st.multiselect("Tendance SMA 50/200", ["Croisement haussier", "Croisement baissier", "Haussière", "Baissière"])
+    with col3:
+        zones_rsi = st.multiselect("Zone RSI", ["Surachat", "Survente", "Neutre"])
+
+    col1, col2 = st.columns(2)
+    with col1:
+        rendement_min = st.slider("Rendement 1 an minimum (%)", -100, 200, -100)
+    with col2:
+        volatilite_max = st.slider("Volatilité maximum (%)", 0, 150, 150)
+
+    filtre = resultats[
+        (resultats["Rendement 1 an (%)"].fillna(-100) >= rendement_min)
+        & (resultats["Volatilité (%)"].fillna(0) <= volatilite_max)
+    ]
+    if signaux_macd:
+        filtre = filtre[filtre["Signal MACD"].isin(signaux_macd)]
+    if tendances_sma:
+        filtre = filtre[filtre["Tendance SMA 50/200"].isin(tendances_sma)]
+    if zones_rsi:
+        filtre = filtre[filtre["Zone RSI"].isin(zones_rsi)]
+
+    colonnes_numeriques = list(resultats.select_dtypes("number").columns)
+    col1, col2 = st.columns(2)
+    with col1:
+        tri = st.selectbox("Trier par", colonnes_numeriques, index=colonnes_numeriques.index("Rendement 1 an (%)"))
+    with col2:
+        ordre = st.radio("Ordre", ["Décroissant", "Croissant"], horizontal=True)
+
+    st.caption(f"{len(filtre)} titres sur {len(resultats)}")
+    st.dataframe(filtre.sort_values(tri, ascending=ordre == "Croissant").round(2), width="stretch")
+
+
 # 8. Glossaire
-with tabs[7]:
+def page_glossaire():
     st.header("\U0001F4D8 Glossaire Financier")
 
     st.markdown("**ETF** : Fonds négocié en bourse, panier d'actifs transigé comme une action.")
@@ -461,8 +787,18 @@ with tabs[7]:
     st.markdown("**MACD (Moving Average Convergence Divergence)** : Indicateur de suivi de tendance basé sur la différence entre deux moyennes mobiles exponentielles.")
 
 
+# Covariance glissante de la watchlist, prolongée d'un jour ou d'un ticker sans tout recalculer
+def covariance_session(prix, fenetre):
+    etat, reutilisable = prolonger_covariance(st.session_state.get("covariance_watchlist"),
+                                              rendements_journaliers(prix), fenetre)
+    instrumentation.compter(f"cache_covariance_{'succes' if reutilisable else 'echecs'}")
+    st.session_state["covariance_watchlist"] = etat
+    return etat["covariance"]
+
+
 # 9. Watchlist
-with tabs[8]:
+def page_watchlist():
+    import plotly.graph_objects as go
     st.header("\U0001F4DD Ma Watchlist")
 
     watchlist_input = st.text_area("Ajouter des actions à suivre (séparées par des virgules)", "")
@@ -480,36 +816,141 @@ with tabs[8]:
             file_name='ma_watchlist.csv',
             mime='text/csv'
         )
+
+        # Tableau de bord de risque
+        st.write("### Risque de la liste de suivi :")
+        fenetre = st.select_slider("Fenêtre de calcul", options=[63, 126, 252, 504, 756], value=252,
+                                   format_func=lambda jours: f"{jours} jours")
+        try:
+            # Un seul téléchargement groupé pour toute la liste et l'indice de référence
+            with mesure("donnees", "stockage_matrice"):
+                prix = stockage.matrice(actions + ["^GSPC"], date.today() - timedelta(days=fenetre * 365 // 252 + 30))
+        except Exception as e:
+            st.error(f"Erreur lors de la récupération des prix : {e}")
+            return
+        prix = prix.dropna(axis=1, how="all")
+        introuvables = [a for a in actions if a not in prix.columns]
+        if introuvables:
+            st.warning(f"Aucune donnée pour : {', '.join(introuvables)}")
+        if len(prix) < 3 or prix.shape[1] == 0:
+            st.warning("Pas assez de données pour calculer les indicateurs de risque.")
+            return
+
+        with mesure("calcul", "risque"):
+            covariance = covariance_session(prix, fenetre)
+            tableau = tableau_risque(prix, covariance)
+        st.dataframe(tableau.round(2), width="stretch")
+
+        correlation = covariance.correlation()
+        fig = go.Figure(go.Heatmap(z=correlation.values, x=correlation.columns, y=correlation.index,
+                                   zmin=-1, zmax=1, colorscale="RdBu"))
+        fig.update_layout(title="Matrice de corrélation", height=max(400, 12 * len(correlation)))
+        with mesure("graphique", "plotly_correlation"):
+            st.plotly_chart(fig, width="stretch")
+
+        presents = [a for a in actions if a in prix.columns]
+        choix = st.multiselect("Drawdowns à afficher", presents, default=presents[:10])
+        if choix:
+            st.line_chart(drawdowns(prix[choix].iloc[-fenetre - 1:]) * 100)
     else:
         st.info("Ajoutez des tickers pour créer votre liste de suivi.")
 
 
 # 10. Simulation Monte Carlo
-with tabs[9]:
+# Simulation et image mises en cache selon les paramètres : un rerun sans changement ne recalcule rien
+@st.cache_data(max_entries=64, show_spinner="Simulation en cours...")
+def rendu_monte_carlo(montant_initial, rendement_moyen, volatilite, duree, num_simulations):
+    instrumentation.signaler_manque()
+    with mesure("calcul", "monte_carlo"):
+        resultat = simuler_monte_carlo(montant_initial, rendement_moyen, volatilite, duree, num_simulations)
+    finaux = {p: float(bande[-1]) for p, bande in resultat.percentiles.items()}
+    with mesure("graphique", "matplotlib_eventail"):
+        return rendre_png(eventail, resultat.annees, resultat.percentiles), finaux
+
+
+# Rendements mensuels historiques d'un ticker ou d'un panier, mis en cache pour la journée
+@st.cache_data(ttl=86400, show_spinner="Chargement de l'historique des rendements...")
+def historique_mensuel(tickers, poids):
+    instrumentation.signaler_manque()
+    with mesure("donnees", "stockage_matrice"):
+        prix = stockage.matrice(list(tickers), debut_periode("max"))
+    return rendements_mensuels(prix.dropna(axis=1, how="all"), dict(zip(tickers, poids)))
+
+
+@st.cache_data(max_entries=64, show_spinner="Simulation en cours...")
+def rendu_bootstrap(tickers, poids, montant_initial, investissement_mensuel, duree, num_simulations,
+                    longueur_bloc, cible):
+    instrumentation.signaler_manque()
+    historique = historique_mensuel(tickers, poids)
+    with mesure("calcul", "monte_carlo_bootstrap"):
+        resultat = simuler_bootstrap(historique.to_numpy(), montant_initial, investissement_mensuel, duree,
+                                     num_simulations, longueur_bloc=longueur_bloc, cible=cible)
+    finaux = {p: float(bande[-1]) for p, bande in resultat.percentiles.items()}
+    periode = (historique.index[0], historique.index[-1], len(historique))
+    with mesure("graphique", "matplotlib_eventail"):
+        return rendre_png(eventail, resultat.annees, resultat.percentiles), finaux, resultat.probabilite_cible, periode
+
+
+def page_monte_carlo():
+    profil = lire_profil()
+    montant_initial, investissement_mensuel, duree = profil["montant_initial"], profil["investissement_mensuel"], profil["duree"]
+
     st.header("🔮 Simulation Monte Carlo")
     st.markdown("Simulez des rendements futurs pour vos investissements.")
 
-    num_simulations = st.number_input("Nombre de simulations", min_value=100, max_value=10000, value=1000)
-    volatilite = st.slider("Volatilité (%)", min_value=1, max_value=50, value=20)
-    rendement_moyen = st.slider("Rendement moyen annuel (%)", min_value=1, max_value=20, value=8)
-
-    simulation_results = []
-    for _ in range(num_simulations):
-        capital_final = montant_initial
-        historique_simulation = [capital_final]
-        for _ in range(duree):
-            rendement = np.random.normal(rendement_moyen / 100, volatilite / 100)
-            capital_final *= (1 + rendement)
-            historique_simulation.append(capital_final)
-        simulation_results.append(historique_simulation)
-
-    fig, ax = plt.subplots()
-    for simulation in simulation_results[:50]:
-        ax.plot(simulation, alpha=0.3)
-    st.pyplot(fig)
+    modele = st.radio("Modèle de rendements", ["Rendements normaux", "Bootstrap historique"], horizontal=True)
+
+    if modele == "Rendements normaux":
+        num_simulations = st.number_input("Nombre de simulations", min_value=100, max_value=1000000, value=1000)
+        volatilite = st.slider("Volatilité (%)", min_value=1, max_value=50, value=20)
+        rendement_moyen = st.slider("Rendement moyen annuel (%)", min_value=1, max_value=20, value=8)
+
+        with instrumentation.mesurer_cache("monte_carlo"):
+            image, finaux = rendu_monte_carlo(montant_initial, rendement_moyen, volatilite, duree, int(num_simulations))
+        probabilite = None
+    else:
+        st.markdown("Les rendements mensuels réels sont rééchantillonnés par blocs (bootstrap stationnaire) "
+                    f"et un versement de {investissement_mensuel:,.0f} $ est ajouté chaque mois.")
+        univers = obtenir_univers()
+        choix = st.multiselect("Ticker ou panier de FNB", sorted(set(univers.symboles("fnb")) | set(univers.symboles("sp500"))),
+                               default=["SPY"])
+        if not choix:
+            st.info("Choisissez au moins un ticker.")
+            return
+        poids = []
+        for col, ticker in zip(st.columns(len(choix)), choix):
+            poids.append(col.number_input(f"Poids {ticker} (%)", min_value=0, max_value=100,
+                                          value=100 // len(choix), key=f"poids_{ticker}"))
+        if sum(poids) == 0:
+            st.warning("La somme des poids doit être positive.")
+            return
+        num_simulations = st.number_input("Nombre de simulations", min_value=100, max_value=200000, value=10000)
+        longueur_bloc = st.slider("Longueur moyenne des blocs (mois)", min_value=1, max_value=36, value=12)
+        verse = montant_initial + 12 * investissement_mensuel * duree
+        cible = st.number_input("Capital visé ($)", min_value=0, value=int(round(2 * verse, -3)), step=1000)
+
+        try:
+            with instrumentation.mesurer_cache("monte_carlo_bootstrap"):
+                image, finaux, probabilite, (debut, fin, nb_mois) = rendu_bootstrap(
+                    tuple(choix), tuple(poids), montant_initial, investissement_mensuel, duree,
+                    int(num_simulations), longueur_bloc, cible)
+        except Exception as e:
+            st.error(f"Erreur lors de la simulation : {e}")
+            return
+        st.caption(f"Historique utilisé : {nb_mois} mois, de {debut:%m/%Y} à {fin:%m/%Y}. "
+                   f"Total versé : {verse:,.0f} $.")
+
+    st.image(image, width="stretch")
+
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Capital final (5e percentile)", f"{finaux[5]:,.2f} $")
+    col2.metric("Capital final médian", f"{finaux[50]:,.2f} $")
+    col3.metric("Capital final (95e percentile)", f"{finaux[95]:,.2f} $")
+    if probabilite is not None:
+        st.metric("Probabilité d'atteindre le capital visé", f"{probabilite:.1%}")
 
 # 11. Quiz Financier
-with tabs[10]:
+def page_quiz():
     st.header("🧠 Quiz Financier")
 
     questions = [
@@ -566,7 +1007,7 @@ with tabs[10]:
             st.balloons()
 
 # 12. Cryptomonnaie
-with tabs[11]:
+def page_crypto():
     st.header("💰 Cryptomonnaie")
     st.write("""
     La cryptomonnaie est une monnaie numérique sécurisée par cryptographie. 
@@ -574,4 +1015,64 @@ with tabs[11]:
     """)
     st.write("**Bitcoin (BTC)** : La première et la plus célèbre des cryptomonnaies.")
     st.write("**Ethereum (ETH)** : Utilisé pour des applications décentralisées.")
-    st.write("**Litecoin (LTC)** : Une alternative plus rapide au Bitcoin.")
\ No newline at end of file
+    st.write("**Litecoin (LTC)** : Une alternative plus rapide au Bitcoin.")
+
+
+# Diagnostics (page masquée, accessible par /diagnostics)
+def page_diagnostics():
+    st.header("🩺 Diagnostics")
+    st.caption(f"Export Prometheus : {FICHIER_METRIQUES}")
+
+    resume = pd.DataFrame(instrumentation.resume_pages())
+    if resume.empty:
+        st.info("Aucune mesure pour l'instant.")
+    else:
+        st.subheader("Latences par page")
+        st.dataframe(resume.sort_values("total_ms", ascending=False).round(2), width="stretch")
+
+    st.subheader("Taux de succès des caches")
+    taux = pd.DataFrame(instrumentation.taux_cache()).T
+    if not taux.empty:
+        st.dataframe(taux, width="stretch")
+    st.dataframe(pd.Series(instrumentation.jauges(), name="valeur"), width="stretch")
+
+    st.subheader("Sessions")
+    sessions = pd.DataFrame(instrumentation.resume_sessions())
+    if not sessions.empty:
+        st.dataframe(sessions.round(2), width="stretch")
+
+    if st.button("Écrire l'export Prometheus maintenant"):
+        instrumentation.ecrire_prometheus(FICHIER_METRIQUES)
+        st.success("Export écrit.")
+    with st.expander("Aperçu de l'export"):
+        st.code(instrumentation.texte_prometheus(), language="text")
+
+
+# Navigation : seule la page affichée est exécutée à chaque interaction
+pages = st.navigation([
+    st.Page(page_profil, title="Profil Financier", url_path="profil", default=True),
+    st.Page(page_suggestions, title="Suggestions de Portefeuille", url_path="suggestions"),
+    st.Page(page_simulateur, title="Simulateur de Rendement", url_path="simulateur"),
+    st.Page(page_comparateur, title="Comparateur de Fonds", url_path="comparateur"),
+    st.Page(page_optimiseur, title="Optimiseur de Portefeuille", url_path="optimiseur"),
+    st.Page(page_recherche, title="Recherche d'Actions", url_path="recherche"),
+    st.Page(page_faq, title="FAQ", url_path="faq"),
+    st.Page(page_analyse_technique, title="Analyse Technique", url_path="analyse-technique"),
+    st.Page(page_screener, title="Screener S&P 500", url_path="screener"),
+    st.Page(page_glossaire, title="Glossaire", url_path="glossaire"),
+    st.Page(page_watchlist, title="Watchlist", url_path="watchlist"),
+    st.Page(page_monte_carlo, title="Simulation Monte Carlo", url_path="monte-carlo"),
+    st.Page(page_quiz, title="Quiz Financier", url_path="quiz"),
+    st.Page(page_crypto, title="Cryptomonnaie", url_path="cryptomonnaie"),
+    st.Page(page_diagnostics, title="Diagnostics", url_path="diagnostics", visibility="hidden"),
+])
+
+# Chaque rerun est mesuré et attribué à la page affichée et à la session
+if "id_session" not in st.session_state:
+    st.session_state["id_session"] = uuid4().hex[:12]
+try:
+    with instrumentation.contexte(pages.url_path or "profil", st.session_state["id_session"]):
+        with mesure("page", "rerun"):
+            pages.run()
+finally:
+    instrumentation.ecrire_si_necessaire(FICHIER_METRIQUES)
\ No newline at end of file
@@ -0,0 +1,149 @@
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from planificateur import _extraire
+
+
+class TamponCirculaire:
+    """Dernières barres d'un symbole (horodatage en ns UTC, clôture) dans des tableaux de taille fixe."""
+
+    def __init__(self, capacite=512):
+        self.capacite = capacite
+        self._horodatages = np.zeros(capacite, dtype=np.int64)
+        self._closes = np.full(capacite, np.nan)
+        self._position = 0
+        self._compte = 0
+
+    def __len__(self):
+        return self._compte
+
+    def dernier_horodatage(self):
+        if not self._compte:
+            return None
+        return int(self._horodatages[(self._position - 1) % self.capacite])
+
+    def ajouter(self, horodatages, closes):
+        """Ajoute des barres triées; une barre déjà présente (même horodatage) est remplacée."""
+        dernier = self.dernier_horodatage()
+        for horodatage, close in zip(horodatages, closes):
+            if dernier is not None and horodatage < dernier:
+                continue
+            if horodatage == dernier:
+                # La barre en cours de formation est mise à jour sur place
+                self._closes[(self._position - 1) % self.capacite] = close
+                continue
+            self._horodatages[self._position] = horodatage
+            self._closes[self._position] = close
+            self._position = (self._position + 1) % self.capacite
+            self._compte = min(self._compte + 1, self.capacite)
+            dernier = horodatage
+
+    def derniers(self, n=2):
+        """Les ``n`` dernières barres, de la plus ancienne à la plus récente (copies)."""
+        n = min(n, self._compte)
+        positions = (self._position - n + np.arange(n)) % self.capacite
+        return self._horodatages[positions], self._closes[positions]
+
+
+class RafraichisseurMarches:
+    """Rafraîchissement en arrière-plan des cours intrajournaliers, partagé par toutes les sessions.
+
+    Un seul fil interroge le fournisseur toutes les ``cadence`` secondes et ne
+    demande pour chaque symbole que les barres postérieures à son propre
+    dernier horodatage; les symboles au même curseur (même bourse) sont
+    regroupés en un téléchargement. Une cryptomonnaie cotée la nuit et le
+    week-end ne fait donc pas retélécharger les indices, et un symbole sans
+    données ne relance pas la séance complète pour les autres. Les
+    sessions lisent un instantané immuable, remplacé d'un bloc après chaque
+    rafraîchissement : l'affichage n'attend jamais le réseau et le nombre
+    d'appels ne dépend pas du nombre d'utilisateurs.
+    """
+
+    def __init__(self, fournisseur, symboles, cadence=60, intervalle="5m", capacite=512):
+        self.fournisseur = fournisseur
+        self.symboles = list(symboles)
+        self.cadence = cadence
+        self.intervalle = intervalle
+        self._tampons = {s: TamponCirculaire(capacite) for s in self.symboles}
+        self._instantane = {}
+        self._arret = threading.Event()
+        self._fil = None
+        self.derniere_erreur = None
+        self.dernier_rafraichissement = None
+
+    def demarrer(self):
+        if self._fil is None or not self._fil.is_alive():
+            self._arret.clear()
+            self._fil = threading.Thread(target=self._boucle, name="rafraichisseur-marches", daemon=True)
+            self._fil.start()
+        return self
+
+    def arreter(self):
+        self._arret.set()
+
+    def _boucle(self):
+        while not self._arret.is_set():
+            try:
+                self.rafraichir()
+                self.derniere_erreur = None
+            except Exception as e:
+                # L'instantané précédent reste affiché; nouvel essai au prochain tour
+                self.derniere_erreur = e
+            self._arret.wait(self.cadence)
+
+    def _requetes(self):
+        # Symboles regroupés par curseur (dernier horodatage connu)
+        groupes = {}
+        for symbole, tampon in self._tampons.items():
+            groupes.setdefault(tampon.dernier_horodatage(), []).append(symbole)
+        for dernier, symboles in groupes.items():
+            if dernier is None:
+                # Premier appel (ou symbole encore vide) : toute la séance en cours
+                yield symboles, {"period": "5d", "interval": self.intervalle}
+            else:
+                debut = pd.Timestamp(dernier, unit="ns", tz="UTC")
+                yield symboles, {"start": debut.to_pydatetime(), "interval": self.intervalle}
+
+    def rafraichir(self):
+        """Un tour de rafraîchissement : un téléchargement par groupe de symboles au même curseur."""
+        erreur = None
+        for symboles, parametres in list(self._requetes()):
+            try:
+                df = self.fournisseur.telecharger(symboles, **parametres)
+            except Exception as e:
+                # Un groupe en échec n'empêche pas la mise à jour des autres
+                erreur = e
+                continue
+            for symbole in symboles:
+                barres = _extraire(df, symbole)
+                if not barres.empty and "Close" in barres:
+                    closes = barres["Close"].dropna()
+                    index = closes.index
+                    if index.tz is None:
+                        index = index.tz_localize("UTC")
+                    self._tampons[symbole].ajouter(index.as_unit("ns").asi8, closes.to_numpy(dtype=float))
+        instantane = dict(self._instantane)
+        for symbole, tampon in self._tampons.items():
+            if len(tampon) >= 2:
+                horodatages, closes = tampon.derniers(2)
+                instantane[symbole] = {
+                    "dernier": float(closes[-1]),
+                    "precedent": float(closes[-2]),
+                    "horodatage": pd.Timestamp(horodatages[-1], unit="ns", tz="UTC"),
+                }
+        self._instantane = instantane
+        if erreur is not None:
+            raise erreur
+        self.dernier_rafraichissement = time.time()
+
+    def statistiques(self):
+        age = time.time() - self.dernier_rafraichissement if self.dernier_rafraichissement else float("nan")
+        return {"secondes_depuis_rafraichissement": age, "en_erreur": int(self.derniere_erreur is not None),
+                "symboles": len(self._instantane)}
+
+    def instantane(self):
+        """Derniers cours connus par symbole, sans verrou ni appel réseau."""
+        return self._instantane
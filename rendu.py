@@ -0,0 +1,35 @@
+from io import BytesIO
+
+# Les figures sont créées hors de pyplot : aucun registre global ne les
+# retient, elles sont libérées dès que le rendu PNG est produit. matplotlib
+# n'est importé qu'au premier rendu, par les pages qui en ont besoin.
+
+
+def rendre_png(dessiner, *args, taille=(6.4, 4.8), dpi=100, **kwargs):
+    """Crée une figure, appelle ``dessiner(ax, *args, **kwargs)`` et retourne l'image PNG (octets)."""
+    from matplotlib.figure import Figure
+
+    fig = Figure(figsize=taille, dpi=dpi)
+    try:
+        dessiner(fig.subplots(), *args, **kwargs)
+        tampon = BytesIO()
+        fig.savefig(tampon, format="png", bbox_inches="tight")
+        return tampon.getvalue()
+    finally:
+        # Rompt les références circulaires figure / axes pour une libération immédiate
+        fig.clear()
+
+
+def camembert(ax, tailles, etiquettes):
+    ax.pie(tailles, labels=etiquettes, autopct='%1.1f%%', startangle=90)
+    ax.axis('equal')
+
+
+def eventail(ax, annees, bandes):
+    # Graphique en éventail : bandes 5-95 % et 25-75 %, médiane en trait plein
+    ax.fill_between(annees, bandes[5], bandes[95], alpha=0.2, label="5 % - 95 %")
+    ax.fill_between(annees, bandes[25], bandes[75], alpha=0.4, label="25 % - 75 %")
+    ax.plot(annees, bandes[50], label="Médiane")
+    ax.set_xlabel("Années")
+    ax.set_ylabel("Capital ($)")
+    ax.legend(loc="upper left")
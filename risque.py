@@ -0,0 +1,206 @@
+import numpy as np
+import pandas as pd
+
+JOURS_PAR_AN = 252
+
+
+class CovarianceGlissante:
+    """Matrice de covariance des rendements sur une fenêtre glissante, tenue à jour incrémentalement.
+
+    L'état se résume aux rendements de la fenêtre, à leur somme et à la
+    somme de leurs produits croisés : ajouter un jour coûte O(n²), ajouter
+    un ticker O(fenêtre x n), sans recalculer toutes les paires.
+    """
+
+    def __init__(self, tickers, fenetre):
+        self.tickers = list(tickers)
+        self.fenetre = fenetre
+        n = len(self.tickers)
+        self._tampon = np.zeros((fenetre, n))
+        self._position = 0
+        self._compte = 0
+        self._somme = np.zeros(n)
+        self._produits = np.zeros((n, n))
+        self._mises_a_jour = 0
+
+    @classmethod
+    def depuis_rendements(cls, rendements, fenetre):
+        """Construit l'état à partir d'un DataFrame de rendements (dates x tickers)."""
+        cov = cls(rendements.columns, fenetre)
+        valeurs = np.nan_to_num(rendements.to_numpy(dtype=float)[-fenetre:])
+        cov._compte = len(valeurs)
+        cov._tampon[:cov._compte] = valeurs
+        cov._position = cov._compte % fenetre
+        cov._recalculer()
+        return cov
+
+    def _lignes(self):
+        # Rendements présents dans la fenêtre, du plus ancien au plus récent
+        if self._compte < self.fenetre:
+            return self._tampon[:self._compte]
+        return np.roll(self._tampon, -self._position, axis=0)
+
+    def _recalculer(self):
+        lignes = self._tampon[:self._compte] if self._compte < self.fenetre else self._tampon
+        self._somme = lignes.sum(axis=0)
+        self._produits = lignes.T @ lignes
+
+    def ajouter(self, rendements):
+        """Ajoute un jour de rendements (un par ticker, dans l'ordre de ``tickers``)."""
+        x = np.nan_to_num(np.asarray(rendements, dtype=float))
+        if self._compte == self.fenetre:
+            ancien = self._tampon[self._position]
+            self._somme -= ancien
+            self._produits -= np.outer(ancien, ancien)
+        else:
+            self._compte += 1
+        self._tampon[self._position] = x
+        self._position = (self._position + 1) % self.fenetre
+        self._somme += x
+        self._produits += np.outer(x, x)
+        # Recalcul exact une fois par fenêtre pour éviter la dérive des arrondis
+        self._mises_a_jour += 1
+        if self._mises_a_jour % self.fenetre == 0:
+            self._recalculer()
+
+    def ajouter_ticker(self, ticker, rendements):
+        """Ajoute un ticker; ``rendements`` couvre les jours de la fenêtre, du plus ancien au plus récent."""
+        colonne = np.zeros(self.fenetre)
+        valeurs = np.nan_to_num(np.asarray(rendements, dtype=float))[-self._compte:] if self._compte else []
+        # Alignement avec l'ordre circulaire du tampon
+        positions = (self._position - self._compte + np.arange(self._compte)) % self.fenetre
+        colonne[positions] = valeurs
+        lignes = self._tampon[:self._compte] if self._compte < self.fenetre else self._tampon
+        colonne_active = colonne[:len(lignes)]
+        croises = lignes.T @ colonne_active
+        carre = colonne_active @ colonne_active
+        self._tampon = np.column_stack([self._tampon, colonne])
+        self._somme = np.append(self._somme, colonne_active.sum())
+        self._produits = np.block([[self._produits, croises[:, None]], [croises[None, :], np.array([[carre]])]])
+        self.tickers.append(ticker)
+
+    def retirer_ticker(self, ticker):
+        i = self.tickers.index(ticker)
+        self._tampon = np.delete(self._tampon, i, axis=1)
+        self._somme = np.delete(self._somme, i)
+        self._produits = np.delete(np.delete(self._produits, i, axis=0), i, axis=1)
+        del self.tickers[i]
+
+    def covariance(self):
+        c = self._compte
+        if c < 2:
+            return pd.DataFrame(np.nan, index=self.tickers, columns=self.tickers)
+        cov = (self._produits - np.outer(self._somme, self._somme) / c) / (c - 1)
+        return pd.DataFrame(cov, index=self.tickers, columns=self.tickers)
+
+    def moyenne(self):
+        """Rendement quotidien moyen de chaque ticker sur la fenêtre."""
+        return pd.Series(self._somme / max(self._compte, 1), index=self.tickers)
+
+    def covariance_retrecie(self):
+        """Covariance de Ledoit-Wolf : mélange de la covariance empirique et d'une cible diagonale.
+
+        L'intensité du rétrécissement est estimée à partir des rendements de
+        la fenêtre (Ledoit et Wolf, 2004). Retourne la matrice et l'intensité.
+        """
+        c, n = self._compte, len(self.tickers)
+        if c < 2:
+            return self.covariance(), 1.0
+        centres = self._lignes() - self._somme / c
+        empirique = (self._produits - np.outer(self._somme, self._somme) / c) / c
+        cible = np.trace(empirique) / n
+        dispersion = ((empirique - cible * np.eye(n)) ** 2).sum() / n
+        # Variance d'estimation de la covariance empirique : (1/c²) Σ ||y yᵀ - S||², via Σ ||y||⁴
+        bruit = ((centres ** 2).sum(axis=1) ** 2).sum() / c - (empirique ** 2).sum()
+        bruit = min(bruit / (c * n), dispersion)
+        intensite = bruit / dispersion if dispersion > 0 else 1.0
+        retrecie = intensite * cible * np.eye(n) + (1 - intensite) * empirique
+        return pd.DataFrame(retrecie, index=self.tickers, columns=self.tickers), intensite
+
+    def correlation(self):
+        cov = self.covariance().to_numpy()
+        ecarts = np.sqrt(np.diag(cov))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            corr = cov / np.outer(ecarts, ecarts)
+        return pd.DataFrame(corr, index=self.tickers, columns=self.tickers)
+
+
+def prolonger_covariance(etat, rendements, fenetre):
+    """Covariance glissante de ``rendements``, prolongée depuis ``etat`` quand c'est possible.
+
+    ``etat`` est le dict retourné par l'appel précédent (ou None). Les jours
+    et tickers nouveaux sont ajoutés, les tickers disparus retirés, sans
+    tout recalculer. L'état est reconstruit si les jours de sa fenêtre ne
+    sont plus ceux de ``rendements``. Retourne le nouvel état et si l'ancien
+    a été réutilisé.
+    """
+    reutilisable = etat is not None and etat["covariance"].fenetre == fenetre and etat["date"] in rendements.index
+    if reutilisable:
+        # Un ticker ajouté peut apporter des jours absents du tampon (cryptomonnaies le
+        # week-end) : les lignes mémorisées ne correspondraient plus aux mêmes dates
+        anterieurs = rendements.index[rendements.index <= etat["date"]]
+        debut = len(anterieurs) - len(etat["dates"])
+        reutilisable = debut >= 0 and anterieurs[debut:].equals(etat["dates"])
+    if reutilisable:
+        # Le dernier jour déjà intégré ne doit pas avoir changé (barre du jour mise à jour)
+        communs = etat["ligne"].index.intersection(rendements.columns)
+        reutilisable = np.allclose(rendements.loc[etat["date"], communs].fillna(0), etat["ligne"][communs])
+    if reutilisable:
+        covariance = etat["covariance"]
+        for ticker in [t for t in covariance.tickers if t not in rendements.columns]:
+            covariance.retirer_ticker(ticker)
+        for _, ligne in rendements.loc[rendements.index > etat["date"], covariance.tickers].iterrows():
+            covariance.ajouter(ligne.to_numpy())
+        for ticker in [t for t in rendements.columns if t not in covariance.tickers]:
+            covariance.ajouter_ticker(ticker, rendements[ticker].to_numpy())
+    else:
+        covariance = CovarianceGlissante.depuis_rendements(rendements, fenetre)
+    etat = {
+        "covariance": covariance,
+        "date": rendements.index[-1],
+        "dates": rendements.index[len(rendements) - covariance._compte:],
+        "ligne": rendements.iloc[-1][covariance.tickers].fillna(0),
+    }
+    return etat, reutilisable
+
+
+def rendements_journaliers(prix):
+    # Prix reportés sur les jours sans cotation : rendement nul ces jours-là
+    return prix.ffill().pct_change(fill_method=None).iloc[1:]
+
+
+def rendements_mensuels(prix, poids=None):
+    """Rendements mensuels (fin de mois) par colonne, ou d'un panier rééquilibré chaque mois selon ``poids``."""
+    prix = prix.ffill()
+    mensuels = prix.resample("ME").last().pct_change(fill_method=None).iloc[1:]
+    if len(mensuels) and prix.index[-1] < mensuels.index[-1]:
+        # Mois en cours incomplet
+        mensuels = mensuels.iloc[:-1]
+    if poids is None:
+        return mensuels
+    poids = pd.Series(poids, dtype=float)
+    return mensuels[poids.index].dropna().mul(poids / poids.sum()).sum(axis=1)
+
+
+def drawdowns(prix):
+    prix = prix.ffill()
+    return prix / prix.cummax() - 1
+
+
+def tableau_risque(prix, covariance, indice="^GSPC", fenetre_volatilite=21):
+    """Volatilité, bêta et drawdowns par ticker à partir des prix et de la covariance glissante."""
+    rendements = rendements_journaliers(prix)
+    cov = covariance.covariance()
+    variance = np.diag(cov.to_numpy())
+    volatilite_courte = rendements.iloc[-fenetre_volatilite:].std() * np.sqrt(JOURS_PAR_AN) * 100
+    dd = drawdowns(prix.iloc[-covariance.fenetre - 1:])
+    tableau = pd.DataFrame({
+        f"Volatilité {fenetre_volatilite} j (%)": volatilite_courte.reindex(cov.index),
+        "Volatilité fenêtre (%)": np.sqrt(variance * JOURS_PAR_AN) * 100,
+        "Drawdown actuel (%)": dd.iloc[-1].reindex(cov.index) * 100,
+        "Drawdown max (%)": dd.min().reindex(cov.index) * 100,
+    }, index=cov.index)
+    if indice in cov.index:
+        with np.errstate(divide="ignore", invalid="ignore"):
+            tableau.insert(2, f"Bêta ({indice})", cov[indice] / cov.loc[indice, indice])
+    return tableau
@@ -0,0 +1,85 @@
+import numpy as np
+import pandas as pd
+
+from indicateurs import macd, rsi, sma
+
+JOURS_PAR_AN = 252
+# Fenêtre (en barres) pendant laquelle un croisement est considéré comme récent
+FENETRE_CROISEMENT = 5
+
+
+def _dernier_croisement(ecart):
+    # +1 : passage au-dessus de zéro dans la fenêtre récente, -1 : en dessous, 0 : aucun
+    signe = np.sign(ecart[-(FENETRE_CROISEMENT + 1):])
+    changements = np.diff(signe, axis=0)
+    haussier = (changements > 0).any(axis=0)
+    baissier = (changements < 0).any(axis=0)
+    return np.where(haussier & ~baissier, 1, np.where(baissier & ~haussier, -1, 0))
+
+
+def indicateurs_bloc(prix):
+    """Passe lourde sur un bloc de colonnes (dates x tickers) : dernières valeurs des indicateurs."""
+    sma50 = sma(prix, 50)
+    sma200 = sma(prix, 200)
+    _, _, ligne_macd, ligne_signal = macd(prix)
+    return {
+        "SMA 50": sma50[-1],
+        "SMA 200": sma200[-1],
+        "RSI (14)": rsi(prix, 14)[-1],
+        "MACD": ligne_macd[-1],
+        "Ligne de signal": ligne_signal[-1],
+        "_croisement_sma": _dernier_croisement(sma50 - sma200),
+        "_croisement_macd": _dernier_croisement(ligne_macd - ligne_signal),
+    }
+
+
+def _rendement(prix, n):
+    if prix.shape[0] <= n:
+        return np.full(prix.shape[1], np.nan)
+    return (prix[-1] / prix[-1 - n] - 1) * 100
+
+
+def cribler(prix, executeur=None, taille_bloc=64):
+    """Indicateurs de fin de période pour chaque colonne de ``prix`` (DataFrame dates x tickers).
+
+    Les calculs légers (rendements, volatilité) sont faits sur toute la
+    matrice; les indicateurs sont calculés par blocs de colonnes, vectorisés,
+    dans le processus courant (quelques dizaines de ms pour le S&P 500), ou
+    répartis sur ``executeur`` s'il est fourni (analyse par lot hors
+    application).
+    """
+    tickers = list(prix.columns)
+    valeurs = prix.ffill().to_numpy(dtype=float)
+    if valeurs.shape[0] < 2 or not tickers:
+        raise ValueError("Pas assez de données pour le screener.")
+
+    log_rendements = np.diff(np.log(valeurs[-(JOURS_PAR_AN + 1):]), axis=0)
+    with np.errstate(invalid="ignore"):
+        volatilite = np.nanstd(log_rendements, axis=0, ddof=1) * np.sqrt(JOURS_PAR_AN) * 100
+
+    blocs = [valeurs[:, i:i + taille_bloc] for i in range(0, len(tickers), taille_bloc)]
+    if executeur is None:
+        resultats = [indicateurs_bloc(b) for b in blocs]
+    else:
+        resultats = list(executeur.map(indicateurs_bloc, blocs))
+    indicateurs = {cle: np.concatenate([r[cle] for r in resultats]) for cle in resultats[0]}
+
+    croisement_sma = indicateurs.pop("_croisement_sma")
+    croisement_macd = indicateurs.pop("_croisement_macd")
+    tendance_sma = np.where(np.isnan(indicateurs["SMA 200"]), "N/A",
+                            np.where(indicateurs["SMA 50"] > indicateurs["SMA 200"], "Haussière", "Baissière"))
+    tendance_macd = np.where(indicateurs["MACD"] > indicateurs["Ligne de signal"], "Haussier", "Baissier")
+    rsi_final = indicateurs["RSI (14)"]
+
+    return pd.DataFrame({
+        "Dernier prix": valeurs[-1],
+        "Rendement 1 mois (%)": _rendement(valeurs, 21),
+        "Rendement 3 mois (%)": _rendement(valeurs, 63),
+        "Rendement 1 an (%)": _rendement(valeurs, JOURS_PAR_AN),
+        "Volatilité (%)": volatilite,
+        **indicateurs,
+        "Tendance SMA 50/200": np.where(croisement_sma == 1, "Croisement haussier",
+                                        np.where(croisement_sma == -1, "Croisement baissier", tendance_sma)),
+        "Zone RSI": np.where(rsi_final >= 70, "Surachat", np.where(rsi_final <= 30, "Survente", "Neutre")),
+        "Signal MACD": np.where(croisement_macd == 1, "Achat", np.where(croisement_macd == -1, "Vente", tendance_macd)),
+    }, index=pd.Index(tickers, name="Ticker"))
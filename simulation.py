@@ -0,0 +1,199 @@
+from dataclasses import dataclass
+
+import numpy as np
+
+# Percentiles affichés dans le graphique en éventail
+PERCENTILES = (5, 25, 50, 75, 95)
+
+
+@dataclass
+class ResultatMonteCarlo:
+    annees: np.ndarray
+    percentiles: dict
+    distribution_finale: np.ndarray
+    exact: bool
+    # Probabilité d'atteindre la cible (simulation par bootstrap uniquement)
+    probabilite_cible: float = None
+
+
+def _quantiles_histogramme(comptes, bornes_min, largeurs, total, percentiles):
+    # Interpolation linéaire des quantiles à l'intérieur de chaque classe
+    cumul = np.cumsum(comptes, axis=1)
+    resultats = {}
+    for p in percentiles:
+        cible = p / 100 * total
+        k = np.argmax(cumul >= cible, axis=1)
+        lignes = np.arange(comptes.shape[0])
+        avant = np.where(k > 0, cumul[lignes, np.maximum(k - 1, 0)], 0)
+        dans_classe = np.maximum(comptes[lignes, k], 1)
+        fraction = np.clip((cible - avant) / dans_classe, 0, 1)
+        resultats[p] = bornes_min + (k + fraction) * largeurs
+    return resultats
+
+
+def simuler_monte_carlo(montant_initial, rendement_moyen, volatilite, duree, num_simulations,
+                        graine=None, memoire_max=64 * 2**20, nb_classes=4096,
+                        percentiles=PERCENTILES):
+    """Simule des trajectoires de capital avec des rendements annuels normaux i.i.d.
+
+    Les rendements sont tirés par lots (simulations x années) depuis un
+    ``np.random.Generator``. Si toutes les trajectoires tiennent dans
+    ``memoire_max``, les percentiles sont exacts; sinon ils sont estimés
+    par histogramme en flux, avec une mémoire indépendante du nombre de
+    simulations.
+    """
+    rng = np.random.default_rng(graine)
+    nb_points = duree + 1
+    # Matrice des rendements + matrice des trajectoires par lot
+    taille_lot = max(1, int(memoire_max // (16 * nb_points)))
+    distribution_finale = np.empty(num_simulations)
+
+    def tirer_lot(n):
+        rendements = rng.normal(rendement_moyen / 100, volatilite / 100, size=(n, duree))
+        trajectoires = np.empty((n, nb_points))
+        trajectoires[:, 0] = montant_initial
+        np.cumprod(1 + rendements, axis=1, out=trajectoires[:, 1:])
+        trajectoires[:, 1:] *= montant_initial
+        return trajectoires
+
+    annees = np.arange(nb_points)
+
+    if num_simulations <= taille_lot:
+        trajectoires = tirer_lot(num_simulations)
+        distribution_finale[:] = trajectoires[:, -1]
+        bandes = np.percentile(trajectoires, percentiles, axis=0)
+        return ResultatMonteCarlo(annees, dict(zip(percentiles, bandes)), distribution_finale, True)
+
+    # Premier lot : sert à fixer les bornes des classes pour chaque année
+    trajectoires = tirer_lot(taille_lot)
+    bas, haut = trajectoires.min(axis=0), trajectoires.max(axis=0)
+    marge = np.maximum((haut - bas) * 0.5, 1.0)
+    bornes_min = bas - marge
+    largeurs = (haut - bas + 2 * marge) / nb_classes
+    comptes = np.zeros((nb_points, nb_classes), dtype=np.int64)
+    decalage = np.arange(nb_points) * nb_classes
+
+    debut = 0
+    while True:
+        n = trajectoires.shape[0]
+        distribution_finale[debut:debut + n] = trajectoires[:, -1]
+        classes = ((trajectoires - bornes_min) / largeurs).astype(np.int64)
+        np.clip(classes, 0, nb_classes - 1, out=classes)
+        comptes += np.bincount((classes + decalage).ravel(),
+                               minlength=nb_points * nb_classes).reshape(nb_points, nb_classes)
+        debut += n
+        if debut >= num_simulations:
+            break
+        trajectoires = tirer_lot(min(taille_lot, num_simulations - debut))
+
+    bandes = _quantiles_histogramme(comptes, bornes_min, largeurs, num_simulations, percentiles)
+    return ResultatMonteCarlo(annees, bandes, distribution_finale, False)
+
+
+def _taux_mensuel(taux):
+    # Taux mensuel équivalent : douze mois composés redonnent le taux annuel (%)
+    return (1 + np.asarray(taux, dtype=float) / 100) ** (1 / 12) - 1
+
+
+def _facteurs(taux_mensuel, mois):
+    # Croissance (1 + m)^n du capital initial et valeur acquise de n versements de 1 $ en fin de mois
+    croissance = (1 + taux_mensuel) ** mois
+    nul = taux_mensuel == 0
+    annuite = np.where(nul, mois, (croissance - 1) / np.where(nul, 1, taux_mensuel))
+    return croissance, annuite
+
+
+def simuler_rendement(montant_initial, investissement_mensuel, taux, duree):
+    """Capital en fin de chaque année (intérêts composés mensuellement, versement en fin de mois).
+
+    Le taux annuel est converti en taux mensuel équivalent m; la forme fermée
+    capital * (1 + m)^n + versement * ((1 + m)^n - 1) / m est évaluée pour
+    toutes les années d'un coup.
+    """
+    croissance, annuite = _facteurs(_taux_mensuel(taux), 12 * np.arange(1, duree + 1))
+    return montant_initial * croissance + investissement_mensuel * annuite
+
+
+def grille_scenarios(montant_initial, taux, durees, versements):
+    """Capital final de chaque scénario taux (%) x durée (années) x versement mensuel ($).
+
+    Tableau de forme (taux, durées, versements), obtenu par diffusion numpy
+    de la forme fermée de ``simuler_rendement``, sans boucle.
+    """
+    croissance, annuite = _facteurs(_taux_mensuel(taux)[:, None], 12 * np.asarray(durees)[None, :])
+    return (montant_initial * croissance)[..., None] + annuite[..., None] * np.asarray(versements, dtype=float)
+
+
+def versement_requis(montant_initial, taux, duree, cible):
+    """Versement mensuel qui mène le capital à ``cible`` en ``duree`` années (0 si le capital initial suffit).
+
+    Solution exacte de la forme fermée; taux et durées peuvent être des
+    tableaux, diffusés l'un contre l'autre.
+    """
+    croissance, annuite = _facteurs(_taux_mensuel(taux), 12 * np.asarray(duree))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.maximum((cible - montant_initial * croissance) / annuite, 0)
+
+
+def taux_requis(montant_initial, investissement_mensuel, duree, cible, bas=-99.0, haut=100.0, iterations=60):
+    """Taux annuel (%) qui mène le capital à ``cible`` en ``duree`` années.
+
+    Le capital final croît avec le taux : une dichotomie vectorisée divise
+    à chaque itération l'intervalle [bas, haut] de tous les scénarios à la
+    fois (durées, versements et cibles diffusés). NaN si la cible est hors
+    d'atteinte dans cet intervalle.
+    """
+    duree, investissement_mensuel, cible = np.broadcast_arrays(duree, investissement_mensuel, cible)
+
+    def capital(taux):
+        croissance, annuite = _facteurs(_taux_mensuel(taux), 12 * duree)
+        return montant_initial * croissance + investissement_mensuel * annuite
+
+    bas, haut = np.full(duree.shape, float(bas)), np.full(duree.shape, float(haut))
+    atteignable = (capital(bas) <= cible) & (capital(haut) >= cible)
+    for _ in range(iterations):
+        milieu = (bas + haut) / 2
+        suffisant = capital(milieu) >= cible
+        haut = np.where(suffisant, milieu, haut)
+        bas = np.where(suffisant, bas, milieu)
+    return np.where(atteignable, (bas + haut) / 2, np.nan)
+
+
+def simuler_bootstrap(rendements_mensuels, montant_initial, investissement_mensuel, duree, num_simulations,
+                      longueur_bloc=12, cible=None, graine=None, percentiles=PERCENTILES):
+    """Trajectoires de capital obtenues en rééchantillonnant des rendements mensuels historiques.
+
+    Les mois sont tirés par bootstrap stationnaire (Politis et Romano) :
+    chaque mois commence un nouveau bloc avec une probabilité
+    1 / ``longueur_bloc``, sinon prolonge le bloc courant dans l'historique
+    (parcouru de façon circulaire), ce qui conserve l'autocorrélation et les
+    regroupements de volatilité. Un versement mensuel est ajouté en fin de
+    mois. La simulation avance mois par mois, vectorisée sur tous les
+    chemins : la mémoire reste en O(chemins x années) et les percentiles
+    des valeurs de fin d'année sont exacts.
+    """
+    croissance = 1 + np.asarray(rendements_mensuels, dtype=float)
+    croissance = croissance[~np.isnan(croissance)]
+    nb_historique = len(croissance)
+    if nb_historique < 2:
+        raise ValueError("Historique de rendements mensuels insuffisant.")
+    rng = np.random.default_rng(graine)
+    annuels = np.empty((num_simulations, duree + 1))
+    annuels[:, 0] = montant_initial
+    capital = np.full(num_simulations, float(montant_initial))
+    indices = rng.integers(0, nb_historique, num_simulations)
+
+    for mois in range(12 * duree):
+        if mois:
+            indices += 1
+            indices[indices == nb_historique] = 0
+            nouveaux = rng.random(num_simulations, dtype=np.float32) < 1 / longueur_bloc
+            indices[nouveaux] = rng.integers(0, nb_historique, np.count_nonzero(nouveaux))
+        capital *= croissance[indices]
+        capital += investissement_mensuel
+        if mois % 12 == 11:
+            annuels[:, mois // 12 + 1] = capital
+
+    bandes = np.percentile(annuels, percentiles, axis=0)
+    probabilite = float(np.mean(capital >= cible)) if cible is not None else None
+    return ResultatMonteCarlo(np.arange(duree + 1), dict(zip(percentiles, bandes)), capital, True, probabilite)
\ No newline at end of file
@@ -0,0 +1,258 @@
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from datetime import date, timedelta
+
+import pandas as pd
+
+COLONNES = ["Open", "High", "Low", "Close", "Volume"]
+
+# Correspondance entre les périodes de yfinance et un nombre de jours
+PERIODES = {
+    "1mo": 30,
+    "3mo": 91,
+    "6mo": 182,
+    "1y": 365,
+    "2y": 730,
+    "5y": 1826,
+    "10y": 3652,
+}
+DEBUT_MAX = date(1900, 1, 1)
+INTERVALLES_JOURNALIERS = ("1d", "5d", "1wk", "1mo", "3mo")
+# Jours sans séance possibles après la dernière barre (long week-end) avant de soupçonner une réponse écourtée
+JOURS_SANS_SEANCE = 4
+
+
+def debut_periode(periode, fin=None):
+    fin = fin or date.today()
+    if periode == "max":
+        return DEBUT_MAX
+    if periode == "ytd":
+        return date(fin.year, 1, 1)
+    return fin - timedelta(days=PERIODES[periode])
+
+
+class FournisseurYFinance:
+    """Fournisseur par défaut : télécharge les barres depuis Yahoo Finance."""
+
+    def historique(self, ticker, debut, fin, intervalle="1d"):
+        import yfinance as yf
+        return yf.Ticker(ticker).history(start=debut, end=fin, interval=intervalle)
+
+
+def _normaliser(df, intervalle):
+    # Index sans fuseau horaire et colonnes OHLCV uniquement
+    if df is None or df.empty:
+        return pd.DataFrame(columns=COLONNES, index=pd.DatetimeIndex([], name="Date"))
+    df = df[COLONNES].copy()
+    index = pd.DatetimeIndex(df.index)
+    if index.tz is not None:
+        # Barres journalières : on garde la date locale de la bourse; intrajournalier : UTC
+        index = index.tz_localize(None) if intervalle in INTERVALLES_JOURNALIERS \
+            else index.tz_convert("UTC").tz_localize(None)
+    df.index = index.rename("Date")
+    return df[~df.index.duplicated(keep="last")]
+
+
+def _soustraire(debut, fin, plages):
+    # Segments de [debut, fin) qui ne sont couverts par aucune plage
+    manquants = []
+    curseur = debut
+    for p_debut, p_fin in sorted(plages):
+        if p_fin <= curseur or p_debut >= fin:
+            continue
+        if p_debut > curseur:
+            manquants.append((curseur, p_debut))
+        curseur = max(curseur, p_fin)
+        if curseur >= fin:
+            break
+    if curseur < fin:
+        manquants.append((curseur, fin))
+    return manquants
+
+
+class StockageOHLCV:
+    """Stockage local des barres OHLCV (SQLite), par ticker et intervalle.
+
+    Les plages de dates déjà téléchargées sont mémorisées : seuls les
+    segments manquants sont demandés au fournisseur. La journée en cours
+    n'est jamais considérée comme complète et expire après ``ttl_jour``
+    secondes. Un segment n'est couvert durablement que jusqu'à sa dernière
+    barre reçue : une réponse vide ou écourtée (limite de débit, erreur
+    passagère, ticker en échec dans un lot) expire de la même façon et le
+    reste du segment est redemandé ensuite.
+    """
+
+    def __init__(self, chemin, fournisseur=None, ttl_jour=900):
+        self.chemin = chemin
+        if fournisseur is None:
+            from cassettes import selon_environnement
+            fournisseur = selon_environnement(FournisseurYFinance())
+        self.fournisseur = fournisseur
+        self.ttl_jour = ttl_jour
+        self._verrou = threading.Lock()
+        self.statistiques = {"lectures_locales": 0, "lectures_completees": 0, "segments_telecharges": 0}
+        dossier = os.path.dirname(chemin)
+        if dossier:
+            os.makedirs(dossier, exist_ok=True)
+        with self._connexion() as cx:
+            cx.executescript("""
+                CREATE TABLE IF NOT EXISTS barres (
+                    ticker TEXT, intervalle TEXT, horodatage INTEGER,
+                    open REAL, high REAL, low REAL, close REAL, volume INTEGER,
+                    PRIMARY KEY (ticker, intervalle, horodatage)
+                );
+                CREATE TABLE IF NOT EXISTS plages (
+                    ticker TEXT, intervalle TEXT, debut TEXT, fin TEXT, expire REAL
+                );
+            """)
+
+    @contextmanager
+    def _connexion(self):
+        cx = sqlite3.connect(self.chemin, timeout=30)
+        try:
+            with cx:
+                yield cx
+        finally:
+            cx.close()
+
+    def _plages(self, cx, ticker, intervalle):
+        cx.execute("DELETE FROM plages WHERE expire IS NOT NULL AND expire <= ?", (time.time(),))
+        lignes = cx.execute(
+            "SELECT debut, fin FROM plages WHERE ticker = ? AND intervalle = ?", (ticker, intervalle)
+        ).fetchall()
+        return [(date.fromisoformat(d), date.fromisoformat(f)) for d, f in lignes]
+
+    def _expirer(self, cx, ticker, intervalle, debut, fin):
+        cx.execute("INSERT INTO plages VALUES (?, ?, ?, ?, ?)",
+                   (ticker, intervalle, debut.isoformat(), fin.isoformat(), time.time() + self.ttl_jour))
+
+    def _enregistrer_plage(self, cx, ticker, intervalle, debut, fin):
+        aujourdhui = date.today()
+        if debut < min(fin, aujourdhui):
+            # Fusion avec les plages permanentes qui se chevauchent ou se touchent
+            fin_permanente = min(fin, aujourdhui)
+            lignes = cx.execute(
+                "SELECT rowid, debut, fin FROM plages WHERE ticker = ? AND intervalle = ? AND expire IS NULL "
+                "AND debut <= ? AND fin >= ?",
+                (ticker, intervalle, fin_permanente.isoformat(), debut.isoformat()),
+            ).fetchall()
+            for rowid, d, f in lignes:
+                debut = min(debut, date.fromisoformat(d))
+                fin_permanente = max(fin_permanente, date.fromisoformat(f))
+                cx.execute("DELETE FROM plages WHERE rowid = ?", (rowid,))
+            cx.execute("INSERT INTO plages VALUES (?, ?, ?, ?, NULL)",
+                       (ticker, intervalle, debut.isoformat(), fin_permanente.isoformat()))
+        if fin > aujourdhui:
+            self._expirer(cx, ticker, intervalle, max(debut, aujourdhui), fin)
+
+    def _enregistrer_segment(self, cx, ticker, intervalle, debut, fin, df):
+        # Couverture durable jusqu'au jour de la dernière barre reçue (week-end compris), le reste expire.
+        # Une réponse vide ne couvre rien, sauf sur un segment assez court pour n'être qu'un week-end ou un pont
+        if df.empty:
+            couvert = fin if (fin - debut).days < JOURS_SANS_SEANCE else debut
+        else:
+            couvert = max(debut, df.index.max().date() + timedelta(days=1))
+            couvert = fin if (fin - couvert).days < JOURS_SANS_SEANCE else couvert
+        self._enregistrer_plage(cx, ticker, intervalle, debut, couvert)
+        if couvert < fin:
+            self._expirer(cx, ticker, intervalle, couvert, fin)
+
+    def _ecrire(self, cx, ticker, intervalle, df):
+        if df.empty:
+            return
+        horodatages = df.index.as_unit("ns").asi8.tolist()
+        volumes = df["Volume"].fillna(0).astype("int64").tolist()
+        lignes = zip([ticker] * len(df), [intervalle] * len(df), horodatages,
+                     df["Open"].tolist(), df["High"].tolist(), df["Low"].tolist(), df["Close"].tolist(), volumes)
+        cx.executemany("INSERT OR REPLACE INTO barres VALUES (?, ?, ?, ?, ?, ?, ?, ?)", lignes)
+
+    def segments_manquants(self, ticker, debut, fin, intervalle="1d"):
+        with self._verrou, self._connexion() as cx:
+            return _soustraire(debut, fin, self._plages(cx, ticker, intervalle))
+
+    def _compter(self, manquants):
+        # Appelé sous verrou : une lecture sans segment manquant est servie localement
+        cle = "lectures_completees" if manquants else "lectures_locales"
+        self.statistiques[cle] += 1
+        self.statistiques["segments_telecharges"] += len(manquants)
+
+    def _completer(self, ticker, debut, fin, intervalle):
+        # Le verrou ne protège que la base : les téléchargements se font en parallèle
+        with self._verrou, self._connexion() as cx:
+            manquants = _soustraire(debut, fin, self._plages(cx, ticker, intervalle))
+            self._compter(manquants)
+        for seg_debut, seg_fin in manquants:
+            df = _normaliser(self.fournisseur.historique(ticker, seg_debut, seg_fin, intervalle), intervalle)
+            with self._verrou, self._connexion() as cx:
+                self._ecrire(cx, ticker, intervalle, df)
+                self._enregistrer_segment(cx, ticker, intervalle, seg_debut, seg_fin, df)
+
+    def lire(self, ticker, debut, fin=None, intervalle="1d"):
+        """Barres OHLCV de ``ticker`` sur [debut, fin), en complétant les trous au besoin."""
+        fin = fin or date.today() + timedelta(days=1)
+        self._completer(ticker, debut, fin, intervalle)
+        with self._connexion() as cx:
+            lignes = cx.execute(
+                "SELECT horodatage, open, high, low, close, volume FROM barres "
+                "WHERE ticker = ? AND intervalle = ? AND horodatage >= ? AND horodatage < ? "
+                "ORDER BY horodatage",
+                (ticker, intervalle, pd.Timestamp(debut).value, pd.Timestamp(fin).value),
+            ).fetchall()
+        df = pd.DataFrame(lignes, columns=["Date"] + COLONNES)
+        df.index = pd.DatetimeIndex(pd.to_datetime(df.pop("Date"), unit="ns"), name="Date")
+        return df
+
+    def _completer_univers(self, tickers, debut, fin, intervalle):
+        # Les tickers qui ont le même segment manquant sont demandés ensemble
+        groupes = {}
+        with self._verrou, self._connexion() as cx:
+            for ticker in tickers:
+                manquants = _soustraire(debut, fin, self._plages(cx, ticker, intervalle))
+                self._compter(manquants)
+                for segment in manquants:
+                    groupes.setdefault(segment, []).append(ticker)
+        for (seg_debut, seg_fin), groupe in groupes.items():
+            try:
+                if hasattr(self.fournisseur, "historiques"):
+                    resultats = self.fournisseur.historiques(groupe, seg_debut, seg_fin, intervalle)
+                else:
+                    resultats = {t: self.fournisseur.historique(t, seg_debut, seg_fin, intervalle) for t in groupe}
+            except Exception:
+                # Un segment en échec ne bloque pas le reste de l'univers
+                continue
+            with self._verrou, self._connexion() as cx:
+                for ticker in groupe:
+                    df = _normaliser(resultats.get(ticker), intervalle)
+                    self._ecrire(cx, ticker, intervalle, df)
+                    self._enregistrer_segment(cx, ticker, intervalle, seg_debut, seg_fin, df)
+
+    def matrice(self, tickers, debut, fin=None, colonne="Close", intervalle="1d"):
+        """Matrice (dates x tickers) d'une colonne pour tout un univers.
+
+        Les trous sont comblés par téléchargements groupés, puis les séries
+        sont lues en une passe.
+        """
+        if colonne not in COLONNES:
+            raise ValueError(f"Colonne inconnue : {colonne}")
+        fin = fin or date.today() + timedelta(days=1)
+        tickers = list(dict.fromkeys(tickers))
+        self._completer_univers(tickers, debut, fin, intervalle)
+        lignes = []
+        with self._connexion() as cx:
+            for i in range(0, len(tickers), 500):
+                lot = tickers[i:i + 500]
+                lignes += cx.execute(
+                    f"SELECT horodatage, ticker, {colonne.lower()} FROM barres "
+                    f"WHERE intervalle = ? AND horodatage >= ? AND horodatage < ? "
+                    f"AND ticker IN ({','.join('?' * len(lot))})",
+                    [intervalle, pd.Timestamp(debut).value, pd.Timestamp(fin).value] + lot,
+                ).fetchall()
+        df = pd.DataFrame(lignes, columns=["Date", "ticker", colonne])
+        df["Date"] = pd.to_datetime(df["Date"], unit="ns")
+        return df.pivot(index="Date", columns="ticker", values=colonne).reindex(columns=tickers).sort_index()
+
+    def lire_periode(self, ticker, periode, intervalle="1d"):
+        return self.lire(ticker, debut_periode(periode), intervalle=intervalle)
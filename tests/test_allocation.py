@@ -0,0 +1,76 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from allocation import CLASSES, CLES, OBJECTIFS, RISQUES, TABLE_ALLOCATIONS, allocation_profil, allouer_lot, normaliser
+
+
+def test_normaliser_plus_fort_reste():
+    np.testing.assert_array_equal(normaliser([1, 1, 1]), [[34, 33, 33]])
+    np.testing.assert_array_equal(normaliser([[20, 20, 40, 0, 20], [-5, 5, 5, 0, 0]]),
+                                  [[20, 20, 40, 0, 20], [0, 50, 50, 0, 0]])
+    rng = np.random.default_rng(0)
+    tailles = rng.uniform(0, 50, (1000, 5))
+    resultat = normaliser(tailles)
+    assert (resultat.sum(axis=1) == 100).all()
+    assert (np.abs(resultat - tailles / tailles.sum(axis=1, keepdims=True) * 100) < 1).all()
+
+
+def test_table_complete_et_normalisee():
+    assert len(TABLE_ALLOCATIONS) == 180
+    assert (TABLE_ALLOCATIONS[CLASSES].sum(axis=1) == 100).all()
+    assert (TABLE_ALLOCATIONS[CLASSES] >= 0).all().all()
+
+
+def test_profil_de_reference():
+    profil = {"objectif": "Épargne retraite", "risque": "Modérée", "duree": 10,
+              "preference_esg": False, "horizon_liquidite": "Non"}
+    tailles, explication = allocation_profil(profil)
+    assert tailles == [30, 30, 30, 0, 10]
+    assert len(explication) == 2
+    tailles, explication = allocation_profil({**profil, "risque": "Élevée", "duree": 20, "preference_esg": True})
+    assert tailles == [35, 35, 10, 10, 10] and len(explication) == 4
+
+
+def test_lot_identique_au_profil():
+    rng = np.random.default_rng(0)
+    n = 300
+    profils = pd.DataFrame({
+        "objectif": rng.choice(OBJECTIFS, n),
+        "risque": rng.choice(RISQUES, n),
+        "duree": rng.integers(1, 51, n),
+        "preference_esg": rng.choice(["True", "false", "oui", "0"], n),
+        "horizon_liquidite": rng.choice(["Oui", "Non"], n),
+    })
+    resultats = allouer_lot(profils)
+    for i in range(n):
+        profil = profils.iloc[i].to_dict()
+        profil["preference_esg"] = profil["preference_esg"] in ("True", "oui")
+        tailles, explication = allocation_profil(profil)
+        assert resultats.loc[i, CLASSES].tolist() == tailles
+        assert resultats.loc[i, "explication"] == " ".join(explication)
+
+
+def test_lot_colonnes_manquantes():
+    with pytest.raises(ValueError, match="risque"):
+        allouer_lot(pd.DataFrame({c: [] for c in CLES if c != "risque"}))
+
+
+def test_lot_valeurs_inconnues():
+    profils = pd.DataFrame({
+        "objectif": ["Voyage", "Retraite", "Voyage", "Autre"],
+        "risque": ["Faible", "Faible", "moyen", "Élevée"],
+        "duree": [10, 10, "dix", 3],
+        "preference_esg": [True, False, False, True],
+        "horizon_liquidite": ["Non", "Non", "Non", "Peut-être"],
+    }, index=[10, 11, 12, 13])
+    with pytest.raises(ValueError) as erreur:
+        allouer_lot(profils)
+    message = str(erreur.value)
+    assert message.startswith("3 profil(s)")
+    assert "ligne 11 : objectif='Retraite'" in message
+    assert "ligne 12 : risque='moyen', duree='dix'" in message
+    assert "ligne 13 : horizon_liquidite='Peut-être'" in message
+    assert "ligne 10" not in message
+    # Les profils valides passent
+    assert allouer_lot(profils.loc[[10]]).loc[10, CLASSES].sum() == 100
@@ -0,0 +1,67 @@
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+import pytest
+
+from analyse_lot import analyser_lot, analyser_profils, lire_tickers, main
+from benchmarks.suite import profils_synthetiques
+
+
+@pytest.fixture
+def profils():
+    profils = profils_synthetiques(7, graine=1)
+    profils["montant_initial"] = [1_000 * (i + 1) for i in range(7)]
+    profils["investissement_mensuel"] = 100
+    return profils
+
+
+def test_rapport_independant_du_decoupage_et_des_processus(profils):
+    reference = analyser_lot(profils, taille_bloc=len(profils), simulations=200)
+    for taille_bloc in [1, 3]:
+        pd.testing.assert_frame_equal(analyser_lot(profils, taille_bloc=taille_bloc, simulations=200), reference)
+    with ProcessPoolExecutor(2) as executeur:
+        pd.testing.assert_frame_equal(analyser_lot(profils, executeur, 2, simulations=200), reference)
+
+
+def test_graine_par_ligne(profils):
+    # La ligne i est tirée avec graine + i, qu'elle soit seule ou dans le lot
+    lot = analyser_profils(profils, simulations=200, graine=5)
+    seule = analyser_profils(profils.iloc[[3]], simulations=200, graine=8)
+    pd.testing.assert_frame_equal(lot.iloc[[3]], seule)
+
+
+def test_profils_inconnus_listes_avant_decoupage(profils):
+    profils.loc[1, "objectif"] = "Achat d'un bateau"
+    profils.loc[5, "risque"] = "Extrême"
+    with pytest.raises(ValueError, match=r"2 profil\(s\).*ligne 1 .*ligne 5 "):
+        analyser_lot(profils, taille_bloc=2, simulations=200)
+    with pytest.raises(ValueError, match="investissement_mensuel"):
+        analyser_lot(profils.drop(columns="investissement_mensuel"))
+
+
+def test_ligne_de_commande(profils, tmp_path):
+    entree = tmp_path / "profils.csv"
+    profils.to_csv(entree, index=False)
+    sorties = [tmp_path / "seul.csv", tmp_path / "pool.csv"]
+    main(["--processus", "1", "profils", str(entree), str(sorties[0]), "--simulations", "200"])
+    main(["--processus", "2", "profils", str(entree), str(sorties[1]), "--simulations", "200", "--taille-bloc", "3"])
+    seul, pool = (pd.read_csv(s, index_col=0) for s in sorties)
+    assert len(seul) == len(profils)
+    pd.testing.assert_frame_equal(seul, pool)
+
+
+def test_ligne_de_commande_refuse_les_profils_inconnus(profils, tmp_path):
+    profils.loc[2, "objectif"] = "Inconnu"
+    entree, sortie = tmp_path / "profils.csv", tmp_path / "rapport.csv"
+    profils.to_csv(entree, index=False)
+    with pytest.raises(SystemExit, match="ligne 2 : objectif='Inconnu'"):
+        main(["--processus", "1", "profils", str(entree), str(sortie)])
+    assert not sortie.exists()
+
+
+def test_lire_tickers(tmp_path):
+    texte, csv = tmp_path / "tickers.txt", tmp_path / "tickers.csv"
+    texte.write_text("aapl\n\n msft \n", encoding="utf-8")
+    pd.DataFrame({"Symbol": ["spy", None, " qqq"]}).to_csv(csv, index=False)
+    assert lire_tickers(texte) == ["AAPL", "MSFT"]
+    assert lire_tickers(csv) == ["SPY", "QQQ"]
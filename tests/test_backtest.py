@@ -0,0 +1,74 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from backtest import backtester, comparer, statistiques
+
+
+def backtest_jour_par_jour(rendements, poids, frequence, montant_initial, versement_mensuel):
+    # Référence directe : avoirs par classe, mis à jour jour après jour
+    w = np.asarray(poids, dtype=float) / np.sum(poids)
+    r = rendements.to_numpy()
+    mois = rendements.index.to_period("M")
+    periodes = rendements.index.to_period(frequence) if frequence else None
+    avoirs, valeurs = montant_initial * w, []
+    for i in range(len(r)):
+        avoirs = avoirs * (1 + r[i])
+        if i > 0 and mois[i] != mois[i - 1]:
+            avoirs = avoirs + versement_mensuel * w
+        valeurs.append(avoirs.sum())
+        if periodes is not None and i > 0 and periodes[i] != periodes[i - 1]:
+            avoirs = valeurs[-1] * w
+    return np.array(valeurs)
+
+
+@pytest.fixture
+def rendements():
+    rng = np.random.default_rng(1)
+    jours = pd.bdate_range("2015-01-01", "2019-12-31")
+    return pd.DataFrame(rng.normal(0.0003, [0.012, 0.004, 0.009], (len(jours), 3)), index=jours,
+                        columns=["Actions", "Obligations", "Immobilier"])
+
+
+@pytest.mark.parametrize("frequence", ["M", "Q", "Y", None])
+@pytest.mark.parametrize("montant_initial,versement", [(10_000, 0), (0, 500), (10_000, 250)])
+def test_identique_a_la_boucle(rendements, frequence, montant_initial, versement):
+    poids = pd.DataFrame([[60, 30, 10], [20, 70, 10], [1, 0, 0]], index=["A", "B", "C"], columns=rendements.columns)
+    courbes = backtester(rendements, poids, frequence, montant_initial, versement)
+    assert list(courbes.columns) == ["A", "B", "C"] and courbes.index.equals(rendements.index)
+    for variante in poids.index:
+        attendu = backtest_jour_par_jour(rendements, poids.loc[variante], frequence, montant_initial, versement)
+        np.testing.assert_allclose(courbes[variante], attendu, rtol=1e-10)
+
+
+def test_colonnes_dans_un_autre_ordre(rendements):
+    poids = pd.DataFrame([[10, 60, 30]], columns=["Immobilier", "Actions", "Obligations"])
+    courbes = backtester(rendements, poids, "Q", 1_000)
+    attendu = backtest_jour_par_jour(rendements, [60, 30, 10], "Q", 1_000, 0)
+    np.testing.assert_allclose(courbes[0], attendu, rtol=1e-10)
+
+
+def test_statistiques(rendements):
+    poids = pd.DataFrame([[60, 30, 10]], index=["A"], columns=rendements.columns)
+    courbes = comparer(rendements, poids, montant_initial=10_000)
+    assert list(courbes.columns) == ["A · Mensuel", "A · Trimestriel", "A · Annuel", "A · Jamais"]
+    stats = statistiques(courbes, 10_000)
+    valeurs = courbes["A · Jamais"]
+    annees = len(valeurs) / 252
+    assert stats.loc["A · Jamais", "Rendement annualisé (%)"] == \
+        pytest.approx(((valeurs.iloc[-1] / 10_000) ** (1 / annees) - 1) * 100)
+    serie = pd.concat([pd.Series([10_000.0]), valeurs.reset_index(drop=True)])
+    assert stats.loc["A · Jamais", "Drawdown max (%)"] == pytest.approx((serie / serie.cummax() - 1).min() * 100)
+    assert stats.loc["A · Jamais", "Volatilité (%)"] == \
+        pytest.approx(serie.pct_change().dropna().std(ddof=0) * np.sqrt(252) * 100)
+
+
+def test_statistiques_neutralisent_les_versements(rendements):
+    # Rendements nuls : la valeur ne monte qu'avec les versements, le rendement pondéré par le temps reste nul
+    nuls = rendements * 0
+    poids = pd.DataFrame([[60, 30, 10]], columns=rendements.columns)
+    courbes = backtester(nuls, poids, "M", 1_000, 100)
+    stats = statistiques(courbes, 1_000, 100)
+    assert stats.loc[0, "Total versé ($)"] == pytest.approx(courbes[0].iloc[-1])
+    assert stats.loc[0, "Rendement annualisé (%)"] == pytest.approx(0, abs=1e-10)
+    assert stats.loc[0, "Drawdown max (%)"] == pytest.approx(0, abs=1e-10)
@@ -0,0 +1,92 @@
+import threading
+import time
+
+from cache_fondamentaux import CacheFondamentaux, _taille
+
+
+class Chargeur:
+    """Infos numérotées par version; les rafraîchissements attendent ``libre`` s'il est fourni."""
+
+    def __init__(self, libre=None):
+        self.libre = libre
+        self.appels = []
+
+    def __call__(self, ticker):
+        self.appels.append(ticker)
+        if self.libre is not None and len(self.appels) > 1:
+            self.libre.wait(5)
+        return {"symbol": ticker, "currentPrice": float(len(self.appels))}
+
+
+def attendre(condition, delai=5):
+    fin = time.monotonic() + delai
+    while not condition() and time.monotonic() < fin:
+        time.sleep(0.01)
+    return condition()
+
+
+def test_succes_et_echecs():
+    chargeur = Chargeur()
+    cache = CacheFondamentaux(chargeur, ttl_defaut=3600, ttl_champs={})
+    assert cache.obtenir("AAPL") == {"symbol": "AAPL", "currentPrice": 1.0}
+    cache.obtenir("AAPL")
+    cache.obtenir("MSFT")
+    stats = cache.statistiques()
+    assert (stats["succes"], stats["echecs"], stats["perimes"], stats["entrees"]) == (1, 2, 0, 2)
+    assert stats["taux_succes"] == 1 / 3 and chargeur.appels == ["AAPL", "MSFT"]
+
+
+def test_entree_perimee_servie_puis_rafraichie_une_fois():
+    libre = threading.Event()
+    chargeur = Chargeur(libre)
+    cache = CacheFondamentaux(chargeur, ttl_champs={"currentPrice": -1}, ttl_defaut=3600)
+    cache.obtenir("AAPL")
+    # Trois lectures pendant le rafraîchissement : l'ancienne valeur, un seul appel en arrière-plan
+    for _ in range(3):
+        assert cache.obtenir("AAPL")["currentPrice"] == 1.0
+    # Un champ encore valide ne déclenche rien
+    assert cache.obtenir("AAPL", champs=["symbol"])["currentPrice"] == 1.0
+    stats = cache.statistiques()
+    assert (stats["succes"], stats["echecs"], stats["perimes"]) == (4, 1, 3)
+    libre.set()
+    assert attendre(lambda: cache.statistiques()["rafraichissements"] == 1)
+    assert chargeur.appels == ["AAPL", "AAPL"]
+    assert cache.obtenir("AAPL", champs=["symbol"])["currentPrice"] == 2.0
+
+
+def test_erreur_de_rafraichissement():
+    def charger(ticker, appels=[]):
+        appels.append(ticker)
+        if len(appels) > 1:
+            raise ConnectionError("indisponible")
+        return {"currentPrice": 1.0}
+    cache = CacheFondamentaux(charger, ttl_champs={"currentPrice": -1})
+    cache.obtenir("AAPL")
+    assert cache.obtenir("AAPL") == {"currentPrice": 1.0}
+    assert attendre(lambda: cache.statistiques()["erreurs_rafraichissement"] == 1)
+
+
+def test_eviction_par_nombre():
+    cache = CacheFondamentaux(Chargeur(), max_entrees=3)
+    for ticker in ["A", "B", "C"]:
+        cache.obtenir(ticker)
+    cache.obtenir("A")  # A redevient le plus récent : B est évincé en premier
+    cache.obtenir("D")
+    cache.obtenir("E")
+    assert list(cache._entrees) == ["A", "D", "E"]
+    assert cache.statistiques()["evictions"] == 2
+
+
+def test_eviction_par_memoire():
+    # Infos dont l'essentiel est imbriqué, comme la liste des dirigeants de Ticker.info
+    def charger(ticker):
+        return {"symbol": ticker, "companyOfficers": [{"name": f"Dirigeant {i} " * 20, "age": i} for i in range(50)]}
+    infos = charger("AAPL")
+    taille = _taille(infos)
+    assert taille > sum(len(dirigeant["name"]) for dirigeant in infos["companyOfficers"])
+    cache = CacheFondamentaux(charger, memoire_max=int(2.5 * taille))
+    for ticker in ["AAPL", "MSFT", "GOOG", "AMZN"]:
+        cache.obtenir(ticker)
+    stats = cache.statistiques()
+    assert list(cache._entrees) == ["GOOG", "AMZN"] and stats["evictions"] == 2
+    assert stats["memoire"] <= 2.5 * taille
@@ -0,0 +1,71 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from cassettes import BackendEnregistreur, BackendRejoueur, borner, lire_latence, selon_environnement
+
+
+class FauxBackend:
+    def telecharger(self, tickers, **params):
+        jours = pd.bdate_range(params["start"], params["end"], inclusive="left")
+        barres = {t: pd.DataFrame({"Close": np.arange(len(jours), dtype=float) + i, "Volume": 1.0}, index=jours)
+                  for i, t in enumerate(tickers)}
+        return pd.concat(barres, axis=1, names=["Ticker", "Price"]).swaplevel(axis=1)
+
+    def infos(self, ticker):
+        return {"symbol": ticker, "longName": f"Société {ticker}"}
+
+
+def test_enregistrement_puis_relecture(tmp_path):
+    enregistreur = BackendEnregistreur(FauxBackend(), tmp_path)
+    janvier = enregistreur.telecharger(["AAPL", "MSFT"], start="2024-01-01", end="2024-02-01", interval="1d",
+                                       progress=False)
+    fevrier = enregistreur.telecharger(["AAPL"], start="2024-02-01", end="2024-03-01", interval="1d")
+    enregistreur.infos("AAPL")
+
+    rejoueur = BackendRejoueur(tmp_path)
+    # Regroupement différent de l'enregistrement : les barres sont découpées par ticker
+    rejoue = rejoueur.telecharger(["MSFT", "AAPL"], start="2024-01-01", end="2024-02-01", interval="1d")
+    pd.testing.assert_frame_equal(rejoue.xs("AAPL", axis=1, level=1), janvier.xs("AAPL", axis=1, level=1),
+                                  check_freq=False)
+    pd.testing.assert_frame_equal(rejoue.xs("MSFT", axis=1, level=1), janvier.xs("MSFT", axis=1, level=1),
+                                  check_freq=False)
+    # Les deux plages enregistrées sont fusionnées
+    deux_mois = rejoueur.telecharger(["AAPL"], start="2024-01-15", end="2024-02-15", interval="1d")
+    assert deux_mois.index[0] == pd.Timestamp("2024-01-15") and deux_mois.index[-1] == pd.Timestamp("2024-02-14")
+    assert deux_mois[("Close", "AAPL")].loc["2024-02-01"] == fevrier[("Close", "AAPL")].loc["2024-02-01"]
+    assert rejoueur.infos("AAPL") == {"symbol": "AAPL", "longName": "Société AAPL"}
+    assert rejoueur.statistiques["manquantes"] == 0
+
+
+def test_cassette_absente(tmp_path):
+    rejoueur = BackendRejoueur(tmp_path)
+    assert rejoueur.telecharger(["ZZZ"], start="2024-01-01", end="2024-02-01", interval="1d").empty
+    # Un autre intervalle est un autre jeu de paramètres
+    BackendEnregistreur(FauxBackend(), tmp_path).telecharger(["AAPL"], start="2024-01-01", end="2024-02-01",
+                                                            interval="1d")
+    assert BackendRejoueur(tmp_path).telecharger(["AAPL"], start="2024-01-01", end="2024-02-01",
+                                                 interval="1wk").empty
+    assert rejoueur.infos("ZZZ") == {}
+    assert rejoueur.statistiques == {"appels": 2, "manquantes": 2}
+
+
+def test_borner():
+    barres = pd.DataFrame({"Close": range(60)}, index=pd.date_range("2024-01-01", periods=60, tz="America/New_York"))
+    assert len(borner(barres, {"start": "2024-01-10", "end": "2024-01-20"})) == 10
+    assert len(borner(barres, {"period": "5d"})) == 5
+    assert len(borner(barres, {"period": "1mo"})) == 30
+    assert len(borner(barres, {"period": "max"})) == 60
+
+
+def test_configuration(tmp_path):
+    assert lire_latence("0.2") == 0.2 and lire_latence("0.1-0.5") == (0.1, 0.5)
+    assert lire_latence("enregistree") == "enregistree"
+    backend = FauxBackend()
+    assert selon_environnement(backend, {}) is backend
+    assert isinstance(selon_environnement(backend, {"DONNEES_MODE": "enregistrer"}), BackendEnregistreur)
+    rejoueur = selon_environnement(backend, {"DONNEES_MODE": "rejouer", "DONNEES_CASSETTES": str(tmp_path),
+                                             "DONNEES_LATENCE": "0.1-0.2"})
+    assert isinstance(rejoueur, BackendRejoueur) and rejoueur.latence == (0.1, 0.2)
+    with pytest.raises(ValueError):
+        selon_environnement(backend, {"DONNEES_MODE": "hors-ligne"})
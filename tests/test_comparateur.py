@@ -0,0 +1,103 @@
+import contextvars
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from comparateur import AppelsEnVol, collecter
+
+page = contextvars.ContextVar("page", default=None)
+
+
+class Fournisseur:
+    """Répond après ``latences[element]`` secondes; les éléments ``bloques`` attendent ``libre``."""
+
+    def __init__(self, latences=None, bloques=()):
+        self.latences = latences or {}
+        self.bloques = set(bloques)
+        self.libre = threading.Event()
+        self.appels = []
+        self._verrou = threading.Lock()
+
+    def __call__(self, element):
+        with self._verrou:
+            self.appels.append(element)
+        if element in self.bloques:
+            self.libre.wait(10)
+        time.sleep(self.latences.get(element, 0))
+        if element == "ERREUR":
+            raise ValueError("fonds inconnu")
+        return {"Symbole": element, "page": page.get()}
+
+
+@pytest.fixture
+def executeur():
+    with ThreadPoolExecutor(max_workers=2) as executeur:
+        yield executeur
+
+
+def test_resultats_partiels_avant_le_delai(executeur):
+    fournisseur = Fournisseur({"SPY": 0.1}, bloques=["BLOQUE"])
+    debut = time.monotonic()
+    arrivees = []
+    jeton = page.set("comparateur")
+    try:
+        for element, resultat, erreur in collecter(executeur, fournisseur, ["BLOQUE", "SPY", "ERREUR"], 0.5):
+            arrivees.append((element, resultat, type(erreur), time.monotonic() - debut))
+    finally:
+        page.reset(jeton)
+    fournisseur.libre.set()
+    # Dans l'ordre d'arrivée; l'appel bloqué est abandonné à l'échéance sans retenir les autres
+    assert [a[0] for a in arrivees] == ["SPY", "ERREUR", "BLOQUE"]
+    assert arrivees[0][1] == {"Symbole": "SPY", "page": "comparateur"} and arrivees[0][2] is type(None)
+    assert arrivees[1][2] is ValueError
+    assert arrivees[2][1] is None and arrivees[2][2] is TimeoutError and 0.5 <= arrivees[2][3] < 1.5
+
+
+def test_appel_en_file_annule(executeur):
+    fournisseur = Fournisseur(bloques=["A", "B"])
+    resultats = list(collecter(executeur, fournisseur, ["A", "B", "C"], 0.3))
+    fournisseur.libre.set()
+    # Deux fils occupés : C attend en file, dépasse son délai et n'est jamais exécuté
+    assert sorted((e, type(erreur)) for e, _, erreur in resultats) == \
+        [("A", TimeoutError), ("B", TimeoutError), ("C", TimeoutError)]
+    executeur.shutdown(wait=True)
+    assert sorted(fournisseur.appels) == ["A", "B"]
+
+
+def test_un_fonds_bloque_n_occupe_qu_un_fil(executeur):
+    fournisseur = Fournisseur(bloques=["BLOQUE"])
+    en_vol = AppelsEnVol()
+    # Comparaisons successives qui redemandent toutes le fonds bloqué : un seul appel, un seul fil occupé
+    for _ in range(4):
+        resultats = dict((e, erreur) for e, _, erreur in
+                         collecter(executeur, fournisseur, ["BLOQUE", "SPY"], 0.2, en_vol))
+        assert isinstance(resultats["BLOQUE"], TimeoutError) and resultats["SPY"] is None
+    assert fournisseur.appels.count("BLOQUE") == 1 and fournisseur.appels.count("SPY") == 4
+    assert len(en_vol) == 1
+
+    # Une comparaison qui attend l'appel en cours reçoit sa réponse dès qu'il se termine
+    threading.Timer(0.1, fournisseur.libre.set).start()
+    resultats = list(collecter(executeur, fournisseur, ["BLOQUE"], 2, en_vol))
+    assert resultats == [("BLOQUE", {"Symbole": "BLOQUE", "page": None}, None)]
+    assert fournisseur.appels.count("BLOQUE") == 1 and len(en_vol) == 0
+    # Terminé : une nouvelle demande repart vers le fournisseur
+    list(collecter(executeur, fournisseur, ["BLOQUE"], 2, en_vol))
+    assert fournisseur.appels.count("BLOQUE") == 2
+
+
+def test_appel_partage_annule_par_son_dernier_demandeur(executeur):
+    fournisseur = Fournisseur(bloques=["A", "B"])
+    en_vol = AppelsEnVol()
+    list(collecter(executeur, fournisseur, ["A", "B"], 0.1, en_vol))
+    # C reste en file derrière A et B; deux comparaisons simultanées l'attendent puis l'abandonnent
+    fils = [threading.Thread(target=lambda: list(collecter(executeur, fournisseur, ["C"], 0.2, en_vol)))
+            for _ in range(2)]
+    for fil in fils:
+        fil.start()
+    for fil in fils:
+        fil.join()
+    fournisseur.libre.set()
+    executeur.shutdown(wait=True)
+    assert "C" not in fournisseur.appels and len(en_vol) == 0
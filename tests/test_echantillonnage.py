@@ -0,0 +1,50 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from echantillonnage import GRANULARITES, MAX_CHANDELIERS, agreger_ohlcv, choisir_granularite, lttb, reduire_serie
+
+
+def historique(index, graine=0):
+    rng = np.random.default_rng(graine)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, len(index))))
+    return pd.DataFrame({"Open": close, "High": close * 1.01, "Low": close * 0.99, "Close": close,
+                         "Volume": rng.integers(1, 1000, len(index)).astype(float)}, index=index)
+
+
+@pytest.mark.parametrize("annees", [0.5, 2, 5, 30, 45, 70, 130])
+@pytest.mark.parametrize("max_barres", [MAX_CHANDELIERS, 50, 8])
+def test_le_plafond_de_chandeliers_est_respecte(annees, max_barres):
+    df = historique(pd.bdate_range(end="2024-06-28", periods=int(annees * 252)))
+    regle, _ = choisir_granularite(df.index, max_barres)
+    barres = agreger_ohlcv(df, regle)
+    assert len(barres) <= max_barres
+    assert barres["High"].max() == df["High"].max() and barres["Volume"].sum() == df["Volume"].sum()
+    assert barres.index[-1] == df.index[-1]
+
+
+@pytest.mark.parametrize("regle", [r for r, _ in GRANULARITES[1:]])
+def test_comptage_des_periodes_identique_a_resample(regle):
+    from echantillonnage import _nombre_barres
+    # Séances irrégulières (jours fériés, week-ends de cryptomonnaies, dates avant 1970)
+    rng = np.random.default_rng(1)
+    index = pd.DatetimeIndex(np.sort(rng.choice(pd.date_range("1960-01-01", "2024-01-01"), 3000, replace=False)))
+    assert _nombre_barres(index, regle) == len(agreger_ohlcv(historique(index), regle))
+
+
+def test_granularite_la_plus_fine_possible():
+    index = pd.bdate_range(end="2024-06-28", periods=50 * 252)
+    assert choisir_granularite(index[-400:]) == GRANULARITES[0]
+    assert choisir_granularite(index[-5 * 252:])[0] == "W-FRI"
+    # 50 ans : plus de 500 mois, moins de 500 trimestres
+    assert choisir_granularite(index)[0] == "QE"
+
+
+def test_lttb_garde_les_extremites_et_le_nombre_de_points():
+    x = np.arange(10_000)
+    y = np.sin(x / 300) + (x == 5000) * 10
+    indices = lttb(x, y, 500)
+    assert len(indices) == 500 and indices[0] == 0 and indices[-1] == len(x) - 1
+    assert np.all(np.diff(indices) > 0) and 5000 in indices
+    serie = pd.Series(y, index=pd.date_range("2000-01-01", periods=len(x), freq="h"))
+    assert len(reduire_serie(serie, 1500)) == 1500
@@ -0,0 +1,99 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from indicateurs import MoteurIndicateurs, calculer_indicateurs, ema, rsi, sma
+
+CLES = ("SMA20", "RSI", "EMA12", "EMA26", "MACD", "Signal")
+
+
+def serie(n, graine=0):
+    rng = np.random.default_rng(graine)
+    return 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+
+
+def rsi_wilder(closes, n=14):
+    # Définition de Wilder, terme à terme : amorçage par la moyenne simple des n premières variations
+    delta = np.diff(closes)
+    resultat = np.full(len(closes), np.nan)
+    if len(delta) < n:
+        return resultat
+    gain, perte = np.maximum(delta, 0), np.maximum(-delta, 0)
+    moyenne_gain, moyenne_perte = gain[:n].mean(), perte[:n].mean()
+    resultat[n] = 100 - 100 / (1 + moyenne_gain / moyenne_perte)
+    for t in range(n, len(delta)):
+        moyenne_gain = (moyenne_gain * (n - 1) + gain[t]) / n
+        moyenne_perte = (moyenne_perte * (n - 1) + perte[t]) / n
+        resultat[t + 1] = 100 - 100 / (1 + moyenne_gain / moyenne_perte)
+    return resultat
+
+
+def reference(closes, lissage_rsi="simple"):
+    # Formules pandas d'origine de l'onglet Analyse Technique
+    close = pd.Series(closes, dtype=float)
+    delta = close.diff()
+    gain = delta.copy()
+    gain[delta < 0] = 0
+    perte = -delta.copy()
+    perte[delta > 0] = 0
+    ema12 = close.ewm(span=12, adjust=False).mean()
+    ema26 = close.ewm(span=26, adjust=False).mean()
+    ligne = ema12 - ema26
+    simple = 100 - (100 / (1 + gain.rolling(window=14).mean() / perte.rolling(window=14).mean()))
+    return {
+        "SMA20": close.rolling(window=20).mean().to_numpy(),
+        "RSI": simple.to_numpy() if lissage_rsi == "simple" else rsi_wilder(closes),
+        "EMA12": ema12.to_numpy(),
+        "EMA26": ema26.to_numpy(),
+        "MACD": ligne.to_numpy(),
+        "Signal": ligne.ewm(span=9, adjust=False).mean().to_numpy(),
+    }
+
+
+def verifier(resultats, attendus):
+    for cle in CLES:
+        np.testing.assert_allclose(resultats[cle], attendus[cle], rtol=1e-9, atol=1e-9, equal_nan=True, err_msg=cle)
+
+
+@pytest.mark.parametrize("lissage", ["simple", "wilder"])
+@pytest.mark.parametrize("n", [0, 1, 2, 5, 14, 15, 19, 20, 21, 300, 50 * 252])
+def test_lot_identique_a_pandas(n, lissage):
+    closes = serie(n)
+    verifier(calculer_indicateurs(closes, lissage_rsi=lissage), reference(closes, lissage))
+
+
+def test_lot_par_colonnes_et_valeurs_manquantes():
+    prix = np.column_stack([serie(400, g) for g in range(3)])
+    prix[:30, 1] = np.nan  # titre coté plus tard
+    for fonction, attendu in [(lambda x: sma(x, 20), lambda s: s.rolling(20).mean()),
+                              (lambda x: ema(x, 12), lambda s: s.ewm(span=12, adjust=False).mean())]:
+        resultat = fonction(prix)
+        for j in range(prix.shape[1]):
+            np.testing.assert_allclose(resultat[:, j], attendu(pd.Series(prix[:, j])), rtol=1e-9, equal_nan=True)
+    for j in range(prix.shape[1]):
+        colonne = prix[:, j]
+        np.testing.assert_allclose(rsi(prix)[:, j], rsi(colonne), rtol=1e-12, equal_nan=True)
+
+
+@pytest.mark.parametrize("lissage", ["simple", "wilder"])
+@pytest.mark.parametrize("historique", [0, 1, 3, 10, 14, 15, 19, 20, 25, 500])
+def test_ajout_incremental_identique_au_lot(historique, lissage):
+    closes = serie(historique + 60, graine=1)
+    moteur, initiaux = MoteurIndicateurs.depuis_historique(closes[:historique], lissage_rsi=lissage)
+    ajout = moteur.etendre(closes[historique:])
+    attendus = reference(closes, lissage)
+    verifier(initiaux, {k: v[:historique] for k, v in attendus.items()})
+    verifier(ajout, {k: v[historique:] for k, v in attendus.items()})
+    assert moteur.nb_barres == len(closes)
+
+
+def test_ajout_barre_par_barre_sur_longue_serie():
+    # Recalcul exact périodique des sommes glissantes : pas de dérive sur des dizaines de milliers de barres
+    closes = serie(20_000, graine=2)
+    moteur = MoteurIndicateurs()
+    for close in closes[:-1]:
+        moteur.ajouter(close)
+    derniere = moteur.ajouter(closes[-1])
+    attendus = reference(closes)
+    for cle in CLES:
+        assert derniere[cle] == pytest.approx(attendus[cle][-1], rel=1e-9), cle
@@ -0,0 +1,105 @@
+import math
+import threading
+
+import pytest
+
+from instrumentation import BORNES, Histogramme, Instrumentation
+
+
+def test_histogramme_classes_et_quantiles():
+    h = Histogramme()
+    for duree in [0.0005, 0.001, 0.002, 0.02, 0.02, 0.3, 20.0]:
+        h.observer(duree)
+    # Une durée égale à une borne tombe dans sa classe (le <= borne)
+    assert h.comptes[0] == 2 and h.comptes[BORNES.index(0.0025)] == 1
+    assert h.comptes[BORNES.index(0.025)] == 2 and h.comptes[BORNES.index(0.5)] == 1
+    assert h.comptes[-1] == 1 and sum(h.comptes) == h.nombre == 7
+    assert h.somme == pytest.approx(20.3435) and h.maximum == 20.0
+    assert h.quantile(0.5) == 0.025
+    assert h.quantile(0.25) == 0.001
+    assert h.quantile(0.99) == 20.0
+    # La borne d'une classe ne dépasse jamais le maximum observé
+    petit = Histogramme()
+    petit.observer(0.003)
+    assert petit.quantile(0.5) == 0.003
+    assert math.isnan(Histogramme().quantile(0.5))
+
+
+def test_cache_compte_par_page_et_par_session():
+    instr = Instrumentation()
+
+    def appel(manque):
+        with instr.mesurer_cache("prix"):
+            if manque:
+                instr.signaler_manque()
+
+    def visite(page, session, manques):
+        with instr.contexte(page, session):
+            for manque in manques:
+                appel(manque)
+
+    # Sessions simultanées dans des fils distincts : chacune garde sa page et sa session
+    fils = [threading.Thread(target=visite, args=("screener", "s1", [True, False, False])),
+            threading.Thread(target=visite, args=("profil", "s2", [True, True]))]
+    for fil in fils:
+        fil.start()
+    for fil in fils:
+        fil.join()
+    appel(False)  # hors contexte : page d'arrière-plan, sans session
+
+    compteurs = dict(instr._compteurs)
+    assert compteurs == {("screener", "cache_prix_echecs"): 1, ("screener", "cache_prix_succes"): 2,
+                         ("profil", "cache_prix_echecs"): 2, ("arriere-plan", "cache_prix_succes"): 1}
+    assert instr.taux_cache() == {"prix": {"succes": 3, "echecs": 3, "taux_succes": 0.5}}
+    sessions = {(l["session"], l["page"], l["categorie"]): l["nombre"] for l in instr.resume_sessions()}
+    assert sessions == {("s1", "screener", "cache"): 3, ("s2", "profil", "cache"): 2}
+    pages = {(l["page"], l["nom"]): l["nombre"] for l in instr.resume_pages()}
+    assert pages == {("screener", "prix"): 3, ("profil", "prix"): 2, ("arriere-plan", "prix"): 1}
+
+
+def test_sessions_bornees():
+    instr = Instrumentation(max_sessions=2)
+    for session in ["a", "b", "a", "c"]:
+        with instr.contexte("faq", session):
+            instr.observer("page", "faq", 0.01)
+    assert list(instr._sessions) == ["a", "c"]
+
+
+def test_texte_prometheus():
+    instr = Instrumentation()
+    with instr.contexte('page "spéciale"\\', "s1"):
+        instr.observer("calcul", "monte\ncarlo", 0.003)
+        instr.observer("calcul", "monte\ncarlo", 7.0)
+        instr.compter("cache_prix_succes", 2)
+    instr.enregistrer_jauges("planificateur", lambda: {"appels_backend": 4, "actif": True, "nom": "x"})
+    instr.enregistrer_jauges("panne", lambda: 1 / 0)
+    lignes = instr.texte_prometheus("app").splitlines()
+
+    assert "# TYPE app_duree_secondes histogram" in lignes
+    assert "# TYPE app_evenements_total counter" in lignes
+    assert "# TYPE app_jauge gauge" in lignes
+    etiquettes = 'page="page \\"spéciale\\"\\\\",categorie="calcul",nom="monte\\ncarlo"'
+    seaux = [l for l in lignes if l.startswith("app_duree_secondes_bucket{")]
+    assert len(seaux) == len(BORNES) + 1 and all(etiquettes in l for l in seaux)
+    # Comptes cumulés, croissants jusqu'à +Inf
+    assert f'app_duree_secondes_bucket{{{etiquettes},le="0.0025"}} 0' in lignes
+    assert f'app_duree_secondes_bucket{{{etiquettes},le="0.005"}} 1' in lignes
+    assert f'app_duree_secondes_bucket{{{etiquettes},le="5.0"}} 1' in lignes
+    assert f'app_duree_secondes_bucket{{{etiquettes},le="+Inf"}} 2' in lignes
+    assert f"app_duree_secondes_sum{{{etiquettes}}} 7.003" in lignes
+    assert f"app_duree_secondes_count{{{etiquettes}}} 2" in lignes
+    assert 'app_evenements_total{page="page \\"spéciale\\"\\\\",nom="cache_prix_succes"} 2' in lignes
+    assert 'app_jauge{nom="sessions_suivies"} 1' in lignes
+    # Seules les valeurs numériques des jauges sont exportées; une source en erreur est ignorée
+    assert 'app_jauge{nom="planificateur_appels_backend"} 4' in lignes
+    assert not any("planificateur_actif" in l or "planificateur_nom" in l or "panne" in l for l in lignes)
+
+
+def test_ecriture_atomique(tmp_path):
+    instr = Instrumentation()
+    chemin = tmp_path / "metriques" / "app.prom"
+    instr.ecrire_si_necessaire(str(chemin), intervalle=60)
+    assert chemin.read_text(encoding="utf-8").startswith("# HELP conseiller_duree_secondes")
+    chemin.unlink()
+    instr.ecrire_si_necessaire(str(chemin), intervalle=60)
+    assert not chemin.exists() and list(chemin.parent.iterdir()) == []
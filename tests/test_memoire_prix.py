@@ -0,0 +1,140 @@
+import os
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import memoire_prix
+from indicateurs import calculer_indicateurs
+from memoire_prix import MemoirePrix
+
+
+class StockageSynthetique:
+    """Barres journalières déterministes (même prix pour une même date, quelle que soit la plage)."""
+
+    def __init__(self, ttl_jour=900):
+        self.ttl_jour = ttl_jour
+        self.lectures = []
+
+    def lire(self, ticker, debut, fin, intervalle="1d"):
+        self.lectures.append((ticker, debut, fin))
+        index = pd.bdate_range(debut, fin - timedelta(days=1), name="Date")
+        jours = (index - pd.Timestamp("2000-01-01")).days.to_numpy()
+        close = 100 + 20 * np.sin(jours / 37) + jours / 50 + len(ticker)
+        return pd.DataFrame({"Open": close - 0.5, "High": close + 1, "Low": close - 1, "Close": close,
+                             "Volume": jours * 10}, index=index)
+
+
+@pytest.fixture
+def memoire(tmp_path):
+    def creer(stockage=None, **options):
+        return MemoirePrix(stockage or StockageSynthetique(), dossier=str(tmp_path / "memoire"), **options)
+    return creer
+
+
+def test_vue_en_lecture_seule(memoire):
+    stockage = StockageSynthetique()
+    prix = memoire(stockage)
+    vue = prix.vue("AAPL", date(2020, 1, 1), date(2021, 1, 1))
+    attendu = stockage.lire("AAPL", date(2020, 1, 1), date(2021, 1, 1))
+    pd.testing.assert_index_equal(vue.index(), attendu.index.as_unit("ns"))
+    np.testing.assert_allclose(vue.dataframe().to_numpy(), attendu.to_numpy(), rtol=1e-6)
+    assert vue.close.dtype == np.float32 and not vue.close.flags.writeable
+    with pytest.raises(ValueError):
+        vue.close[0] = 0
+
+    # Une sous-plage est une tranche du même bloc, sans nouvelle lecture
+    sous = prix.vue("AAPL", date(2020, 3, 1), date(2020, 4, 1))
+    assert np.shares_memory(sous.close, vue.close) and len(stockage.lectures) == 2
+    assert sous.index()[0] == pd.Timestamp("2020-03-02") and sous.index()[-1] == pd.Timestamp("2020-03-31")
+
+
+def test_plage_prolongee_fusionnee(memoire):
+    stockage = StockageSynthetique()
+    prix = memoire(stockage)
+    prix.vue("AAPL", date(2020, 1, 1), date(2020, 7, 1))
+    vue = prix.vue("AAPL", date(2020, 6, 1), date(2021, 1, 1))
+    # Le bloc rechargé couvre l'union des deux plages
+    assert stockage.lectures[-1] == ("AAPL", date(2020, 1, 1), date(2021, 1, 1))
+    assert vue.index()[0] == pd.Timestamp("2020-06-01")
+    prix.vue("AAPL", date(2020, 1, 1), date(2021, 1, 1))
+    assert prix.statistiques["chargements"] == 2 and len(stockage.lectures) == 2
+
+
+def test_journee_en_cours_expire(memoire):
+    stockage = StockageSynthetique(ttl_jour=-1)
+    prix = memoire(stockage)
+    debut = date.today() - timedelta(days=30)
+    prix.vue("AAPL", debut)
+    prix.vue("AAPL", debut)
+    assert prix.statistiques["chargements"] == 2
+    # Une plage passée n'expire pas
+    prix.vue("MSFT", date(2020, 1, 1), date(2020, 2, 1))
+    prix.vue("MSFT", date(2020, 1, 1), date(2020, 2, 1))
+    assert prix.statistiques["chargements"] == 3
+
+
+def test_eviction(memoire):
+    prix = memoire(max_tickers=2)
+    vues = [prix.vue(t, date(2020, 1, 1), date(2020, 2, 1)) for t in ["A", "BB", "CCC"]]
+    assert prix.statistiques["evictions"] == 1 and prix.memoire()["blocs"] == 2
+    assert sorted(os.listdir(prix.dossier)) == sorted(f"{t}_1d_{v}_{c}.npy" for t, v in [("BB", 2), ("CCC", 3)]
+                                                      for c in ["dates", "ohlc", "volume"])
+    # La vue distribuée avant l'éviction reste lisible
+    assert vues[0].close[0] == pytest.approx(vues[1].close[0] - 1)
+
+
+def test_indicateurs_partages_et_prolonges(memoire):
+    stockage = StockageSynthetique()
+    prix = memoire(stockage)
+    debut = date(2015, 1, 1)
+    courte = prix.vue("AAPL", debut, date(2019, 1, 1))
+    premiers = prix.indicateurs("AAPL", courte)
+    assert prix.indicateurs("AAPL", courte)["RSI"] is not premiers["RSI"]
+    assert prix.statistiques["indicateurs_succes"] == 1
+
+    longue = prix.vue("AAPL", debut, date(2020, 1, 1))
+    prolonges = prix.indicateurs("AAPL", longue)
+    assert prix.statistiques["indicateurs_prolonges"] == 1 and prix.statistiques["indicateurs_calcules"] == 1
+    # Le prolongement incrémental donne le même résultat qu'un calcul complet sur les mêmes prix
+    complets = calculer_indicateurs(longue.close.astype(float))
+    # Et les prix float32 restent proches du calcul float64 sur les prix d'origine
+    reference = calculer_indicateurs(stockage.lire("AAPL", debut, date(2020, 1, 1))["Close"].to_numpy())
+    for cle, valeurs in prolonges.items():
+        np.testing.assert_allclose(valeurs, complets[cle], rtol=1e-9, atol=1e-9, equal_nan=True, err_msg=cle)
+        np.testing.assert_allclose(valeurs, reference[cle], rtol=1e-5, atol=1e-2, equal_nan=True, err_msg=cle)
+        np.testing.assert_array_equal(valeurs[:len(courte)], premiers[cle])
+        assert not valeurs.flags.writeable
+
+    # Une vue plus courte de la même plage est servie depuis l'entrée prolongée
+    assert len(prix.indicateurs("AAPL", courte)["SMA20"]) == len(courte)
+    assert prix.statistiques["indicateurs_succes"] == 2
+
+
+def test_instances_du_meme_processus(memoire):
+    premiere = memoire()
+    vue = premiere.vue("AAPL", date(2020, 1, 1), date(2020, 2, 1))
+    seconde = memoire()
+    assert seconde.dossier != premiere.dossier
+    assert len(os.listdir(premiere.dossier)) == 3 and vue.close[0] > 0
+    dossier = premiere.dossier
+    del premiere, vue
+    assert not os.path.exists(dossier) and os.path.isdir(seconde.dossier)
+
+
+def test_nettoyage_selon_le_processus(tmp_path, monkeypatch):
+    racine = tmp_path / "memoire"
+    for pid in ["101", "102", "103"]:
+        (racine / pid / "0").mkdir(parents=True)
+
+    def kill(pid, signal):
+        if pid == 101:
+            raise ProcessLookupError
+        if pid == 102:
+            raise PermissionError  # en vie, mais lancé par un autre utilisateur
+
+    monkeypatch.setattr(memoire_prix.os, "kill", kill)
+    monkeypatch.setattr(memoire_prix.os, "name", "posix")
+    memoire_prix._nettoyer(str(racine))
+    assert sorted(os.listdir(racine)) == ["102", "103"]
@@ -0,0 +1,92 @@
+import numpy as np
+import pytest
+
+from optimisation import _gradient_projete, frontiere, projeter, projeter_boite
+
+
+def projection_par_bisection(v, bas, haut, somme):
+    gauche, droite = (v - haut).min() - 1, (v - bas).max() + 1
+    for _ in range(200):
+        tau = (gauche + droite) / 2
+        if np.clip(v - tau, bas, haut).sum() > somme:
+            gauche = tau
+        else:
+            droite = tau
+    return np.clip(v - (gauche + droite) / 2, bas, haut)
+
+
+def test_projection_boite():
+    rng = np.random.default_rng(0)
+    for n in (1, 2, 5, 30):
+        v = rng.normal(0, 2, (200, n))
+        bas = rng.uniform(-0.5, 0.1, (200, n))
+        haut = bas + rng.uniform(0, 1, (200, n))
+        somme = rng.uniform(bas.sum(axis=1), haut.sum(axis=1))
+        w = projeter_boite(v, bas, haut, somme)
+        attendu = np.array([projection_par_bisection(*ligne) for ligne in zip(v, bas, haut, somme)])
+        np.testing.assert_allclose(w, attendu, atol=1e-10)
+    # Bornes communes et somme scalaire
+    v = rng.normal(size=(50, 8))
+    np.testing.assert_allclose(projeter_boite(v, 0.0, 0.3, 1.0).sum(axis=1), 1.0)
+
+
+def test_projection_avec_plancher():
+    rng = np.random.default_rng(1)
+    n = 8
+    obligations = np.arange(n) < 3
+    bas, haut = np.zeros(n), np.full(n, 0.4)
+    v = rng.normal(0, 1, (300, n)) + 2 * ~obligations
+    w = projeter(v, bas, haut, obligations, 0.5)
+    assert np.allclose(w.sum(axis=1), 1) and (w >= -1e-12).all() and (w <= 0.4 + 1e-12).all()
+    assert (w[:, obligations].sum(axis=1) >= 0.5 - 1e-12).all()
+    # Caractérisation de la projection : (v - w)·(z - w) <= 0 pour tout z admissible
+    admissibles = projeter(rng.normal(0, 3, (500, n)), bas, haut, obligations, 0.5)
+    assert ((v - w) @ admissibles.T - ((v - w) * w).sum(axis=1, keepdims=True) <= 1e-10).all()
+
+
+@pytest.fixture
+def marche():
+    rng = np.random.default_rng(2)
+    n = 12
+    facteurs = rng.normal(0, 0.1, (n, 3))
+    sigma = facteurs @ facteurs.T + np.diag(rng.uniform(0.01, 0.04, n))
+    return rng.uniform(0.01, 0.12, n), sigma
+
+
+@pytest.mark.parametrize("contraintes", [
+    {},
+    {"bas": 0.02, "haut": 0.3},
+    {"haut": 0.5, "obligations": np.arange(12) < 4, "plancher": 0.4},
+])
+def test_frontiere_optimale(marche, contraintes):
+    mu, sigma = marche
+    resultat = frontiere(mu, sigma, points=40, **contraintes)
+    w = resultat.poids
+    bas, haut = contraintes.get("bas", 0.0), contraintes.get("haut", 1.0)
+    assert np.allclose(w.sum(axis=1), 1) and (w >= bas - 1e-10).all() and (w <= haut + 1e-10).all()
+    if "plancher" in contraintes:
+        assert (w[:, contraintes["obligations"]].sum(axis=1) >= 0.4 - 1e-10).all()
+    np.testing.assert_allclose(resultat.volatilites, np.sqrt(np.einsum("ij,jk,ik->i", w, sigma, w)))
+    # Du minimum de variance au rendement maximal
+    assert (np.diff(resultat.rendements) >= -1e-10).all()
+    assert (np.diff(resultat.volatilites) >= -1e-10).all()
+
+    # Chaque point vaut au moins la solution d'un solveur indépendant (gradient projeté) à même aversion
+    lipschitz = np.linalg.eigvalsh(sigma)[-1]
+    t = np.concatenate([[0.0], np.geomspace(1e-3, 1e2, 39) * lipschitz / np.ptp(mu)])
+    n = len(mu)
+    reference, _ = _gradient_projete(t, mu, sigma, np.full(n, bas), np.full(n, haut),
+                                     contraintes.get("obligations"), contraintes.get("plancher", 0.0), lipschitz)
+    objectif = lambda p: 0.5 * np.einsum("ij,jk,ik->i", p, sigma, p) - t * (p @ mu)
+    assert (objectif(w) <= objectif(reference) + 1e-10).all()
+    np.testing.assert_allclose(w, reference, atol=1e-5)
+
+
+def test_frontiere_infaisable(marche):
+    mu, sigma = marche
+    with pytest.raises(ValueError):
+        frontiere(mu, sigma, haut=0.05)
+    with pytest.raises(ValueError):
+        frontiere(mu, sigma, bas=0.1)
+    with pytest.raises(ValueError):
+        frontiere(mu, sigma, haut=0.2, obligations=np.arange(12) < 2, plancher=0.5)
@@ -0,0 +1,104 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from planificateur import PlanificateurDonnees
+
+
+class FauxBackend:
+    """Répond comme yf.download (colonnes Price x Ticker), en notant chaque appel."""
+
+    def __init__(self, duree=0.05, echecs=0):
+        self.duree = duree
+        self.echecs = echecs
+        self.appels = []
+        self._verrou = threading.Lock()
+
+    def telecharger(self, tickers, **params):
+        with self._verrou:
+            self.appels.append((list(tickers), params))
+            if self.echecs:
+                self.echecs -= 1
+                raise ConnectionError("indisponible")
+        time.sleep(self.duree)
+        jours = pd.bdate_range(params.get("start", "2024-01-01"), params.get("end", "2024-01-31"), inclusive="left")
+        barres = {t: pd.DataFrame({"Close": np.arange(len(jours)) + len(t)}, index=jours, dtype=float)
+                  for t in tickers if t != "INCONNU"}
+        return pd.concat(barres, axis=1, names=["Ticker", "Price"]).swaplevel(axis=1)
+
+    def infos(self, ticker):
+        time.sleep(self.duree)
+        with self._verrou:
+            self.appels.append((ticker, {}))
+        return {"symbol": ticker}
+
+
+def planificateur(backend, **options):
+    return PlanificateurDonnees(backend, debit=1000, capacite=1000, **options)
+
+
+def test_historiques_simultanes_regroupes():
+    backend = FauxBackend()
+    p = planificateur(backend, delai_regroupement=0.2)
+    tickers = ["AAPL", "MSFT", "SPY", "AAPL", "INCONNU"]
+    with ThreadPoolExecutor(len(tickers)) as executeur:
+        resultats = list(executeur.map(lambda t: p.historique(t, "2024-01-01", "2024-02-01"), tickers))
+    assert len(backend.appels) == 1
+    lot, params = backend.appels[0]
+    assert lot == ["AAPL", "INCONNU", "MSFT", "SPY"]
+    assert params == {"start": "2024-01-01", "end": "2024-02-01", "interval": "1d", "auto_adjust": True}
+    assert p.statistiques["regroupees"] == 3 and p.statistiques["dedoublonnees"] == 1
+    for ticker, df in zip(tickers, resultats):
+        if ticker == "INCONNU":
+            assert df.empty
+        else:
+            assert list(df.columns) == ["Close"] and df["Close"].iloc[0] == len(ticker)
+
+
+def test_plages_differentes_non_regroupees():
+    backend = FauxBackend()
+    p = planificateur(backend, delai_regroupement=0.1)
+    with ThreadPoolExecutor(2) as executeur:
+        list(executeur.map(lambda debut: p.historique("AAPL", debut, "2024-02-01"), ["2024-01-01", "2024-01-15"]))
+    assert len(backend.appels) == 2
+
+
+def test_requetes_identiques_dedoublonnees():
+    backend = FauxBackend(duree=0.2)
+    p = planificateur(backend)
+    with ThreadPoolExecutor(6) as executeur:
+        resultats = list(executeur.map(lambda _: p.telecharger(["MSFT", "AAPL"], period="5d"), range(6)))
+        infos = list(executeur.map(lambda _: p.infos("AAPL"), range(4)))
+    assert len(backend.appels) == 2
+    assert p.statistiques["dedoublonnees"] == 8
+    assert all(r is resultats[0] for r in resultats) and infos == [{"symbol": "AAPL"}] * 4
+    # La requête terminée n'est plus en vol : un nouvel appel repart vers le backend
+    p.infos("AAPL")
+    assert len(backend.appels) == 3
+
+
+def test_historiques_par_lots():
+    backend = FauxBackend(duree=0)
+    p = planificateur(backend)
+    resultats = p.historiques([f"T{i}" for i in range(25)] + ["T0"], "2024-01-01", "2024-02-01", taille_lot=10)
+    assert [len(lot) for lot, _ in backend.appels] == [10, 10, 5]
+    assert len(resultats) == 25 and all(len(df) == 23 for df in resultats.values())
+
+
+def test_reessais(monkeypatch):
+    monkeypatch.setattr(time, "sleep", lambda _: None)
+    backend = FauxBackend(duree=0, echecs=2)
+    p = planificateur(backend, tentatives=3)
+    assert not p.telecharger(["AAPL"], period="5d").empty
+    assert p.statistiques["reessais"] == 2 and p.statistiques["appels_backend"] == 3
+
+    backend.echecs = 3
+    with pytest.raises(ConnectionError):
+        p.telecharger(["AAPL"], period="5d")
+    backend.echecs = 5
+    with pytest.raises(ConnectionError):
+        p.historique("AAPL", "2024-01-01", "2024-02-01")
@@ -0,0 +1,67 @@
+import pandas as pd
+
+from rafraichisseur import RafraichisseurMarches, TamponCirculaire
+
+# Indices : barres de 5 min jusqu'à la clôture du vendredi; BTC-USD cote aussi le week-end
+CLOTURE = pd.Timestamp("2024-01-05 20:55", tz="UTC")
+INDICES = ["^GSPC", "^IXIC"]
+
+
+class FauxFournisseur:
+    def __init__(self, maintenant, sans_donnees=()):
+        self.maintenant = maintenant
+        self.sans_donnees = set(sans_donnees)
+        self.appels = []
+
+    def telecharger(self, tickers, start=None, period=None, interval="5m"):
+        self.appels.append((sorted(tickers), start, period))
+        debut = pd.Timestamp(start) if start is not None else self.maintenant - pd.Timedelta(days=5)
+        colonnes = {}
+        for ticker in tickers:
+            if ticker in self.sans_donnees:
+                continue
+            fin = self.maintenant if ticker == "BTC-USD" else min(self.maintenant, CLOTURE)
+            index = pd.date_range(debut.ceil("5min"), fin, freq="5min")
+            colonnes[("Close", ticker)] = pd.Series(range(len(index)), index=index, dtype=float) + 100
+        if not colonnes:
+            return pd.DataFrame()
+        return pd.DataFrame(colonnes).rename_axis(columns=["Price", "Ticker"])
+
+
+def test_tampon_circulaire_remplace_la_barre_en_cours():
+    tampon = TamponCirculaire(capacite=3)
+    tampon.ajouter([1, 2, 3], [10.0, 20.0, 30.0])
+    tampon.ajouter([3, 4], [31.0, 40.0])
+    horodatages, closes = tampon.derniers(3)
+    assert list(horodatages) == [2, 3, 4] and list(closes) == [20.0, 31.0, 40.0]
+
+
+def test_curseur_par_symbole():
+    fournisseur = FauxFournisseur(pd.Timestamp("2024-01-06 10:00", tz="UTC"))
+    rafraichisseur = RafraichisseurMarches(fournisseur, INDICES + ["BTC-USD"])
+    rafraichisseur.rafraichir()
+    assert fournisseur.appels == [(sorted(INDICES + ["BTC-USD"]), None, "5d")]
+
+    # Le week-end, les indices ne sont redemandés que depuis leur clôture, BTC-USD depuis sa dernière barre
+    fournisseur.maintenant += pd.Timedelta(minutes=5)
+    rafraichisseur.rafraichir()
+    assert sorted(fournisseur.appels[1:]) == sorted([
+        (sorted(INDICES), CLOTURE.to_pydatetime(), None),
+        (["BTC-USD"], pd.Timestamp("2024-01-06 10:00", tz="UTC").to_pydatetime(), None),
+    ])
+    instantane = rafraichisseur.instantane()
+    assert instantane["BTC-USD"]["horodatage"] == fournisseur.maintenant
+    assert instantane["^GSPC"]["horodatage"] == CLOTURE
+
+
+def test_un_symbole_sans_donnees_ne_relance_pas_les_autres():
+    fournisseur = FauxFournisseur(pd.Timestamp("2024-01-05 15:00", tz="UTC"), sans_donnees={"^TNX"})
+    rafraichisseur = RafraichisseurMarches(fournisseur, INDICES + ["^TNX"])
+    rafraichisseur.rafraichir()
+    fournisseur.maintenant += pd.Timedelta(minutes=5)
+    rafraichisseur.rafraichir()
+    assert sorted(fournisseur.appels[1:], key=str) == sorted([
+        (sorted(INDICES), pd.Timestamp("2024-01-05 15:00", tz="UTC").to_pydatetime(), None),
+        (["^TNX"], None, "5d"),
+    ], key=str)
+    assert set(rafraichisseur.instantane()) == set(INDICES)
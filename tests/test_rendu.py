@@ -0,0 +1,51 @@
+import gc
+import tracemalloc
+
+import matplotlib
+
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt  # noqa: E402
+import numpy as np  # noqa: E402
+import pytest  # noqa: E402
+
+from rendu import camembert, eventail, rendre_png  # noqa: E402
+
+CLASSES = ["Actions canadiennes", "Actions internationales", "Obligations", "Fonds ESG", "Liquidité"]
+
+
+def rendre(i):
+    annees = np.arange(31)
+    mediane = 10_000 * 1.08 ** annees
+    bandes = {5: mediane * 0.6, 25: mediane * 0.85, 50: mediane, 75: mediane * 1.15, 95: mediane * 1.5}
+    images = [rendre_png(camembert, [i % 40 + 1, 20, 30, 10, 5], CLASSES, dpi=50),
+              rendre_png(eventail, annees, bandes, dpi=50)]
+    assert all(image.startswith(b"\x89PNG") for image in images)
+
+
+def test_rendus_repetes_sans_fuite():
+    for i in range(3):  # caches de polices et de tracé remplis une fois pour toutes
+        rendre(i)
+    gc.collect()
+    tracemalloc.start()
+    try:
+        rendre(0)
+        gc.collect()
+        depart = tracemalloc.get_traced_memory()[0]
+        for i in range(10):
+            rendre(i)
+        gc.collect()
+        croissance = tracemalloc.get_traced_memory()[0] - depart
+    finally:
+        tracemalloc.stop()
+    # Une figure retenue (plt.subplots sans fermeture) pèse environ 400 Kio : trois suffisent à dépasser 1 Mio
+    assert croissance < 2**20
+    assert plt.get_fignums() == []
+
+
+def test_figure_liberee_en_cas_d_erreur():
+    def dessiner(ax):
+        ax.plot([1, 2, 3])
+        raise RuntimeError("données invalides")
+    with pytest.raises(RuntimeError):
+        rendre_png(dessiner)
+    assert plt.get_fignums() == []
@@ -0,0 +1,80 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from risque import CovarianceGlissante, prolonger_covariance, rendements_journaliers
+
+
+def prix_synthetiques(index, tickers, graine=0):
+    rng = np.random.default_rng(graine)
+    marche = rng.normal(0, 0.01, (len(index), 1))
+    rendements = marche * rng.uniform(0.5, 1.5, len(tickers)) + rng.normal(0, 0.01, (len(index), len(tickers)))
+    return pd.DataFrame(100 * np.exp(np.cumsum(rendements, axis=0)), index=index, columns=tickers)
+
+
+def verifier(etat, rendements, fenetre):
+    attendu = CovarianceGlissante.depuis_rendements(rendements, fenetre)
+    covariance = etat["covariance"]
+    assert covariance.tickers == list(rendements.columns)
+    np.testing.assert_allclose(covariance.covariance(), attendu.covariance(), rtol=1e-9, atol=1e-15)
+    np.testing.assert_allclose(covariance.covariance_retrecie()[0], attendu.covariance_retrecie()[0],
+                               rtol=1e-9, atol=1e-15)
+    # Et la définition directe sur la fenêtre
+    np.testing.assert_allclose(covariance.covariance(), rendements.iloc[-fenetre:].fillna(0).cov(), rtol=1e-9)
+
+
+def test_covariance_glissante_identique_a_pandas():
+    rendements = rendements_journaliers(prix_synthetiques(pd.bdate_range("2020-01-01", periods=300), list("ABCD")))
+    covariance = CovarianceGlissante.depuis_rendements(rendements.iloc[:100], 63)
+    for _, ligne in rendements.iloc[100:].iterrows():
+        covariance.ajouter(ligne.to_numpy())
+    np.testing.assert_allclose(covariance.covariance(), rendements.iloc[-63:].cov(), rtol=1e-9)
+    np.testing.assert_allclose(covariance.moyenne(), rendements.iloc[-63:].mean(), rtol=1e-9)
+
+
+@pytest.mark.parametrize("fenetre", [20, 63, 500])
+def test_prolongation_jours_et_tickers(fenetre):
+    prix = prix_synthetiques(pd.bdate_range("2020-01-01", periods=400), ["SPY", "QQQ", "TLT", "GLD"])
+    rendements = rendements_journaliers(prix[["SPY", "QQQ", "TLT"]].iloc[:300])
+    etat, reutilisable = prolonger_covariance(None, rendements, fenetre)
+    assert not reutilisable
+
+    # Nouveaux jours, un ticker ajouté et un retiré : l'état est prolongé
+    rendements = rendements_journaliers(prix[["SPY", "TLT", "GLD"]].iloc[:320])
+    etat, reutilisable = prolonger_covariance(etat, rendements, fenetre)
+    assert reutilisable
+    verifier(etat, rendements, fenetre)
+
+
+def test_nouveaux_jours_d_un_ticker_reconstruisent_l_etat():
+    # Indices en jours ouvrés, puis BTC-USD qui cote aussi le week-end
+    jours = pd.date_range("2023-01-02", periods=200)
+    prix = prix_synthetiques(jours, ["^GSPC", "QQQ", "TLT", "BTC-USD"], graine=3)
+    ouvres = prix.index.dayofweek < 5
+    prix.loc[~ouvres, ["^GSPC", "QQQ", "TLT"]] = np.nan
+    fenetre = 63
+
+    rendements = rendements_journaliers(prix.loc[ouvres, ["^GSPC", "QQQ", "TLT"]])
+    etat, _ = prolonger_covariance(None, rendements, fenetre)
+    rendements = rendements_journaliers(prix)
+    etat, reutilisable = prolonger_covariance(etat, rendements, fenetre)
+    assert not reutilisable
+    verifier(etat, rendements, fenetre)
+
+    # Puis la prolongation reprend normalement
+    suite = prix_synthetiques(pd.date_range(jours[-1] + pd.Timedelta(days=1), periods=5), list(prix.columns), 4)
+    prix = pd.concat([prix, suite * prix.iloc[-1] / suite.iloc[0]])
+    rendements = rendements_journaliers(prix)
+    etat, reutilisable = prolonger_covariance(etat, rendements, fenetre)
+    assert reutilisable
+    verifier(etat, rendements, fenetre)
+
+
+def test_barre_du_jour_modifiee_reconstruit_l_etat():
+    prix = prix_synthetiques(pd.bdate_range("2020-01-01", periods=200), list("ABC"))
+    etat, _ = prolonger_covariance(None, rendements_journaliers(prix), 63)
+    prix.iloc[-1] *= 1.01
+    rendements = rendements_journaliers(prix)
+    etat, reutilisable = prolonger_covariance(etat, rendements, 63)
+    assert not reutilisable
+    verifier(etat, rendements, 63)
@@ -0,0 +1,73 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from screener import cribler
+
+
+def reference(serie):
+    # Formules pandas, ticker par ticker
+    serie = serie.ffill()
+    delta = serie.diff()
+    rsi = 100 - 100 / (1 + delta.clip(lower=0).rolling(14).mean() / (-delta.clip(upper=0)).rolling(14).mean())
+    ligne = serie.ewm(span=12, adjust=False).mean() - serie.ewm(span=26, adjust=False).mean()
+    return {
+        "Dernier prix": serie.iloc[-1],
+        "Rendement 1 mois (%)": (serie.iloc[-1] / serie.iloc[-22] - 1) * 100,
+        "Rendement 3 mois (%)": (serie.iloc[-1] / serie.iloc[-64] - 1) * 100,
+        "Rendement 1 an (%)": (serie.iloc[-1] / serie.iloc[-253] - 1) * 100,
+        "Volatilité (%)": np.log(serie).diff().iloc[-252:].std() * np.sqrt(252) * 100,
+        "SMA 50": serie.rolling(50).mean().iloc[-1],
+        "SMA 200": serie.rolling(200).mean().iloc[-1],
+        "RSI (14)": rsi.iloc[-1],
+        "MACD": ligne.iloc[-1],
+        "Ligne de signal": ligne.ewm(span=9, adjust=False).mean().iloc[-1],
+    }
+
+
+@pytest.fixture
+def prix():
+    rng = np.random.default_rng(0)
+    jours = pd.bdate_range("2020-01-01", periods=600)
+    valeurs = 100 * np.exp(np.cumsum(rng.normal(0.0003, 0.015, (len(jours), 150)), axis=0))
+    prix = pd.DataFrame(valeurs, index=jours, columns=[f"T{i}" for i in range(150)])
+    prix.iloc[100:110, 3] = np.nan  # trou de cotation
+    prix.iloc[:450, 7] = np.nan  # introduction récente : pas de SMA 200 sur toute la fenêtre
+    return prix
+
+
+def test_identique_a_pandas(prix):
+    resultat = cribler(prix, taille_bloc=64)
+    assert list(resultat.index) == list(prix.columns)
+    for ticker in ["T0", "T3", "T7", "T64", "T149"]:
+        for colonne, attendu in reference(prix[ticker]).items():
+            assert resultat.loc[ticker, colonne] == pytest.approx(attendu, rel=1e-9, nan_ok=True), (ticker, colonne)
+
+
+def test_libelles(prix):
+    resultat = cribler(prix)
+    sma50, sma200 = resultat["SMA 50"], resultat["SMA 200"]
+    tendance = resultat["Tendance SMA 50/200"]
+    stables = tendance.isin(["Haussière", "Baissière"])
+    assert (tendance[stables] == np.where(sma50 > sma200, "Haussière", "Baissière")[stables]).all()
+    assert tendance["T7"] == "N/A"
+    rsi = resultat["RSI (14)"]
+    assert (resultat["Zone RSI"] == np.where(rsi >= 70, "Surachat", np.where(rsi <= 30, "Survente", "Neutre"))).all()
+
+
+def test_blocs_et_executeur_sans_effet(prix):
+    attendu = cribler(prix, taille_bloc=64)
+    with ThreadPoolExecutor(4) as executeur:
+        pd.testing.assert_frame_equal(cribler(prix, executeur=executeur, taille_bloc=7), attendu)
+    pd.testing.assert_frame_equal(cribler(prix, taille_bloc=1000), attendu)
+
+
+def test_historique_court():
+    prix = pd.DataFrame({"A": [10.0, 11.0, 12.1]}, index=pd.bdate_range("2024-01-01", periods=3))
+    resultat = cribler(prix)
+    assert np.isnan(resultat.loc["A", "Rendement 1 mois (%)"]) and np.isnan(resultat.loc["A", "SMA 50"])
+    assert resultat.loc["A", "Tendance SMA 50/200"] == "N/A"
+    with pytest.raises(ValueError):
+        cribler(prix.iloc[:1])
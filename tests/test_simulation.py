@@ -0,0 +1,91 @@
+import numpy as np
+import pytest
+
+from simulation import (grille_scenarios, simuler_bootstrap, simuler_monte_carlo, simuler_rendement, taux_requis,
+                        versement_requis)
+
+
+def capital_mois_par_mois(montant_initial, versement, taux, duree):
+    # Définition directe : taux mensuel équivalent, versement en fin de mois, capital relevé chaque fin d'année
+    mensuel = (1 + taux / 100) ** (1 / 12) - 1
+    capital, annuels = float(montant_initial), []
+    for mois in range(12 * duree):
+        capital = capital * (1 + mensuel) + versement
+        if mois % 12 == 11:
+            annuels.append(capital)
+    return np.array(annuels)
+
+
+@pytest.mark.parametrize("taux", [-5, 0, 0.5, 5, 15])
+def test_rendement_compose_mensuellement(taux):
+    np.testing.assert_allclose(simuler_rendement(10_000, 250, taux, 30), capital_mois_par_mois(10_000, 250, taux, 30),
+                               rtol=1e-12)
+    assert len(simuler_rendement(10_000, 250, taux, 0)) == 0
+
+
+def test_grille_identique_au_simulateur():
+    taux, durees, versements = np.arange(0, 15.5, 0.5), np.arange(1, 41), np.linspace(0, 3000, 13)
+    grille = grille_scenarios(5_000, taux, durees, versements)
+    assert grille.shape == (len(taux), len(durees), len(versements))
+    for i, j, k in [(0, 0, 0), (10, 9, 4), (30, 39, 12), (3, 20, 7)]:
+        assert grille[i, j, k] == pytest.approx(simuler_rendement(5_000, versements[k], taux[i], durees[j])[-1],
+                                                rel=1e-12)
+
+
+def test_versement_requis_atteint_la_cible():
+    taux, durees = np.arange(0, 15.5, 0.5)[:, None], np.arange(1, 41)[None, :]
+    versements = versement_requis(5_000, taux, durees, 500_000)
+    finaux = grille_scenarios(5_000, taux[:, 0], durees[0], [0.0])[..., 0] + \
+        grille_scenarios(0, taux[:, 0], durees[0], [1.0])[..., 0] * versements
+    # Un versement nul signale que le capital initial suffit déjà
+    np.testing.assert_allclose(finaux[versements > 0], 500_000, rtol=1e-10)
+    assert (finaux[versements == 0] >= 500_000).all() and (versements == 0).any()
+    # Le capital initial suffit déjà : aucun versement
+    assert versement_requis(100_000, 5, 10, 50_000) == 0
+
+
+def test_taux_requis_atteint_la_cible():
+    durees, versements = np.arange(1, 41)[:, None], np.array([0, 100, 1_000])[None, :]
+    taux = taux_requis(10_000, versements, durees, 200_000)
+    atteints = ~np.isnan(taux)
+    assert atteints.any() and not atteints.all()
+    for i, j in zip(*np.nonzero(atteints)):
+        final = simuler_rendement(10_000, versements[0, j], taux[i, j], durees[i, 0])[-1]
+        assert final == pytest.approx(200_000, rel=1e-9)
+    assert float(taux_requis(10_000, 100, 10, 10_000 + 12_000)) == pytest.approx(0, abs=1e-9)
+    assert np.isnan(taux_requis(10_000, 0, 1, 1e9))
+
+
+def test_monte_carlo_exact_et_en_flux():
+    exact = simuler_monte_carlo(10_000, 7, 15, 20, 20_000, graine=3)
+    assert exact.exact
+    np.testing.assert_allclose(exact.percentiles[50][-1], np.percentile(exact.distribution_finale, 50))
+    assert exact.percentiles[5][0] == exact.percentiles[95][0] == 10_000
+
+    # Même graine, tirages par lots : mêmes trajectoires, percentiles estimés par histogramme
+    flux = simuler_monte_carlo(10_000, 7, 15, 20, 20_000, graine=3, memoire_max=50_000)
+    assert not flux.exact
+    np.testing.assert_array_equal(flux.distribution_finale, exact.distribution_finale)
+    for p in exact.percentiles:
+        np.testing.assert_allclose(flux.percentiles[p], exact.percentiles[p], rtol=5e-3)
+
+
+def test_monte_carlo_rendement_moyen():
+    resultat = simuler_monte_carlo(1.0, 8, 20, 1, 200_000, graine=0)
+    assert resultat.distribution_finale.mean() == pytest.approx(1.08, abs=0.002)
+    assert resultat.distribution_finale.std() == pytest.approx(0.20, abs=0.002)
+
+
+def test_bootstrap_rendements_constants():
+    # Tous les mois au même rendement : chaque trajectoire suit la forme fermée du simulateur
+    mensuel = 0.006
+    resultat = simuler_bootstrap(np.full(60, mensuel), 10_000, 200, 15, 500, graine=0, cible=60_000)
+    attendu = capital_mois_par_mois(10_000, 200, ((1 + mensuel) ** 12 - 1) * 100, 15)
+    np.testing.assert_allclose(resultat.percentiles[5][1:], attendu, rtol=1e-10)
+    np.testing.assert_allclose(resultat.percentiles[95][1:], attendu, rtol=1e-10)
+    assert resultat.probabilite_cible == float(attendu[-1] >= 60_000)
+
+
+def test_bootstrap_historique_insuffisant():
+    with pytest.raises(ValueError):
+        simuler_bootstrap([0.01, np.nan], 1_000, 0, 5, 10)
@@ -0,0 +1,113 @@
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from stockage import StockageOHLCV
+
+
+class FauxFournisseur:
+    """Barres journalières synthétiques; les ``vides`` premiers appels renvoient un tableau vide."""
+
+    def __init__(self, vides=0):
+        self.vides = vides
+        self.appels = []
+
+    def historique(self, ticker, debut, fin, intervalle="1d"):
+        self.appels.append((ticker, debut, fin))
+        if len(self.appels) <= self.vides:
+            return pd.DataFrame()
+        index = pd.bdate_range(debut, fin - timedelta(days=1), name="Date")
+        prix = 100 + np.arange(len(index), dtype=float)
+        return pd.DataFrame({"Open": prix, "High": prix + 1, "Low": prix - 1, "Close": prix,
+                             "Volume": 1000}, index=index)
+
+
+@pytest.fixture
+def stockage(tmp_path):
+    def creer(fournisseur, ttl_jour=900):
+        return StockageOHLCV(str(tmp_path / "ohlcv.sqlite"), fournisseur=fournisseur, ttl_jour=ttl_jour)
+    return creer
+
+
+def test_seuls_les_segments_manquants_sont_demandes(stockage):
+    fournisseur = FauxFournisseur()
+    base = stockage(fournisseur)
+    debut, fin = date(2020, 1, 1), date(2020, 3, 1)
+
+    premiere = base.lire("AAPL", date(2020, 2, 1), fin)
+    assert fournisseur.appels == [("AAPL", date(2020, 2, 1), fin)]
+    complete = base.lire("AAPL", debut, fin)
+    assert fournisseur.appels[1:] == [("AAPL", debut, date(2020, 2, 1))]
+    assert base.lire("AAPL", debut, fin).equals(complete)
+    assert len(fournisseur.appels) == 2
+    assert len(complete) == len(pd.bdate_range(debut, fin - timedelta(days=1)))
+    assert complete.loc["2020-02-01":].equals(premiere)
+
+
+def test_la_journee_en_cours_expire(stockage):
+    debut = date.today() - timedelta(days=10)
+    fournisseur = FauxFournisseur()
+    base = stockage(fournisseur)
+    base.lire("AAPL", debut)
+    base.lire("AAPL", debut)
+    assert len(fournisseur.appels) == 1
+
+    # TTL nul : la journée en cours est redemandée à chaque lecture, pas l'historique
+    fournisseur = FauxFournisseur()
+    base = stockage(fournisseur, ttl_jour=0)
+    base.lire("MSFT", debut)
+    base.lire("MSFT", debut)
+    assert fournisseur.appels[1][1:] == (date.today(), date.today() + timedelta(days=1))
+
+
+def test_une_reponse_vide_est_redemandee(stockage):
+    fournisseur = FauxFournisseur(vides=1)
+    base = stockage(fournisseur, ttl_jour=0)
+    debut, fin = date(2020, 1, 1), date(2020, 3, 1)
+    assert base.lire("AAPL", debut, fin).empty
+    assert len(base.lire("AAPL", debut, fin)) > 0
+    assert fournisseur.appels == [("AAPL", debut, fin)] * 2
+    # Une fois les barres reçues, le segment est couvert durablement
+    base.lire("AAPL", debut, fin)
+    assert len(fournisseur.appels) == 2
+
+
+def test_un_week_end_sans_barre_est_couvert(stockage):
+    fournisseur = FauxFournisseur()
+    base = stockage(fournisseur, ttl_jour=0)
+    fournisseur.historique = lambda t, d, f, i="1d": fournisseur.appels.append((t, d, f)) or pd.DataFrame()
+    # Samedi 29 février au lundi 2 mars 2020, puis un long week-end (vendredi saint) : aucune séance
+    for debut, fin in [(date(2020, 2, 29), date(2020, 3, 2)), (date(2020, 4, 10), date(2020, 4, 13))]:
+        assert base.lire("AAPL", debut, fin).empty
+        assert base.lire("AAPL", debut, fin).empty
+    assert len(fournisseur.appels) == 2
+    # Un segment plus long sans barre reste à redemander
+    base.lire("AAPL", date(2020, 5, 1), date(2020, 5, 8))
+    base.lire("AAPL", date(2020, 5, 1), date(2020, 5, 8))
+    assert len(fournisseur.appels) == 4
+
+
+def test_une_reponse_ecourtee_ne_couvre_que_ses_barres(stockage):
+    fournisseur = FauxFournisseur()
+    base = stockage(fournisseur, ttl_jour=0)
+    base.lire("AAPL", date(2020, 1, 1), date(2020, 2, 1))
+    # Réponse tronquée au 15 janvier : seule la suite est redemandée
+    fournisseur.historique = lambda t, d, f, i="1d", h=fournisseur.historique: h(t, d, min(f, date(2020, 1, 16)), i)
+    base.lire("AAPL", date(2020, 1, 1), date(2020, 2, 15))
+    del fournisseur.historique
+    base.lire("AAPL", date(2020, 1, 1), date(2020, 2, 15))
+    assert fournisseur.appels[-1] == ("AAPL", date(2020, 2, 1), date(2020, 2, 15))
+
+
+def test_matrice_univers(stockage):
+    fournisseur = FauxFournisseur(vides=1)
+    base = stockage(fournisseur, ttl_jour=0)
+    debut, fin = date(2020, 1, 1), date(2020, 2, 1)
+    prix = base.matrice(["AAPL", "MSFT"], debut, fin)
+    # Le premier ticker a échoué (réponse vide) : colonne vide, redemandée à la lecture suivante
+    assert prix["AAPL"].isna().all() and prix["MSFT"].notna().all()
+    prix = base.matrice(["AAPL", "MSFT"], debut, fin)
+    assert prix.notna().all().all()
+    assert [a[0] for a in fournisseur.appels] == ["AAPL", "MSFT", "AAPL"]
@@ -0,0 +1,44 @@
+import json
+
+from benchmarks import suite
+
+
+def test_comparer_seuil_et_bruit():
+    reference = {"a": {"min_s": 0.010}, "b": {"min_s": 0.010}, "c": {"min_s": 0.0001}, "d": {"min_s": 0.010}}
+    resultats = {"a": {"min_s": 0.020}, "b": {"min_s": 0.012}, "c": {"min_s": 0.0004}, "e": {"min_s": 1.0}}
+    # b reste sous le seuil, c est plus lent mais de moins de ECART_MIN_S, e n'a pas de référence
+    regressions = suite.comparer(resultats, reference, 1.25)
+    assert [cle for cle, _ in regressions] == ["a"] and regressions[0][1] == 2.0
+
+
+def test_chronometrer():
+    appels = []
+    mesure = suite.chronometrer(lambda: appels.append(1), duree_min=0, repetitions_max=5)
+    assert mesure["repetitions"] == 3 and len(appels) == 4
+    assert 0 <= mesure["min_s"] <= mesure["mediane_s"]
+
+
+def test_cas_et_execution(monkeypatch, tmp_path):
+    # Chaque cas a un nom, une taille et une préparation; l'exécution filtrée n'en mesure qu'une partie
+    cas = [*suite.cas_monte_carlo(), *suite.cas_rendement(), *suite.cas_scenarios(), *suite.cas_allocation(),
+           *suite.cas_backtest(), *suite.cas_frontiere(), *suite.cas_indicateurs(), *suite.cas_csv(tmp_path)]
+    cles = [f"{nom}[{taille}]" for nom, taille, _ in cas]
+    assert len(cles) == len(set(cles))
+    resultats = suite.executer("simulateur_rendement")
+    assert sorted(resultats) == ["simulateur_rendement[100_ans]", "simulateur_rendement[10_ans]",
+                                 "simulateur_rendement[40_ans]"]
+
+    # Historique complété, puis comparaison à la référence enregistrée
+    monkeypatch.setattr(suite, "DOSSIER_RESULTATS", tmp_path)
+    monkeypatch.setattr(suite, "HISTORIQUE", tmp_path / "historique.jsonl")
+    monkeypatch.setattr(suite, "REFERENCE", tmp_path / "reference.json")
+    monkeypatch.setattr("sys.argv", ["suite", "--filtre", "allocation_profil", "--enregistrer-reference"])
+    assert suite.main() == 0
+    reference = json.loads((tmp_path / "reference.json").read_text(encoding="utf-8"))
+    assert list(reference["resultats"]) == ["allocation_profil[1]"]
+    reference["resultats"]["allocation_profil[1]"]["min_s"] = 1e-9
+    (tmp_path / "reference.json").write_text(json.dumps(reference), encoding="utf-8")
+    monkeypatch.setattr(suite, "ECART_MIN_S", 0)
+    monkeypatch.setattr("sys.argv", ["suite", "--filtre", "allocation_profil"])
+    assert suite.main() == 1
+    assert len((tmp_path / "historique.jsonl").read_text(encoding="utf-8").splitlines()) == 2
@@ -0,0 +1,55 @@
+import os
+
+import pytest
+
+import univers
+
+
+@pytest.fixture
+def listes(tmp_path):
+    sp500 = tmp_path / "sp500.csv"
+    sp500.write_text("ticker,nom\nAAPL,Apple Inc.\nMSFT,Microsoft Corporation\n")
+    nasdaq = tmp_path / "nasdaqtraded.txt"
+    nasdaq.write_text("Nasdaq Traded|Symbol|Security Name|Test Issue\n"
+                      "Y|AAPL|Apple Inc. - Common Stock|N\n"
+                      "Y|PLTR|Palantir Technologies Inc. Class A|N\n"
+                      "Y|ZXZZT|NASDAQ TEST STOCK|Y\n"
+                      "File Creation Time: 0101202400:00|||\n")
+    return {"sp500": str(sp500), "us": str(nasdaq)}, tmp_path / "univers.npz"
+
+
+def test_recherche(listes):
+    fichiers, chemin = listes
+    index = univers.construire(fichiers, str(chemin))
+    assert len(index) == 3 and index.sources == ["sp500", "us"]
+    assert index.symboles("sp500") == ["AAPL", "MSFT"] and index.symboles("us") == ["AAPL", "PLTR"]
+    assert index.nom("AAPL") == "Apple Inc." and index.nom("ZXZZT") == ""
+    assert index.rechercher("palan")[0] == "PLTR"
+    assert index.rechercher("microsfot") == ["MSFT"]
+    assert index.rechercher("pltr", source="sp500") == []
+
+
+def test_avec_noms(listes, tmp_path):
+    fichiers, chemin = listes
+    assert univers.construire(fichiers, str(chemin)).avec_noms
+    symboles = tmp_path / "symboles.csv"
+    symboles.write_text("Ticker\nAAPL\nMSFT\n")
+    index = univers.construire({"sp500": str(symboles)}, str(tmp_path / "symboles.npz"))
+    assert not index.avec_noms and index.rechercher("MSF") == ["MSFT"]
+    assert not univers.construire({}, str(tmp_path / "vide.npz")).avec_noms
+
+
+def test_listes_conservees_a_la_reconstruction(listes, monkeypatch):
+    fichiers, chemin = listes
+    # Listes par défaut sans la liste américaine, qui est ajoutée à la construction
+    monkeypatch.setattr(univers, "LISTES", {"sp500": fichiers["sp500"], "us": str(chemin.parent / "absent.txt")})
+    univers.construire(dict(univers.LISTES, us=fichiers["us"]), str(chemin))
+    assert univers.charger_univers(chemin=str(chemin)).listes["us"] == fichiers["us"]
+
+    # Une liste modifiée déclenche la reconstruction, avec les listes enregistrées dans l'index
+    with open(fichiers["sp500"], "a") as f:
+        f.write("NVDA,NVIDIA Corporation\n")
+    futur = os.path.getmtime(chemin) + 10
+    os.utime(fichiers["sp500"], (futur, futur))
+    index = univers.charger_univers(chemin=str(chemin))
+    assert "NVDA" in index.symboles() and "PLTR" in index.symboles("us")
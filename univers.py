@@ -0,0 +1,236 @@
+import argparse
+import os
+import re
+import unicodedata
+
+import numpy as np
+import pandas as pd
+
+# Listes par défaut (nom de la source -> fichier); les fichiers absents sont ignorés. La liste complète
+# des titres américains (``nasdaqtraded.txt`` de NASDAQ Trader) s'ajoute avec :
+#     python -m univers --liste us=nasdaqtraded.txt
+# Les listes utilisées sont enregistrées dans l'index et reprises à chaque reconstruction.
+LISTES = {"sp500": "tickers_sp500.csv", "fnb": "fnb_americains.csv", "us": "donnees/nasdaqtraded.txt"}
+FICHIER = "donnees/univers.npz"
+
+COLONNES_SYMBOLE = ("ticker", "symbol", "symbole", "act symbol")
+COLONNES_NOM = ("nom", "name", "security name", "longname", "company name")
+# Longueur des noms normalisés conservée pour la recherche par préfixe
+LONGUEUR_PREFIXE = 32
+# Part minimale des trigrammes de la requête présents dans un titre pour la recherche approchée
+SEUIL_APPROCHE = 0.3
+
+
+def normaliser(texte):
+    """Minuscules ASCII sans accents ni ponctuation, espaces simples."""
+    texte = unicodedata.normalize("NFKD", str(texte)).encode("ascii", "ignore").decode().lower()
+    return " ".join(re.sub(r"[^a-z0-9]+", " ", texte).split())
+
+
+def trigrammes(texte):
+    texte = f" {normaliser(texte)} "
+    return {texte[i:i + 3] for i in range(len(texte) - 2)}
+
+
+def lire_liste(chemin):
+    """(symboles, noms) d'une liste CSV ou d'un fichier NASDAQ Trader (séparateur ``|``)."""
+    df = pd.read_csv(chemin, sep="|" if chemin.endswith(".txt") else ",", dtype=str, keep_default_na=False)
+    colonnes = {c.lower().strip(): c for c in df.columns}
+    symbole = next(colonnes[c] for c in COLONNES_SYMBOLE if c in colonnes)
+    nom = next((colonnes[c] for c in COLONNES_NOM if c in colonnes), None)
+    if "test issue" in colonnes:
+        df = df[df[colonnes["test issue"]] != "Y"]
+    # Écarte les lignes de pied de fichier et les symboles invalides
+    df = df[df[symbole].str.fullmatch(r"[A-Za-z0-9.\-^=$]{1,15}")]
+    return df[symbole].str.upper().tolist(), (df[nom].str.strip().tolist() if nom else [""] * len(df))
+
+
+def construire(listes=LISTES, chemin=FICHIER):
+    """Construit l'index à partir des ``listes`` existantes et l'enregistre dans ``chemin``."""
+    sources = [s for s, f in listes.items() if os.path.exists(f)]
+    entrees = {}
+    for bit, source in enumerate(sources):
+        symboles, noms = lire_liste(listes[source])
+        for symbole, nom in zip(symboles, noms):
+            # Un titre présent dans plusieurs listes garde son premier rang et le premier nom non vide
+            rang, ancien, masque = entrees.get(symbole, (len(entrees), "", 0))
+            entrees[symbole] = (rang, ancien or nom, masque | 1 << bit)
+    symboles = sorted(entrees)
+    rangs, noms, masques = zip(*(entrees[s] for s in symboles)) if symboles else ((), (), ())
+    n = len(symboles)
+
+    noms_utf8 = [nom.encode() for nom in noms]
+    decalages_noms = np.concatenate([[0], np.cumsum([len(b) for b in noms_utf8])]).astype(np.int64)
+    normalises = np.array([normaliser(nom)[:LONGUEUR_PREFIXE].encode() for nom in noms], dtype=f"S{LONGUEUR_PREFIXE}")
+    ordre_noms = np.argsort(normalises, kind="stable")
+
+    # Index inversé des trigrammes (symbole et nom) au format CSR
+    type_entree = np.min_scalar_type(max(n - 1, 0))
+    documents = [trigrammes(f"{s} {nom}") for s, nom in zip(symboles, noms)]
+    paires = sorted((t.encode(), i) for i, doc in enumerate(documents) for t in doc)
+    cles = np.array([t for t, _ in paires], dtype="S3")
+    tous, debuts = np.unique(cles, return_index=True)
+
+    dossier = os.path.dirname(chemin)
+    if dossier:
+        os.makedirs(dossier, exist_ok=True)
+    temporaire = f"{chemin}.{os.getpid()}.tmp.npz"
+    np.savez(
+        temporaire,
+        symboles=np.array([s.encode() for s in symboles], dtype="S15"),
+        rangs=np.array(rangs, dtype=np.int32),
+        masques=np.array(masques, dtype=np.uint8),
+        sources=np.array(sources),
+        noms=np.frombuffer(b"".join(noms_utf8), dtype=np.uint8),
+        decalages_noms=decalages_noms,
+        noms_tries=normalises[ordre_noms],
+        ordre_noms=ordre_noms.astype(type_entree),
+        trigrammes=tous,
+        decalages=np.append(debuts, len(paires)).astype(np.int64),
+        postings=np.array([i for _, i in paires], dtype=type_entree),
+        nb_trigrammes=np.array([len(doc) for doc in documents], dtype=np.uint16),
+        listes=np.array(list(listes.items()), dtype=str).reshape(-1, 2),
+    )
+    os.replace(temporaire, chemin)
+    return IndexUnivers(chemin)
+
+
+def charger_univers(listes=None, chemin=FICHIER):
+    """Index enregistré, reconstruit s'il manque ou si une liste est plus récente.
+
+    Sans ``listes``, ce sont celles enregistrées dans l'index (``LISTES`` à
+    défaut) : une liste ajoutée par ``python -m univers --liste`` est gardée.
+    """
+    index = IndexUnivers(chemin) if os.path.exists(chemin) else None
+    if listes is None:
+        listes = index.listes if index is not None else LISTES
+    dates = [os.path.getmtime(f) for f in listes.values() if os.path.exists(f)]
+    if index is None or max(dates, default=0) > os.path.getmtime(chemin):
+        return construire(listes, chemin)
+    return index
+
+
+class IndexUnivers:
+    """Index en lecture seule de l'univers, partagé par toutes les sessions.
+
+    Les symboles sont triés : un préfixe se cherche par bisection. Les noms
+    normalisés (tronqués à ``LONGUEUR_PREFIXE`` caractères) ont leur propre
+    ordre trié. La recherche approchée compte, pour chaque titre, les
+    trigrammes de la requête présents dans son symbole et son nom (index
+    inversé au format CSR). Tous les tableaux sont de type fixe : la mémoire
+    reste de l'ordre du Mio pour les ~10 000 titres américains.
+    """
+
+    def __init__(self, chemin=FICHIER):
+        with np.load(chemin) as donnees:
+            for nom in donnees.files:
+                setattr(self, f"_{nom}", donnees[nom])
+        self.sources = self._sources.tolist()
+        # Listes ayant servi à construire l'index (absentes des index plus anciens)
+        self.listes = dict(self._listes.tolist()) if hasattr(self, "_listes") else dict(LISTES)
+
+    def __len__(self):
+        return len(self._symboles)
+
+    @property
+    def avec_noms(self):
+        """Vrai si au moins une liste fournit des noms de société (recherche par nom possible)."""
+        return bool(len(self._decalages_noms) and self._decalages_noms[-1])
+
+    def _position(self, symbole):
+        cle = str(symbole).upper().encode()
+        i = int(np.searchsorted(self._symboles, cle))
+        return i if i < len(self._symboles) and self._symboles[i] == cle else None
+
+    def _masque(self, source):
+        if source is None:
+            return np.ones(len(self), dtype=bool)
+        return self._masques & (1 << self.sources.index(source)) > 0 if source in self.sources \
+            else np.zeros(len(self), dtype=bool)
+
+    def _decoder(self, positions):
+        return [s.decode() for s in self._symboles[positions]]
+
+    def _nom(self, i):
+        return self._noms[self._decalages_noms[i]:self._decalages_noms[i + 1]].tobytes().decode()
+
+    def nom(self, symbole):
+        i = self._position(symbole)
+        return "" if i is None else self._nom(i)
+
+    def libelle(self, symbole):
+        nom = self.nom(symbole)
+        return f"{symbole} — {nom}" if nom else symbole
+
+    def symboles(self, source=None):
+        """Symboles d'une source (tous si None), dans l'ordre de leur liste."""
+        positions = np.flatnonzero(self._masque(source))
+        return self._decoder(positions[np.argsort(self._rangs[positions], kind="stable")])
+
+    def prefixe(self, texte, limite=20, source=None):
+        """Titres dont le symbole, puis le nom, commence par ``texte``."""
+        masque = self._masque(source)
+        cle = texte.strip().upper().encode("ascii", "ignore")
+        resultats = []
+        if cle:
+            i, j = np.searchsorted(self._symboles, [cle, cle + b"\xff"])
+            resultats = [p for p in range(i, j) if masque[p]][:limite]
+        nom = normaliser(texte).encode()
+        if nom and len(resultats) < limite:
+            cle = nom[:LONGUEUR_PREFIXE]
+            i, j = np.searchsorted(self._noms_tries, [cle, cle + b"\xff"])
+            for p in self._ordre_noms[i:j]:
+                # Au-delà de la longueur conservée, le nom complet départage
+                if masque[p] and p not in resultats and (
+                        len(nom) <= LONGUEUR_PREFIXE or normaliser(self._nom(p)).encode().startswith(nom)):
+                    resultats.append(int(p))
+                    if len(resultats) >= limite:
+                        break
+        return self._decoder(resultats)
+
+    def approche(self, texte, limite=20, source=None):
+        """Titres contenant le plus de trigrammes de ``texte`` (fautes de frappe, mots dans le désordre)."""
+        requete = np.array(sorted(t.encode() for t in trigrammes(texte)), dtype="S3")
+        if not len(requete) or not len(self):
+            return []
+        i = np.searchsorted(self._trigrammes, requete)
+        i = i[(i < len(self._trigrammes)) & (self._trigrammes[np.minimum(i, len(self._trigrammes) - 1)] == requete)]
+        if not len(i):
+            return []
+        postings = np.concatenate([self._postings[a:b] for a, b in zip(self._decalages[i], self._decalages[i + 1])])
+        communs = np.bincount(postings, minlength=len(self))
+        # Part des trigrammes de la requête trouvés, puis similarité de Jaccard pour départager
+        couverture = communs / len(requete)
+        jaccard = communs / (len(requete) + self._nb_trigrammes - communs)
+        candidats = np.flatnonzero((couverture >= SEUIL_APPROCHE) & self._masque(source))
+        ordre = np.lexsort((-jaccard[candidats], -couverture[candidats]))[:limite]
+        return self._decoder(candidats[ordre])
+
+    def rechercher(self, texte, limite=20, source=None):
+        """Symbole exact, puis préfixes (symbole, nom), puis correspondances approchées."""
+        if not texte.strip():
+            return self.symboles(source)[:limite]
+        resultats = self.prefixe(texte, limite, source)
+        if len(resultats) < limite:
+            resultats += [s for s in self.approche(texte, limite, source) if s not in resultats]
+        exact = texte.strip().upper()
+        if exact in resultats:
+            resultats.remove(exact)
+            resultats.insert(0, exact)
+        return resultats[:limite]
+
+
+def main():
+    parseur = argparse.ArgumentParser(description="Construit l'index de l'univers des titres.")
+    parseur.add_argument("--liste", action="append", default=[], metavar="SOURCE=FICHIER",
+                         help="liste à ajouter ou remplacer (ex. us=nasdaqtraded.txt)")
+    parseur.add_argument("--sortie", default=FICHIER)
+    args = parseur.parse_args()
+    listes = dict(LISTES, **dict(liste.split("=", 1) for liste in args.liste))
+    index = construire(listes, args.sortie)
+    print(f"{len(index)} titres ({', '.join(index.sources)}) -> {args.sortie} "
+          f"({os.path.getsize(args.sortie) / 1024:.0f} Kio)")
+
+
+if __name__ == "__main__":
+    main()